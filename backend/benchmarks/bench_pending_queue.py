@@ -0,0 +1,177 @@
+"""
+Benchmark the pending-achievements queue query on SQLite with and without
+the status/tenant indexes declared on Achievement.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pending_queue.py [--rows 1000000] [--db /tmp/bench.sqlite3]
+
+The script builds a throwaway database, bulk-loads achievements spread over
+several colleges and departments (about 5% pending), then times the queries
+behind PendingAchievementsView for a principal, a HOD/faculty member and a
+superuser, first with the indexes dropped and then with them in place.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smart_student_hub.settings")
+
+import django  # noqa: E402
+
+COLLEGES = 10
+DEPARTMENTS_PER_COLLEGE = 10
+STUDENTS_PER_DEPARTMENT = 20
+PENDING_RATIO = 0.05
+PAGE_SIZE = 50
+REPEATS = 20
+INSERT_BATCH = 50000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of achievements to load")
+    parser.add_argument("--db", default=None, help="path of the throwaway SQLite database")
+    return parser.parse_args()
+
+
+def setup_database(path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = path
+    settings.DATABASES["default"]["TEST"] = {"NAME": path}
+    django.setup()
+
+    from django.db import connection
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+
+
+def load_data(rows):
+    from django.db import connection, transaction
+    from core.models import College, Department, User, StudentProfile
+
+    students = []
+    tenants = []
+    for c in range(COLLEGES):
+        college = College.objects.create(name=f"Bench College {c}", code=f"BC{c}")
+        for d in range(DEPARTMENTS_PER_COLLEGE):
+            department = Department.objects.create(name=f"Dept {d}", code=f"D{d}", college=college)
+            tenants.append((college, department))
+            for s in range(STUDENTS_PER_DEPARTMENT):
+                user = User(
+                    email=f"s{c}_{d}_{s}@bench.local", username=f"s{c}_{d}_{s}",
+                    college=college, role="student", is_student=True,
+                )
+                user.set_unusable_password()
+                students.append((user, college, department))
+    User.objects.bulk_create([user for user, _, _ in students], batch_size=1000)
+    profiles = StudentProfile.objects.bulk_create(
+        [
+            StudentProfile(user=user, student_id=user.username, year_of_admission=2024,
+                           course="BTech", department=department)
+            for user, _, department in students
+        ],
+        batch_size=1000,
+    )
+    student_rows = [
+        (profile.pk, college.pk, department.pk)
+        for profile, (_, college, department) in zip(profiles, students)
+    ]
+
+    rng = random.Random(42)
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    sql = (
+        "INSERT INTO core_achievement (student_id, college_id, department_id, title, description, "
+        "category, date_achieved, evidence_file, status, rejection_reason, created_at, updated_at) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+    )
+    with connection.cursor() as cursor:
+        # Durability doesn't matter for a throwaway database
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        for offset in range(0, rows, INSERT_BATCH):
+            batch = []
+            for i in range(offset, min(offset + INSERT_BATCH, rows)):
+                student_id, college_id, department_id = rng.choice(student_rows)
+                created = (start + datetime.timedelta(seconds=i * 60)).isoformat()
+                status = "pending" if rng.random() < PENDING_RATIO else rng.choice(["approved", "rejected"])
+                batch.append((
+                    student_id, college_id, department_id, f"Achievement {i}", "Benchmark row",
+                    "other", "2024-01-01", "achievements/bench.pdf", status, "", created, created,
+                ))
+            with transaction.atomic():
+                cursor.executemany(sql, batch)
+        cursor.execute("ANALYZE")
+    return tenants
+
+
+def pending_querysets(tenants):
+    from core.models import Achievement, User
+
+    college, department = tenants[len(tenants) // 2]
+    principal = User(role="principal", college=college)
+    faculty = User(role="faculty", college=college, department=department)
+    superuser = User(role="superuser", is_superuser=True)
+    return {
+        "principal": Achievement.objects.visible_to(principal).filter(status="pending"),
+        "faculty": Achievement.objects.visible_to(faculty).filter(status="pending"),
+        "superuser": Achievement.objects.visible_to(superuser).filter(status="pending"),
+    }
+
+
+def time_query(queryset):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        list(queryset[:PAGE_SIZE])
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def query_plan(queryset):
+    return " | ".join(line for line in queryset[:PAGE_SIZE].explain().splitlines() if "core_achievement" in line)
+
+
+def run(label, querysets):
+    print(f"\n== {label} ==")
+    for name, queryset in querysets.items():
+        print(f"{name:>10}: {time_query(queryset):9.2f} ms  plan: {query_plan(queryset)}")
+
+
+def main():
+    args = parse_args()
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="vidyasetu-bench-"), "bench.sqlite3")
+    setup_database(path)
+
+    from django.db import connection
+    from core.models import Achievement
+
+    started = time.perf_counter()
+    tenants = load_data(args.rows)
+    print(f"Loaded {args.rows} achievements into {path} in {time.perf_counter() - started:.1f}s")
+
+    querysets = pending_querysets(tenants)
+    indexes = Achievement._meta.indexes
+
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(Achievement, index)
+    run("without status/tenant indexes", querysets)
+
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.add_index(Achievement, index)
+    connection.cursor().execute("ANALYZE")
+    run("with status/tenant indexes", querysets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark portfolio PDF rendering (core.pdf_utils.write_student_portfolio).
+
+Usage (from the backend directory):
+    python benchmarks/bench_portfolio.py [--sizes 10 100 1000] [--repeat 3] [--evidence photo.jpg]
+                                         [--db /tmp/bench.sqlite3]
+
+The script builds a throwaway database with one student per size, each with
+that many approved achievements, and renders each portfolio to a temporary
+file in its own spawned process. With --evidence, every achievement gets its
+own copy of that image, so the first (cold) render also builds the evidence
+image variants and later (warm) renders reuse them. It reports pages, PDF size,
+cold and best warm render time, pages/sec (warm), SQL queries and the peak
+RSS of that process.
+"""
+
+import argparse
+import datetime
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smart_student_hub.settings")
+
+import django  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000], help="achievements per portfolio")
+    parser.add_argument("--repeat", type=int, default=3, help="renders per portfolio (the first is cold)")
+    parser.add_argument("--evidence", default=None, help="image attached as evidence to every achievement")
+    parser.add_argument("--db", default=None, help="path of the throwaway SQLite database")
+    return parser.parse_args()
+
+
+def use_database(path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = path
+    settings.DATABASES["default"]["TEST"] = {"NAME": path}
+    # Media and derived files live next to the throwaway database
+    workdir = os.path.dirname(path)
+    settings.MEDIA_ROOT = os.path.join(workdir, "media")
+    # DEBUG keeps every executed query in memory, which would swamp the RSS figures
+    settings.DEBUG = False
+    django.setup()
+
+
+def evidence_names(evidence, n, achievements):
+    """Give every achievement its own (hard-linked) copy of the evidence image"""
+    from django.conf import settings
+
+    if not evidence:
+        return [f"achievements/evidence_{i}.pdf" for i in range(achievements)]
+    directory = os.path.join(settings.MEDIA_ROOT, "achievements")
+    os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(evidence)[1]
+    names = []
+    for i in range(achievements):
+        name = f"achievements/bench{n}_{i}{extension}"
+        target = os.path.join(settings.MEDIA_ROOT, name)
+        try:
+            os.link(evidence, target)
+        except OSError:
+            shutil.copyfile(evidence, target)
+        names.append(name)
+    return names
+
+
+def make_student(college, department, approver, n, achievements, evidence):
+    from django.utils import timezone
+    from core.models import Achievement, StudentProfile, User
+
+    user = User.objects.create_student(
+        email=f"bench{n}@bench.local", username=f"bench{n}", college=college,
+        first_name="Bench", last_name=f"Student {n}",
+    )
+    student = StudentProfile.objects.create(
+        user=user, student_id=f"BENCH{n:04d}", department=department,
+        year_of_admission=2024, course="BTech", branch="CSE", phone_number="9876543210",
+    )
+    now = timezone.now()
+    names = evidence_names(evidence, n, achievements)
+    Achievement.objects.bulk_create([
+        Achievement(
+            student=student, college=college, department=department,
+            title=f"Achievement {i}", category="technical",
+            description="Placed in the regional round of the inter-college hackathon. " * 3,
+            date_achieved=datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365),
+            evidence_file=names[i],
+            status="approved", approved_by=approver, approved_at=now,
+        )
+        for i in range(achievements)
+    ])
+    return student.pk
+
+
+def run_render(db_path, student_id, repeat):
+    """Render one portfolio `repeat` times; runs in a fresh process so its peak RSS is its own"""
+    use_database(db_path)
+
+    from django.db import connection
+    from core.models import StudentProfile
+    from core.pdf_utils import write_student_portfolio
+
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    student = StudentProfile.objects.select_related("user__college").get(pk=student_id)
+    timings = []
+    with connection.execute_wrapper(count):
+        for _ in range(repeat):
+            queries = 0
+            with tempfile.TemporaryFile() as output:
+                started = time.perf_counter()
+                pages = write_student_portfolio(student, output)
+                timings.append(time.perf_counter() - started)
+                size = output.tell()
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pages, size, timings[0], min(timings[1:] or timings), queries, peak_kb / 1024
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="vidyasetu-bench-")
+    path = args.db or os.path.join(workdir, "bench.sqlite3")
+    use_database(path)
+
+    from django.db import connection
+    from core.models import College, Department, User
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    college = College.objects.create(name="Bench College", code="BENCH")
+    department = Department.objects.create(name="Computer Science", code="CSE", college=college)
+    approver = User.objects.create_faculty(
+        email="approver@bench.local", username="approver", college=college, department=department,
+        first_name="Bench", last_name="Approver",
+    )
+    students = [
+        make_student(college, department, approver, n, size, args.evidence) for n, size in enumerate(args.sizes)
+    ]
+    connection.close()
+
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'achvmts':>8} {'pages':>6} {'KB':>7} {'cold s':>8} {'warm s':>8} {'pages/s':>8} {'queries':>8} {'peak MB':>8}"
+    )
+
+    for size, student_id in zip(args.sizes, students):
+        with context.Pool(1) as pool:
+            pages, size_bytes, cold, warm, queries, peak_mb = pool.apply(run_render, (path, student_id, args.repeat))
+        print(
+            f"{size:>8} {pages:>6} {size_bytes / 1024:>7.0f} {cold:>8.3f} {warm:>8.3f} {pages / warm:>8.1f} "
+            f"{queries:>8} {peak_mb:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark full-text search (core.search_utils) against the icontains scan it replaces.
+
+Usage (from the backend directory):
+    python benchmarks/bench_search.py [--rows 1000000] [--db /tmp/bench.sqlite3]
+
+The script builds a throwaway database and bulk-loads achievements spread over
+several colleges and departments, with titles and descriptions drawn from a
+synthetic vocabulary (a few very common words, many rare ones). It times
+`rebuild_search_index`, then the search for a principal, a faculty member, a
+student and a superuser, for a rare word, a common word and a prefix, next to
+the same lookup done with icontains filters.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smart_student_hub.settings")
+
+import django  # noqa: E402
+
+COLLEGES = 10
+DEPARTMENTS_PER_COLLEGE = 10
+STUDENTS_PER_DEPARTMENT = 20
+VOCABULARY = 20000
+COMMON_WORDS = 50
+REPEATS = 10
+INSERT_BATCH = 50000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of achievements to load")
+    parser.add_argument("--db", default=None, help="path of the throwaway SQLite database")
+    return parser.parse_args()
+
+
+def setup_database(path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = path
+    settings.DATABASES["default"]["TEST"] = {"NAME": path}
+    # DEBUG keeps every executed query in memory
+    settings.DEBUG = False
+    django.setup()
+
+    from django.db import connection
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+
+
+def make_vocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(VOCABULARY)]
+
+
+def load_data(rows, words, rng):
+    from django.db import connection, transaction
+    from core.models import College, Department, User, StudentProfile
+
+    students = []
+    for c in range(COLLEGES):
+        college = College.objects.create(name=f"Bench College {c}", code=f"BC{c}")
+        for d in range(DEPARTMENTS_PER_COLLEGE):
+            department = Department.objects.create(name=f"Dept {d}", code=f"D{d}", college=college)
+            for s in range(STUDENTS_PER_DEPARTMENT):
+                user = User(
+                    email=f"s{c}_{d}_{s}@bench.local", username=f"s{c}_{d}_{s}",
+                    first_name="Bench", last_name=f"Student {s}",
+                    college=college, role="student", is_student=True,
+                )
+                user.set_unusable_password()
+                students.append((user, college, department))
+    User.objects.bulk_create([user for user, _, _ in students], batch_size=1000)
+    profiles = StudentProfile.objects.bulk_create(
+        [
+            StudentProfile(user=user, student_id=user.username, year_of_admission=2024,
+                           course="BTech", department=department)
+            for user, _, department in students
+        ],
+        batch_size=1000,
+    )
+    student_rows = [
+        (profile.pk, college.pk, department.pk)
+        for profile, (_, college, department) in zip(profiles, students)
+    ]
+
+    common = words[:COMMON_WORDS]
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    sql = (
+        "INSERT INTO core_achievement (student_id, college_id, department_id, title, description, "
+        "category, date_achieved, evidence_file, status, rejection_reason, created_at, updated_at) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+    )
+    with connection.cursor() as cursor:
+        # Durability doesn't matter for a throwaway database
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        for offset in range(0, rows, INSERT_BATCH):
+            batch = []
+            for _ in range(offset, min(offset + INSERT_BATCH, rows)):
+                student_id, college_id, department_id = rng.choice(student_rows)
+                title = " ".join(rng.choices(common, k=2) + rng.choices(words, k=3))
+                description = " ".join(rng.choices(common, k=5) + rng.choices(words, k=20))
+                batch.append((
+                    student_id, college_id, department_id, title, description,
+                    "other", "2024-01-01", "achievements/bench.pdf", "approved", "", now, now,
+                ))
+            with transaction.atomic():
+                cursor.executemany(sql, batch)
+    return profiles
+
+
+def users(profiles):
+    from core.models import User
+
+    profile = profiles[len(profiles) // 2]
+    college_id, department_id = profile.department.college_id, profile.department_id
+    return {
+        "principal": User(role="principal", college_id=college_id),
+        "faculty": User(role="faculty", college_id=college_id, department_id=department_id),
+        "student": profile.user,
+        "superuser": User(role="superuser", is_superuser=True),
+    }
+
+
+def median_ms(func):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    args = parse_args()
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="vidyasetu-bench-"), "bench.sqlite3")
+    setup_database(path)
+
+    from django.core.management import call_command
+    from django.db.models import Q
+    from core.models import Achievement
+    from core.search_utils import search
+
+    rng = random.Random(42)
+    words = make_vocabulary(rng)
+    started = time.perf_counter()
+    profiles = load_data(args.rows, words, rng)
+    print(f"Loaded {args.rows} achievements into {path} in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    call_command("rebuild_search_index", "--kind", "achievement", "--batch-size", "5000", stdout=open(os.devnull, "w"))
+    elapsed = time.perf_counter() - started
+    print(f"Indexed in {elapsed:.1f}s ({args.rows / elapsed:.0f} rows/s)\n")
+
+    queries = {"rare word": words[5000], "common word": words[3], "prefix": words[3][:3]}
+    print(f"{'user':>10} {'query':>12} {'results':>8} {'fts ms':>8} {'icontains ms':>13}")
+    for role, user in users(profiles).items():
+        for label, text in queries.items():
+            results = search(user, text, ["achievement"])
+            fts = median_ms(lambda: search(user, text, ["achievement"]))
+            scan = Achievement.objects.scoped_to(user).filter(
+                Q(title__icontains=text) | Q(description__icontains=text)
+            ).values_list("pk", flat=True)[:20]
+            icontains = median_ms(lambda: list(scan.all()))
+            print(f"{role:>10} {label:>12} {len(results):>8} {fts:>8.1f} {icontains:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark the streaming student importer (core.excel_utils.process_student_excel).
+
+Usage (from the backend directory):
+    python benchmarks/bench_student_import.py [--sizes 1000 10000 50000 200000] [--format xlsx|csv]
+                                              [--db /tmp/bench.sqlite3]
+
+The script builds a throwaway database and, for each size, writes an intake
+file (with a small share of duplicate and invalid rows so the error paths are
+exercised). Each file is imported into a fresh department in its own spawned
+process. The script reports wall time, throughput, SQL queries and the peak
+RSS of that process, which should stay flat as the file grows.
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "smart_student_hub.settings")
+
+import django  # noqa: E402
+
+BAD_ROW_EVERY = 100
+COLUMNS = ["student_id", "email", "username", "first_name", "last_name",
+           "year_of_admission", "course", "branch", "phone_number", "date_of_birth"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000], help="rows per intake file")
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx", help="intake file format")
+    parser.add_argument("--db", default=None, help="path of the throwaway SQLite database")
+    return parser.parse_args()
+
+
+def use_database(path):
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = path
+    settings.DATABASES["default"]["TEST"] = {"NAME": path}
+    # DEBUG keeps every executed query in memory, which would swamp the RSS figures
+    settings.DEBUG = False
+    django.setup()
+
+
+def iter_records(prefix, rows):
+    for i in range(rows):
+        record = [
+            f"{prefix}{i:06d}", f"{prefix.lower()}{i}@bench.local", f"{prefix.lower()}{i}",
+            "Bench", f"Student {i}", 2024, "BTech", "CSE", "9876543210", "2006-01-01",
+        ]
+        if i and i % BAD_ROW_EVERY == 0:
+            # Alternate between an in-file duplicate and an invalid value
+            if (i // BAD_ROW_EVERY) % 2:
+                record[1] = f"{prefix.lower()}0@bench.local"
+            else:
+                record[5] = "unknown"
+        yield record
+
+
+def write_sheet(path, file_format, prefix, rows):
+    """Write the intake file row by row so generating it stays cheap too"""
+    if file_format == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(COLUMNS)
+            writer.writerows(iter_records(prefix, rows))
+        return
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Students")
+    sheet.append(COLUMNS)
+    for record in iter_records(prefix, rows):
+        sheet.append(record)
+    workbook.save(path)
+
+
+def run_import(db_path, sheet_path, college_id, department_id):
+    """Import one file; runs in a fresh process so its peak RSS is its own"""
+    use_database(db_path)
+
+    from django.db import connection
+    from core.excel_utils import process_student_excel
+
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count), open(sheet_path, "rb") as handle:
+        started = time.perf_counter()
+        result = process_student_excel(handle, college_id, department_id, filename=sheet_path)
+        elapsed = time.perf_counter() - started
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result, elapsed, queries, peak_kb / 1024
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="vidyasetu-bench-")
+    path = args.db or os.path.join(workdir, "bench.sqlite3")
+    use_database(path)
+
+    from django.db import connection
+    from core.models import College, Department
+
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    college = College.objects.create(name="Bench College", code="BENCH")
+    connection.close()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'rows':>8} {'created':>8} {'errors':>7} {'total s':>8} {'rows/s':>9} {'queries':>8} {'peak MB':>8}")
+
+    for n, rows in enumerate(args.sizes):
+        department = Department.objects.create(name=f"Intake {rows}", code=f"I{n}", college=college)
+        sheet_path = os.path.join(workdir, f"intake_{rows}.{args.format}")
+        write_sheet(sheet_path, args.format, f"B{n}X", rows)
+        connection.close()
+
+        with context.Pool(1) as pool:
+            result, elapsed, queries, peak_mb = pool.apply(
+                run_import, (path, sheet_path, college.id, department.id)
+            )
+
+        if not result["success"]:
+            raise SystemExit(f"Import failed: {result['error']}")
+        print(
+            f"{rows:>8} {result['created_count']:>8} {result['failed_count']:>7} {elapsed:>8.2f} "
+            f"{rows / elapsed:>9.0f} {queries:>8} {peak_mb:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
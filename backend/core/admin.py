@@ -1,11 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from django.core.exceptions import PermissionDenied
+from django.db.models.expressions import RawSQL
 
-from .models import College, Department, User, StudentProfile, FacultyProfile, Achievement, PermissionRequest, Event, Notification
+from .portfolio_batch import stream_portfolio_zip, PORTFOLIO_BATCH_MAX
+from .search_utils import matching_pks_sql
+from .models import College, Department, User, StudentProfile, FacultyProfile, Achievement, PermissionRequest, Event, Notification, ImportJob, StoredBlob
 
 
 # ------------------ Utility: Generate Student PDF ------------------
@@ -46,6 +50,22 @@ def generate_student_pdf(student):
     return response
 
 
+# ------------------ Full-text admin search ------------------
+class SearchIndexAdminMixin:
+    """
+    Answers the changelist search box from the full-text index (core.search_utils)
+    instead of icontains lookups across joins; search_fields is the fallback
+    where there is no index.
+    """
+    search_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        matching = matching_pks_sql(self.search_kind, search_term)
+        if matching is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=RawSQL(*matching)), False
+
+
 # ------------------ Admin Classes ------------------
 @admin.register(College)
 class CollegeAdmin(admin.ModelAdmin):
@@ -152,7 +172,7 @@ class StudentProfileAdmin(admin.ModelAdmin):
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'student_id']
     ordering = ['student_id']
 
-    actions = ["download_student_pdf"]
+    actions = ["download_student_pdf", "download_portfolios_zip"]
 
     def download_student_pdf(self, request, queryset):
         """Download a student profile as PDF (role-based access)"""
@@ -179,6 +199,26 @@ class StudentProfileAdmin(admin.ModelAdmin):
 
     download_student_pdf.short_description = "Download Student Profile as PDF"
 
+    def download_portfolios_zip(self, request, queryset):
+        """Download the portfolios of the selected students as one ZIP (role-based access)"""
+        students = list(
+            queryset.filter(pk__in=StudentProfile.objects.scoped_to(request.user).values('pk'))
+            .with_portfolio_stats()
+            .order_by('student_id', 'pk')[:PORTFOLIO_BATCH_MAX + 1]
+        )
+        if not students:
+            self.message_user(request, "You don’t have permission to download these students’ portfolios.")
+            return None
+        if len(students) > PORTFOLIO_BATCH_MAX:
+            self.message_user(request, f"Please select at most {PORTFOLIO_BATCH_MAX} students.")
+            return None
+
+        response = StreamingHttpResponse(stream_portfolio_zip(students), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="portfolios_{timezone.localdate().isoformat()}.zip"'
+        return response
+
+    download_portfolios_zip.short_description = "Download Portfolios as ZIP"
+
 
 @admin.register(FacultyProfile)
 class FacultyProfileAdmin(admin.ModelAdmin):
@@ -193,7 +233,8 @@ class FacultyProfileAdmin(admin.ModelAdmin):
 
 
 @admin.register(PermissionRequest)
-class PermissionRequestAdmin(admin.ModelAdmin):
+class PermissionRequestAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    search_kind = 'permission_request'
     list_display = ['title', 'student', 'request_type', 'status', 'created_at']
     list_filter = ['request_type', 'status', 'created_at']
     search_fields = ['title', 'student__user__email', 'student__user__first_name', 'student__user__last_name']
@@ -214,7 +255,8 @@ class PermissionRequestAdmin(admin.ModelAdmin):
 
 
 @admin.register(Achievement)
-class AchievementAdmin(admin.ModelAdmin):
+class AchievementAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    search_kind = 'achievement'
     list_display = ['title', 'student', 'category', 'status', 'date_achieved', 'created_at']
     list_filter = ['status', 'category', 'date_achieved', 'created_at']
     search_fields = ['title', 'student__user__email', 'student__user__first_name', 'student__user__last_name']
@@ -243,7 +285,8 @@ class AchievementAdmin(admin.ModelAdmin):
 
 # ------------------ Event Admin ------------------
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(SearchIndexAdminMixin, admin.ModelAdmin):
+    search_kind = 'event'
     list_display = ['name', 'start_date', 'end_date', 'status', 'created_by', 'college']
     list_filter = ['status', 'start_date', 'end_date', 'college', 'target_departments']
     search_fields = ['name', 'description']
@@ -331,3 +374,36 @@ class NotificationAdmin(admin.ModelAdmin):
     ordering = ['-created_at']
 
     readonly_fields = ['created_at']
+
+
+# ------------------ Import Job Admin ------------------
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'department', 'status', 'processed_rows', 'total_rows', 'created_count', 'failed_count', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['department__name', 'created_by__email']
+    ordering = ['-created_at']
+
+    readonly_fields = ['status', 'total_rows', 'processed_rows', 'created_count', 'failed_count', 'error_file', 'error',
+                       'created_at', 'started_at', 'finished_at']
+
+
+# ------------------ Stored Blob Admin ------------------
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'size', 'ref_count', 'created_at']
+    search_fields = ['name']
+    ordering = ['-created_at']
+
+    readonly_fields = ['name', 'size', 'ref_count', 'created_at']
+
+    # Blobs are created and released with the files that reference them;
+    # editing or deleting one here would leave those files dangling
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
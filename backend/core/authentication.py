@@ -0,0 +1,64 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache_utils import get_cached_user, cache_user
+
+
+class TenantRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's role, college_id and department_id as
+    claims. Access tokens minted from it copy the claims, so tenant lookups
+    can be answered from the token without touching the database.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['college_id'] = user.college_id
+        token['department_id'] = user.department_id
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users through a short-lived user cache
+    (see core.cache_utils) instead of loading the User row on every request.
+    Cached users carry their college and department, so the tenant checks in
+    views and permissions don't query either.
+
+    Tokens whose college_id claim no longer matches the user's college are
+    rejected, so a user moved to another college must sign in again.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.select_related('college', 'department').get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache_user(user)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        if validated_token.get('college_id') != user.college_id:
+            raise AuthenticationFailed(_("The user's college has been changed."), code="college_changed")
+
+        return user
@@ -0,0 +1,70 @@
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+
+
+# ------------------ Principal dashboard summary ------------------
+PRINCIPAL_SUMMARY_TIMEOUT = 300  # seconds; writes invalidate it sooner
+
+
+def principal_summary_key(college_id):
+    return f"principal-summary:{college_id}"
+
+
+def get_principal_summary(college_id):
+    return cache.get(principal_summary_key(college_id))
+
+
+def set_principal_summary(college_id, summary):
+    cache.set(principal_summary_key(college_id), summary, PRINCIPAL_SUMMARY_TIMEOUT)
+
+
+def invalidate_principal_summary(*college_ids):
+    """Drop the cached summary of every given college (None entries are ignored)"""
+    keys = [principal_summary_key(college_id) for college_id in set(college_ids) if college_id]
+    if keys:
+        cache.delete_many(keys)
+
+
+# ------------------ Authenticated user cache ------------------
+USER_CACHE_TIMEOUT = 60  # seconds; User saves invalidate it sooner
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def get_cached_user(user_id):
+    return cache.get(user_cache_key(user_id))
+
+
+def cache_user(user):
+    cache.set(user_cache_key(user.pk), user, USER_CACHE_TIMEOUT)
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+# ------------------ Process-local College cache ------------------
+COLLEGE_CACHE_TIMEOUT = 300  # seconds; other processes rely on this expiry
+
+_college_cache = {}
+
+
+def get_college(college_id):
+    """College row by id, memoized in this process (None if it doesn't exist)"""
+    entry = _college_cache.get(college_id)
+    now = time.monotonic()
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    College = apps.get_model("core", "College")
+    college = College.objects.filter(pk=college_id).first()
+    _college_cache[college_id] = (college, now + COLLEGE_CACHE_TIMEOUT)
+    return college
+
+
+def invalidate_college(college_id):
+    _college_cache.pop(college_id, None)
@@ -1,14 +1,206 @@
+import csv
+import io
+import os
+
 import pandas as pd
+from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from openpyxl import load_workbook
 from .models import User, StudentProfile, College, Department
+from .cache_utils import invalidate_principal_summary
+
+
+REQUIRED_COLUMNS = ['student_id', 'email', 'username', 'first_name', 'last_name',
+                    'year_of_admission', 'course']
+OPTIONAL_COLUMNS = ['branch', 'phone_number', 'date_of_birth']
+
+# Rows read, validated and inserted at a time; each chunk commits on its own
+# so a large import never holds the write lock (or the file) in full
+IMPORT_BATCH_SIZE = 500
+
+# Values per IN (...) lookup, kept under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 900
+
+# Columns whose length is bounded by the model field they are written to
+MAX_LENGTHS = {
+    'student_id': StudentProfile._meta.get_field('student_id').max_length,
+    'username': User._meta.get_field('username').max_length,
+    'first_name': User._meta.get_field('first_name').max_length,
+    'last_name': User._meta.get_field('last_name').max_length,
+    'course': StudentProfile._meta.get_field('course').max_length,
+    'branch': StudentProfile._meta.get_field('branch').max_length,
+    'phone_number': StudentProfile._meta.get_field('phone_number').max_length,
+}
+
+# Columns that must be unique across the file and the database
+UNIQUE_COLUMNS = [('student_id', 'Student ID'), ('email', 'Email'), ('username', 'Username')]
+
+
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Numeric cells (years, phone numbers) come back as floats from some writers
+        return str(int(value))
+    return str(value)
+
+
+def _iter_sheet_rows(file, filename):
+    """
+    Yield the rows of an uploaded sheet one at a time as lists of strings,
+    header first.
+
+    XLSX is read with openpyxl in read-only mode and CSV with the csv module,
+    so only the current row is held in memory.
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            yield from csv.reader(text)
+        finally:
+            text.detach()
+    elif extension in ('.xlsx', ''):
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValidationError(f"Could not read the Excel file: {str(e)}")
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield [_cell_text(value) for value in row]
+        finally:
+            workbook.close()
+    else:
+        raise ValidationError(f"Unsupported file type '{extension}', upload an .xlsx or .csv file")
+
+
+def _iter_chunks(rows, columns, size):
+    """Group data rows into DataFrames of `size` rows, indexed by their row number in the sheet"""
+    numbers = []
+    chunk = []
+    # The header is row 1
+    for number, row in enumerate(rows, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        numbers.append(number)
+        chunk.append(row[:len(columns)] + [''] * (len(columns) - len(row)))
+        if len(chunk) == size:
+            yield pd.DataFrame(chunk, columns=columns, index=numbers)
+            numbers = []
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=columns, index=numbers)
+
+
+def _prepare_chunk(df):
+    """Normalise a chunk's cells and parse its typed columns"""
+    for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS:
+        if column not in df.columns:
+            df[column] = ''
+        df[column] = df[column].fillna('').astype(str).str.strip()
+    df['email'] = df['email'].map(User.objects.normalize_email)
+    df['year_of_admission_value'] = pd.to_numeric(df['year_of_admission'], errors='coerce')
+    df['date_of_birth_value'] = pd.to_datetime(df['date_of_birth'], errors='coerce', format='mixed')
+    return df
+
+
+def _existing(queryset, field, values):
+    """Return the subset of `values` already stored in `field`, one IN query per chunk"""
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        found.update(queryset.filter(**{f'{field}__in': chunk}).values_list(field, flat=True))
+    return found
 
 
-def process_student_excel(file, college_id, department_id):
+def _validate_rows(df, department):
     """
-    Process Excel file for bulk student registration
+    Validate a chunk column-wise.
+
+    Duplicates of rows from earlier chunks need no bookkeeping here: those rows
+    are committed by now, so the database lookups report them as existing.
+    Returns a {index: message} dict with the first problem found for each bad row.
+    """
+    errors = {}
+
+    def flag(mask, message):
+        if isinstance(message, str):
+            message = pd.Series(message, index=df.index)
+        for index, text in message[mask].items():
+            errors.setdefault(index, text)
+
+    for column in REQUIRED_COLUMNS:
+        flag(df[column] == '', f"{column} is required")
+
+    flag(df['year_of_admission_value'].isna() & (df['year_of_admission'] != ''),
+         'year_of_admission must be a number')
+    flag(df['date_of_birth_value'].isna() & (df['date_of_birth'] != ''),
+         'date_of_birth must be a date (YYYY-MM-DD)')
+
+    for column, max_length in MAX_LENGTHS.items():
+        flag(df[column].str.len() > max_length, f"{column} must be at most {max_length} characters")
+
+    # Duplicates within the chunk itself
+    for column, label in UNIQUE_COLUMNS:
+        mask = df.duplicated(column, keep='first') & (df[column] != '')
+        flag(mask, f"{label} " + df[column] + " is duplicated in the file")
+
+    # Duplicates against the database, one IN query per column (chunked)
+    existing_ids = _existing(StudentProfile.objects.filter(department=department), 'student_id', df['student_id'].unique())
+    flag(df['student_id'].isin(existing_ids), "Student ID " + df['student_id'] + " already exists")
+    existing_emails = _existing(User.objects, 'email', df['email'].unique())
+    flag(df['email'].isin(existing_emails), "Email " + df['email'] + " already exists")
+    existing_usernames = _existing(User.objects, 'username', df['username'].unique())
+    flag(df['username'].isin(existing_usernames), "Username " + df['username'] + " already exists")
+
+    return errors
+
+
+def _create_chunk(rows, college, department):
+    """Insert one chunk of validated rows as users and profiles in a single transaction"""
+    # One unusable password per chunk; imported accounts get no password until
+    # the student sets one
+    unusable_password = make_password(None)
+    users = []
+    for row in rows:
+        user = User(
+            email=row.email,
+            username=row.username,
+            college=college,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            role='student',
+            is_student=True,
+            password=unusable_password,
+        )
+        users.append(user)
+
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user,
+                student_id=row.student_id,
+                year_of_admission=int(row.year_of_admission_value),
+                course=row.course,
+                branch=row.branch,
+                department=department,
+                phone_number=row.phone_number,
+                date_of_birth=row.date_of_birth_value.date() if pd.notna(row.date_of_birth_value) else None,
+            )
+            for user, row in zip(users, rows)
+        ])
+
+    return len(users)
+
+
+def process_student_excel(file, college_id, department_id, filename=None, progress=None, error_writer=None):
+    """
+    Process an Excel (.xlsx) or CSV file for bulk student registration
     
-    Expected Excel format:
+    Expected columns:
     - student_id: Student ID (required)
     - email: Email address (required)
     - username: Username (required)
@@ -19,16 +211,25 @@ def process_student_excel(file, college_id, department_id):
     - branch: Branch name (optional)
     - phone_number: Phone number (optional)
     - date_of_birth: Date of birth in YYYY-MM-DD format (optional)
+
+    The file is streamed IMPORT_BATCH_SIZE rows at a time. Each chunk is
+    validated column-wise (required values, types, lengths, duplicates in the
+    file and in the database) and its valid rows inserted with bulk_create in
+    their own transaction, so memory stays bounded whatever the file size.
+
+    Rejected rows are written to `error_writer` (a csv.writer) as
+    (row number, reason) instead of being collected. `progress`, if given, is
+    called as progress(total_rows, processed_rows, created_count, failed_count)
+    after each chunk; total_rows is None until the end of the file.
     """
     
+    rows = _iter_sheet_rows(file, filename or getattr(file, 'name', None))
+    processed_count = created_count = failed_count = 0
     try:
-        # Read Excel file
-        df = pd.read_excel(file)
+        header = [cell.strip() for cell in next(rows, [])]
         
         # Validate required columns
-        required_columns = ['student_id', 'email', 'username', 'first_name', 'last_name', 
-                          'year_of_admission', 'course']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
         if missing_columns:
             raise ValidationError(f"Missing required columns: {', '.join(missing_columns)}")
         
@@ -38,74 +239,55 @@ def process_student_excel(file, college_id, department_id):
             department = Department.objects.get(id=department_id)
         except (College.DoesNotExist, Department.DoesNotExist) as e:
             raise ValidationError(f"Invalid college or department: {str(e)}")
-        
-        # Process each row
-        created_students = []
-        errors = []
-        
-        with transaction.atomic():
-            for index, row in df.iterrows():
+
+        for df in _iter_chunks(rows, header, IMPORT_BATCH_SIZE):
+            df = _prepare_chunk(df)
+            invalid = _validate_rows(df, department)
+            error_rows = sorted(invalid.items())
+            valid = list(df.drop(index=list(invalid)).itertuples())
+            if valid:
                 try:
-                    # Check if student already exists
-                    if StudentProfile.objects.filter(
-                        student_id=row['student_id'], 
-                        department=department
-                    ).exists():
-                        errors.append(f"Row {index + 2}: Student ID {row['student_id']} already exists")
-                        continue
-                    
-                    # Check if user with email already exists
-                    if User.objects.filter(email=row['email']).exists():
-                        errors.append(f"Row {index + 2}: Email {row['email']} already exists")
-                        continue
-                    
-                    # Create user
-                    user = User.objects.create_student(
-                        email=row['email'],
-                        username=row['username'],
-                        college=college,
-                        first_name=row['first_name'],
-                        last_name=row['last_name']
-                    )
-                    
-                    # Create student profile
-                    student_profile = StudentProfile.objects.create(
-                        user=user,
-                        student_id=row['student_id'],
-                        year_of_admission=int(row['year_of_admission']),
-                        course=row['course'],
-                        branch=row.get('branch', ''),
-                        department=department,
-                        phone_number=row.get('phone_number', ''),
-                        date_of_birth=pd.to_datetime(row.get('date_of_birth'), errors='coerce').date() if pd.notna(row.get('date_of_birth')) else None
-                    )
-                    
-                    created_students.append({
-                        'student_id': student_profile.student_id,
-                        'name': user.get_full_name(),
-                        'email': user.email
-                    })
-                    
-                except Exception as e:
-                    errors.append(f"Row {index + 2}: {str(e)}")
-                    continue
+                    created_count += _create_chunk(valid, college, department)
+                except IntegrityError as e:
+                    # Another writer took one of these IDs since validation
+                    error_rows.extend((row.Index, str(e)) for row in valid)
+
+            processed_count += len(df)
+            failed_count += len(error_rows)
+            if error_writer is not None:
+                error_writer.writerows(error_rows)
+            if progress:
+                progress(None, processed_count, created_count, failed_count)
+
+        if progress:
+            progress(processed_count, processed_count, created_count, failed_count)
+        if created_count:
+            # bulk_create skips post_save, so the principal summary is stale now
+            invalidate_principal_summary(college.id)
         
         return {
             'success': True,
-            'created_count': len(created_students),
-            'created_students': created_students,
-            'errors': errors
+            'total_rows': processed_count,
+            'created_count': created_count,
+            'failed_count': failed_count,
         }
         
     except Exception as e:
+        if created_count:
+            invalidate_principal_summary(college_id)
+        # Chunks committed before the failure stay; report what they did
         return {
             'success': False,
-            'error': str(e),
-            'created_count': 0,
-            'created_students': [],
-            'errors': []
+            'error': '; '.join(e.messages) if isinstance(e, ValidationError) else str(e),
+            'total_rows': processed_count,
+            'created_count': created_count,
+            'failed_count': failed_count,
         }
 
+    finally:
+        # Release the workbook / text wrapper while the upload is still open
+        rows.close()
+
 
 def generate_student_excel_template():
     """
@@ -0,0 +1,88 @@
+import csv
+import datetime
+import tempfile
+
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+# Rows fetched per round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+# Bytes per chunk when streaming the finished XLSX file
+XLSX_STREAM_BLOCK = 64 * 1024
+
+# Leading characters that make a spreadsheet read a cell as a formula (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, columns):
+    """Plain tuples for `columns` ([(header, lookup), ...]), fetched in chunks without building model instances"""
+    return queryset.order_by('pk').values_list(*[lookup for _, lookup in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _excel_value(sheet, value):
+    # Excel has no time zones; export datetimes in the local time zone
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).replace(tzinfo=None)
+    if isinstance(value, str):
+        # Control characters are not allowed in the sheet XML; openpyxl refuses to write them
+        value = ILLEGAL_CHARACTERS_RE.sub('', value)
+    if isinstance(value, str) and value.startswith('='):
+        # openpyxl would write it as a formula; keep it a plain string cell
+        cell = WriteOnlyCell(sheet, value)
+        cell.data_type = 's'
+        return cell
+    return value
+
+
+def _csv_value(value):
+    # A leading quote makes spreadsheets show user-entered text instead of evaluating it
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(columns, rows):
+    """Yield the CSV export line by line, header first (with a BOM so Excel detects UTF-8)"""
+    writer = csv.writer(Echo())
+    yield '﻿' + writer.writerow([header for header, _ in columns])
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def stream_xlsx(columns, rows, sheet_title):
+    """
+    Build the XLSX export with a write-only workbook, then yield it in blocks.
+
+    Unlike CSV, the XLSX response is buffered: nothing is sent until every
+    row is written, because the zip container can only be streamed once it is
+    complete. The buffer is a temporary file, and write-only worksheets flush
+    rows to disk as they are appended, so memory stays flat while the first
+    byte waits for the whole export.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append([header for header, _ in columns])
+    for row in rows:
+        sheet.append([_excel_value(sheet, value) for value in row])
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            block = output.read(XLSX_STREAM_BLOCK)
+            if not block:
+                break
+            yield block
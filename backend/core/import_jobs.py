@@ -0,0 +1,87 @@
+import csv
+import io
+import logging
+import tempfile
+import time
+
+from django.core.files import File
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .excel_utils import process_student_excel
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next_job():
+    """
+    Claim the oldest pending import job for this worker, or return None.
+
+    The pending -> running switch is a conditional UPDATE, so concurrent
+    workers never pick up the same job.
+    """
+    candidates = ImportJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        now = timezone.now()
+        if ImportJob.objects.filter(pk=pk, status='pending').update(status='running', started_at=now, updated_at=now):
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def run_import_job(job):
+    """Process a claimed job, recording progress on the row as each chunk commits"""
+    def progress(total_rows, processed_rows, created_count, failed_count):
+        ImportJob.objects.filter(pk=job.pk).update(
+            total_rows=total_rows,
+            processed_rows=processed_rows,
+            created_count=created_count,
+            failed_count=failed_count,
+            updated_at=timezone.now(),
+        )
+
+    # Rejected rows are spooled to disk as they are found: (row number, reason)
+    with tempfile.TemporaryFile() as errors:
+        error_text = io.TextIOWrapper(errors, encoding='utf-8', newline='')
+        error_writer = csv.writer(error_text)
+        error_writer.writerow(['row', 'error'])
+        try:
+            with job.file.open('rb') as file:
+                result = process_student_excel(
+                    file, job.college_id, job.department_id, filename=job.file.name,
+                    progress=progress, error_writer=error_writer,
+                )
+        except Exception as e:
+            logger.exception("Import job %s crashed", job.pk)
+            result = {'success': False, 'error': str(e)}
+
+        job.refresh_from_db(fields=['total_rows', 'processed_rows', 'created_count', 'failed_count'])
+        # A failed job keeps the rows rejected before it stopped
+        if job.failed_count:
+            error_text.flush()
+            errors.seek(0)
+            job.error_file.save(f"import_{job.pk}_errors.csv", File(errors), save=False)
+        if result['success']:
+            job.status = 'completed'
+        else:
+            job.status = 'failed'
+            job.error = result['error']
+        error_text.detach()
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def work(once=False, poll_interval=2.0):
+    """Worker loop: claim and run jobs until stopped (or, with `once`, until the queue is empty)"""
+    while True:
+        close_old_connections()
+        job = claim_next_job()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        logger.info("Running import job %s", job.pk)
+        job = run_import_job(job)
+        logger.info("Import job %s %s: %s created, %s failed", job.pk, job.status, job.created_count, job.failed_count)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+INVITATION_SALT = 'core.invitations'
+
+
+def password_fingerprint(password_hash):
+    """Short keyed digest of the stored password hash; changes once a password is set"""
+    return salted_hmac(INVITATION_SALT, password_hash).hexdigest()[:16]
+
+
+def make_invitation_token(user_id, email, password_hash):
+    """
+    Signed, timestamped onboarding token for an account without a usable password.
+
+    Only an HMAC is computed, so issuing thousands of tokens costs no password
+    hashing. The token embeds a fingerprint of the current (unusable) password,
+    so it stops working once it has been redeemed.
+    """
+    payload = {'u': user_id, 'e': email, 'p': password_fingerprint(password_hash)}
+    return signing.dumps(payload, salt=INVITATION_SALT, compress=True)
+
+
+def read_invitation_token(token):
+    """
+    Verify signature and expiry without touching the database.
+
+    Returns the payload; raises signing.SignatureExpired or signing.BadSignature.
+    """
+    return signing.loads(token, salt=INVITATION_SALT, max_age=settings.STUDENT_INVITATION_MAX_AGE)
+
+
+def invitation_matches(payload, user):
+    """Whether the token was issued for this user's current password state (i.e. not yet redeemed)"""
+    return (
+        user.is_active
+        and not user.has_usable_password()
+        and constant_time_compare(payload['p'], password_fingerprint(user.password))
+    )
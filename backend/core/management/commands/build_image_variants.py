@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.variant_jobs import VARIANT_BATCH_SIZE, work
+
+
+class Command(BaseCommand):
+    help = 'Render sized WebP/JPEG variants of uploaded evidence images and event circulars'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no rows are pending')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when nothing is pending')
+        parser.add_argument('--batch-size', type=int, default=VARIANT_BATCH_SIZE, help='Rows rendered per query')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Starting image variant worker'))
+        work(options['once'], options['poll_interval'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Image variant worker finished'))
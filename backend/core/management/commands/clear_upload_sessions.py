@@ -0,0 +1,33 @@
+import datetime
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import UploadSession
+from core.upload_utils import discard_session
+
+
+class Command(BaseCommand):
+    help = 'Delete upload sessions left idle longer than UPLOAD_SESSION_MAX_AGE, and orphaned partial files'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(seconds=settings.UPLOAD_SESSION_MAX_AGE)
+        expired = 0
+        for session in UploadSession.objects.filter(updated_at__lt=cutoff).iterator():
+            discard_session(session)
+            expired += 1
+
+        # Partial files whose session is gone (e.g. attached while a retry was still writing)
+        orphaned = 0
+        directory = settings.UPLOAD_SESSION_DIR
+        if os.path.isdir(directory):
+            live = {f"{pk}.part" for pk in UploadSession.objects.values_list('pk', flat=True)}
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if name not in live and os.path.getmtime(path) < cutoff.timestamp():
+                    os.remove(path)
+                    orphaned += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {expired} expired upload sessions and {orphaned} orphaned files'))
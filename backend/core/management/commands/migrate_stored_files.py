@@ -0,0 +1,45 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+
+from core.signals import STORED_FILE_FIELDS
+from core.storage import content_hash
+
+
+class Command(BaseCommand):
+    help = 'Move evidence files and supporting documents saved under their upload names into content-addressed storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count the files that would be moved')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        moved = missing = 0
+        legacy_names = set()
+
+        for model, field_name in STORED_FILE_FIELDS.items():
+            storage = model._meta.get_field(field_name).storage
+            rows = model.objects.exclude(**{f'{field_name}__isnull': True}).exclude(**{field_name: ''})
+            for pk, name in rows.values_list('pk', field_name).iterator():
+                if content_hash(name):
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    self.stdout.write(self.style.WARNING(f'{model.__name__} #{pk}: {name} is missing'))
+                    continue
+                moved += 1
+                if dry_run:
+                    continue
+                # One reference per row; update() skips the signals that would release it again
+                with storage.open(name, 'rb') as source:
+                    new_name = storage.save(name, File(source))
+                model.objects.filter(pk=pk).update(**{field_name: new_name})
+                legacy_names.add((storage, name))
+
+        # Every row that used a legacy file now points at its blob
+        for storage, name in legacy_names:
+            os.remove(storage.path(name))
+
+        verb = 'Would move' if dry_run else 'Moved'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {moved} files ({missing} missing)'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.search_utils import (
+    REBUILD_BATCH_SIZE, SEARCH_KINDS, optimize_index, rebuild_index, search_index_available
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index in batches, optionally only for rows updated since a given time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(SEARCH_KINDS), action='append', help='Index only this kind (repeatable)')
+        parser.add_argument('--since', help='Only re-index rows updated at or after this ISO datetime')
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE, help='Rows re-indexed per transaction')
+
+    def handle(self, *args, **options):
+        if not search_index_available():
+            raise CommandError('The full-text search index needs SQLite with FTS5')
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid --since datetime: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        for kind in options['kind'] or SEARCH_KINDS:
+            indexed = 0
+            for indexed in rebuild_index(kind, options['batch_size'], since):
+                self.stdout.write(f'{kind}: {indexed} indexed', ending='\r')
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {indexed} indexed'))
+
+        if since is None:
+            optimize_index()
+            self.stdout.write(self.style.SUCCESS('Index optimized'))
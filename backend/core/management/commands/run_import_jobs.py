@@ -0,0 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from core.import_jobs import work
+from core.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of workers that process pending student import jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker processes')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument(
+            '--requeue-running', action='store_true',
+            help='Put jobs left running by a crashed worker back in the queue first'
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_running']:
+            requeued = ImportJob.objects.filter(status='running').update(status='pending', updated_at=timezone.now())
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} running jobs'))
+
+        workers = options['workers']
+        self.stdout.write(self.style.SUCCESS(f'Starting {workers} import worker(s)'))
+        if workers == 1:
+            work(options['once'], options['poll_interval'])
+            return
+
+        # Children must open their own database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            futures = [pool.submit(work, options['once'], options['poll_interval']) for _ in range(workers)]
+            for future in futures:
+                future.result()
+        self.stdout.write(self.style.SUCCESS('Import workers finished'))
@@ -1,9 +1,180 @@
 from django.db import models
+from django.db.models import Count, Max, Prefetch, Q
 from django.contrib.auth.models import BaseUserManager
 from django.apps import apps
 
 
-class TenantManager(BaseUserManager):
+class TenantScopedQuerySet(models.QuerySet):
+    """
+    Base QuerySet that scopes rows to what a user may see based on their role.
+
+    Subclasses declare how the model reaches its tenant:
+    - college_lookup: lookup to the owning college (used for principals)
+    - department_lookup: lookup to the owning department (used for HODs and
+      faculty); when None, staff are scoped by college instead
+    - owner_lookup: lookup to the owning user (used for students); when None,
+      students see nothing
+
+    and override with_related() with the joins/prefetches their serializer needs.
+    """
+    college_lookup = None
+    department_lookup = None
+    owner_lookup = None
+
+    def with_related(self):
+        return self
+
+    def tenant_scope(self, user):
+        """
+        How rows are scoped for `user`: None when unrestricted (superusers),
+        otherwise (relation, id) with relation "college", "department" or
+        "owner"; an id of None means the user may see no rows.
+        """
+        if user.is_superuser:
+            return None
+
+        if user.role == "principal":
+            relation, value = "college", user.college_id
+        elif user.role in ["hod", "faculty"]:
+            if self.department_lookup:
+                relation, value = "department", user.department_id
+            else:
+                relation, value = "college", user.college_id
+        elif user.role == "student":
+            relation, value = "owner", user.pk
+        else:
+            relation, value = None, None
+
+        if relation is None or getattr(self, f"{relation}_lookup") is None:
+            return relation, None
+        return relation, value
+
+    def scoped_to(self, user):
+        """Apply role scoping only, without the serializer join plan"""
+        scope = self.tenant_scope(user)
+        if scope is None:
+            return self.all()
+
+        relation, value = scope
+        if value is None:
+            return self.none()
+        return self.filter(**{getattr(self, f"{relation}_lookup"): value})
+
+    def visible_to(self, user):
+        """Rows the user may see, joined the way their serializer reads them"""
+        return self.scoped_to(user).with_related()
+
+
+def _college_prefetch(lookup):
+    College = apps.get_model("core", "College")
+    return Prefetch(lookup, queryset=College.objects.with_counts())
+
+
+def _department_prefetch(lookup):
+    Department = apps.get_model("core", "Department")
+    return Prefetch(lookup, queryset=Department.objects.with_counts())
+
+
+class CollegeQuerySet(models.QuerySet):
+    """QuerySet for College with the joins and counts used by CollegeSerializer"""
+
+    def with_counts(self):
+        return self.select_related("principal").annotate(
+            departments_count=Count("departments", distinct=True)
+        )
+
+
+class DepartmentQuerySet(TenantScopedQuerySet):
+    """QuerySet for Department with the joins and counts used by DepartmentSerializer"""
+    college_lookup = "college"
+    department_lookup = "pk"
+
+    def with_counts(self):
+        return self.select_related("college", "hod").annotate(
+            students_count=Count("students", distinct=True),
+            faculty_count=Count("faculty", distinct=True),
+        )
+
+
+class UserQuerySet(TenantScopedQuerySet):
+    """QuerySet for User with the nested college/department data used by UserSerializer"""
+    college_lookup = "college"
+    department_lookup = "department"
+    owner_lookup = "pk"
+
+    def with_tenant_details(self):
+        # Prefetch (rather than select_related) so the related rows can carry
+        # their annotated counts: one query per relation instead of per row.
+        return self.prefetch_related(
+            _college_prefetch("college"),
+            _department_prefetch("department"),
+        )
+
+    def with_related(self):
+        return self.with_tenant_details()
+
+
+class StudentProfileQuerySet(TenantScopedQuerySet):
+    """Tenant-scoped QuerySet for StudentProfile (StudentProfileSerializer)"""
+    college_lookup = "department__college"
+    department_lookup = "department"
+    owner_lookup = "user"
+
+    def with_related(self):
+        return self.select_related("user").prefetch_related(
+            _department_prefetch("department"),
+            _college_prefetch("user__college"),
+            _department_prefetch("user__department"),
+        )
+
+    def with_portfolio_stats(self):
+        """Annotate what core.pdf_utils.portfolio_version needs, so a batch is versioned in one query"""
+        approved = Q(achievements__status="approved")
+        return self.select_related("user__college").annotate(
+            approved_count=Count("achievements", filter=approved),
+            approved_latest=Max("achievements__updated_at", filter=approved),
+        )
+
+
+class AchievementQuerySet(TenantScopedQuerySet):
+    """Tenant-scoped QuerySet for Achievement (AchievementSerializer)"""
+    college_lookup = "college"
+    department_lookup = "department"
+    owner_lookup = "student__user"
+
+    def with_related(self):
+        return self.select_related("student__user", "college", "approved_by")
+
+
+class PermissionRequestQuerySet(TenantScopedQuerySet):
+    """Tenant-scoped QuerySet for PermissionRequest (PermissionRequestSerializer)"""
+    college_lookup = "college"
+    department_lookup = "department"
+    owner_lookup = "student__user"
+
+    def with_related(self):
+        return self.select_related("student__user", "college", "approved_by")
+
+
+class EventQuerySet(TenantScopedQuerySet):
+    """Tenant-scoped QuerySet for Event (EventSerializer); staff see their whole college"""
+    college_lookup = "college"
+
+    def with_related(self):
+        return self.select_related("created_by", "college").prefetch_related("target_departments")
+
+
+class ImportJobQuerySet(TenantScopedQuerySet):
+    """Tenant-scoped QuerySet for ImportJob (ImportJobSerializer)"""
+    college_lookup = "college"
+    department_lookup = "department"
+    owner_lookup = "created_by"
+
+    def with_related(self):
+        return self.select_related("created_by")
+
+
+class TenantManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Custom manager for User model with email as username and college association"""
 
     def create_user(self, email, username, college=None, password=None, **extra_fields):
@@ -65,14 +236,14 @@ class TenantManager(BaseUserManager):
         return self.create_user(email, username, college, password, **extra_fields)
 
 
-class AchievementManager(models.Manager):
+class AchievementManager(models.Manager.from_queryset(AchievementQuerySet)):
     """Custom manager for achievements with tenant filtering"""
 
     def get_queryset(self):
         return super().get_queryset()
 
     def for_tenant(self, college):
-        return self.get_queryset().filter(student__user__college=college)
+        return self.get_queryset().filter(college=college)
 
     def pending_for_tenant(self, college):
         return self.for_tenant(college).filter(status="pending")
@@ -0,0 +1,160 @@
+import mimetypes
+import os
+import re
+import stat
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date
+
+from .storage import content_hash
+
+MEDIA_SIGNATURE_SALT = 'core.media'
+
+# A single byte range; multiple ranges are answered with the whole file
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def media_signature(name, expires):
+    return salted_hmac(MEDIA_SIGNATURE_SALT, f"{expires}:{name}", algorithm='sha256').hexdigest()[:32]
+
+
+def media_url_expiry(now=None):
+    """
+    Expiry timestamp for URLs signed now.
+
+    At least MEDIA_URL_MAX_AGE away, rounded up to MEDIA_URL_ROUNDING, so the
+    same file gets the same URL for a while and browsers can cache it.
+    """
+    now = time.time() if now is None else now
+    rounding = settings.MEDIA_URL_ROUNDING
+    return int((now + settings.MEDIA_URL_MAX_AGE) // rounding + 1) * rounding
+
+
+def signed_media_url(name, request=None):
+    """
+    Short-lived URL of the stored file `name`.
+
+    Anyone holding the URL can open it until it expires: browsers fetch media
+    without the API's Bearer token, so the signature cannot be tied to a tenant.
+    """
+    expires = media_url_expiry()
+    query = urlencode({'e': expires, 's': media_signature(name, expires)})
+    url = f"{default_storage.url(name)}?{query}"
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def verify_media_signature(name, expires, signature):
+    """Whether a media URL was signed by signed_media_url and has not expired; no database access"""
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return constant_time_compare(signature, media_signature(name, expires))
+
+
+class FileRange:
+    """Read-only view of the next `length` bytes of an open file"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _requested_range(request, size, etag, last_modified):
+    """
+    The (start, end) byte range asked for by a Range header, inclusive.
+
+    None means the whole file (no usable Range, an invalid one such as
+    bytes=5-3, or an If-Range validator that no longer matches); an empty
+    range (start > end: a first byte past the end, or bytes=-0) is unsatisfiable.
+    """
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    if not match or not any(match.groups()):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    # If-Range needs a strong validator: a strong ETag or the exact Last-Modified date
+    if if_range and not (if_range == etag and not etag.startswith('W/')) and if_range != http_date(last_modified):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the final `last` bytes
+        return max(size - int(last), 0), size - 1 if int(last) else -1
+    if last and int(last) < int(first):
+        # Not a valid byte-range-spec, so the header is ignored (RFC 9110, 14.2)
+        return None
+    last = min(int(last), size - 1) if last else size - 1
+    return int(first), last
+
+
+def media_response(request, name, max_age=None):
+    """
+    Response for the MEDIA_ROOT file `name`, honouring conditional and Range requests.
+
+    With MEDIA_SENDFILE_HEADER set, only headers are returned and the web server
+    sends the body (X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX for nginx,
+    X-Sendfile with the file path otherwise), Range requests included.
+    """
+    path = default_storage.path(name)
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        raise Http404('File not found')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('File not found')
+
+    size = file_stat.st_size
+    last_modified = int(file_stat.st_mtime)
+    # Content-addressed names carry their sha256, a validator that never goes stale
+    digest = content_hash(name)
+    etag = f'"{digest}"' if digest else f'W/"{last_modified:x}-{size:x}"'
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        header = settings.MEDIA_SENDFILE_HEADER
+        if header == 'X-Accel-Redirect':
+            response = HttpResponse(content_type=content_type)
+            response[header] = quote(f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX}{name}")
+        elif header:
+            response = HttpResponse(content_type=content_type)
+            response[header] = path
+        else:
+            response = _file_response(request, path, size, etag, last_modified, content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = f'private, max-age={max_age}' if max_age else 'private, no-cache'
+    return response
+
+
+def _file_response(request, path, size, etag, last_modified, content_type):
+    requested = _requested_range(request, size, etag, last_modified)
+    if requested is None:
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+
+    start, end = requested
+    if start > end:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(path, 'rb')
+    file.seek(start)
+    response = FileResponse(FileRange(file, end - start + 1), status=206, content_type=content_type)
+    response['Content-Length'] = str(end - start + 1)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
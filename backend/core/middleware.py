@@ -1,19 +1,50 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
 from django.http import HttpResponseForbidden
+from rest_framework_simplejwt.tokens import Token
+
+from .cache_utils import get_college
+
+logger = logging.getLogger(__name__)
 
 
 class TenantMiddleware(MiddlewareMixin):
     """
     Middleware to handle multi-tenancy by setting the current college
     on the request object based on the authenticated user.
+
+    The college is resolved lazily, at most once per request, and only if
+    something reads request.current_college. When JWT authentication
+    authenticated the request, the college id comes from the token's
+    college_id claim (no user lookup); otherwise from the session user. The
+    row itself comes from a process-local cache.
     """
     
     def process_request(self, request):
         """Set the current college on the request object"""
-        request.current_college = None
-        
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            request.current_college = request.user.college
+        request.current_college = SimpleLazyObject(lambda: self.resolve_college(request))
+
+    def resolve_college(self, request):
+        college_id = self.college_id_from_token(request)
+        if college_id is None and hasattr(request, 'user') and request.user.is_authenticated:
+            college_id = request.user.college_id
+        if college_id is None:
+            return None
+        return get_college(college_id)
+
+    def college_id_from_token(self, request):
+        # DRF sets request.auth on the underlying request to the token that authenticated it;
+        # a bearer header on a session-authenticated request is never trusted
+        token = getattr(request, 'auth', None)
+        if not isinstance(token, Token):
+            return None
+        return token.get('college_id')
 
 
 class SuperuserAdminMiddleware(MiddlewareMixin):
@@ -22,6 +53,82 @@ class SuperuserAdminMiddleware(MiddlewareMixin):
     """
     
     def process_request(self, request):
+        # Check the path first so request.user is only evaluated on admin pages
         if request.path.startswith('/admin/'):
             if not (hasattr(request, 'user') and request.user.is_authenticated and request.user.is_superuser):
                 return HttpResponseForbidden("Access denied. Superuser privileges required.")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its query_budget"""
+
+
+def query_budget(budget):
+    """
+    Declare a query budget on a function-based view (class views set `query_budget`).
+
+    The budget is a number, or a dict of numbers keyed by HTTP method.
+    """
+    def decorator(view_func):
+        view_func.query_budget = budget
+        return view_func
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """
+    Middleware to count the SQL queries and DB time of each request.
+
+    The totals are exposed as X-DB-Queries / X-DB-Time (milliseconds) response
+    headers. Requests over budget are logged; the budget is the view's
+    `query_budget` attribute, or QUERY_BUDGET_DEFAULT for views that don't
+    declare one. A view whose methods cost very different amounts can declare
+    a dict keyed by method, e.g. {'GET': 6, 'POST': 15}; methods it leaves out
+    fall back to the default. With QUERY_BUDGET_STRICT enabled (e.g. in tests),
+    a view that declares a budget and exceeds it raises QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {'queries': 0, 'time': 0.0}
+
+        def count_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['queries'] += 1
+                stats['time'] += time.perf_counter() - started
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+
+        response['X-DB-Queries'] = str(stats['queries'])
+        response['X-DB-Time'] = f"{stats['time'] * 1000:.2f}"
+        self.check_budget(request, stats)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        budget = getattr(view_func, 'query_budget', getattr(view_class, 'query_budget', None))
+        if isinstance(budget, dict):
+            budget = budget.get(request.method)
+        request.query_budget = budget
+
+    def check_budget(self, request, stats):
+        declared = getattr(request, 'query_budget', None)
+        budget = declared if declared is not None else getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+        if budget is None or stats['queries'] <= budget:
+            return
+
+        message = (
+            f"{request.method} {request.path} ran {stats['queries']} queries "
+            f"({stats['time'] * 1000:.2f} ms), over its budget of {budget}"
+        )
+        if declared is not None and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_subject_facultyprofile_subjects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='college',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='achievements', to='core.college'),
+        ),
+        migrations.AddField(
+            model_name='achievement',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='achievements', to='core.department'),
+        ),
+        migrations.AddField(
+            model_name='permissionrequest',
+            name='college',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='permission_requests', to='core.college'),
+        ),
+        migrations.AddField(
+            model_name='permissionrequest',
+            name='department',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='permission_requests', to='core.department'),
+        ),
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['college', 'status', 'created_at'], name='core_ach_college_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['department', 'status', 'created_at'], name='core_ach_dept_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='permissionrequest',
+            index=models.Index(fields=['college', 'status', 'created_at'], name='core_perm_college_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='permissionrequest',
+            index=models.Index(fields=['department', 'status', 'created_at'], name='core_perm_dept_status_idx'),
+        ),
+    ]
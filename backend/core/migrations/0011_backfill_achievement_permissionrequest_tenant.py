@@ -0,0 +1,54 @@
+from django.db import migrations, transaction
+
+
+BATCH_SIZE = 2000
+
+
+def backfill_tenant(model):
+    """Copy college/department from the student onto each row, one batch per transaction"""
+
+    def backfill(apps, schema_editor):
+        Model = apps.get_model("core", model)
+        last_pk = 0
+        while True:
+            rows = list(
+                Model.objects.filter(pk__gt=last_pk, college__isnull=True)
+                .order_by("pk")
+                .values_list(
+                    "pk",
+                    "student__department_id",
+                    "student__department__college_id",
+                    "student__user__college_id",
+                )[:BATCH_SIZE]
+            )
+            if not rows:
+                break
+
+            # Group the batch so each distinct tenant is a single UPDATE
+            groups = {}
+            for pk, department_id, department_college_id, user_college_id in rows:
+                college_id = department_college_id if department_id else user_college_id
+                groups.setdefault((college_id, department_id), []).append(pk)
+
+            with transaction.atomic():
+                for (college_id, department_id), pks in groups.items():
+                    Model.objects.filter(pk__in=pks).update(
+                        college_id=college_id, department_id=department_id
+                    )
+            last_pk = rows[-1][0]
+
+    return backfill
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so a large backfill doesn't hold the write lock
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_achievement_permissionrequest_tenant'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tenant("Achievement"), migrations.RunPython.noop),
+        migrations.RunPython(backfill_tenant("PermissionRequest"), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_backfill_achievement_permissionrequest_tenant'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['status', 'created_at'], name='core_ach_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['college', 'status', 'start_date'], name='core_event_college_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='core_notif_user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', 'created_at'], name='core_notif_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='permissionrequest',
+            index=models.Index(fields=['status', 'created_at'], name='core_perm_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['department', 'year_of_admission'], name='core_student_dept_year_idx'),
+        ),
+    ]
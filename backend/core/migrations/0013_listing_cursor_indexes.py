@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['college', 'created_at'], name='core_ach_college_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(fields=['department', 'created_at'], name='core_ach_dept_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='permissionrequest',
+            index=models.Index(fields=['college', 'created_at'], name='core_perm_college_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='permissionrequest',
+            index=models.Index(fields=['department', 'created_at'], name='core_perm_dept_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:14
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_import_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importjob',
+            name='file',
+            field=models.FileField(upload_to='imports/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['xlsx', 'csv'])]),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='evidence_variants',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='circular_variants',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='achievement',
+            index=models.Index(condition=models.Q(('evidence_variants__isnull', True)), fields=['id'], name='core_ach_variants_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('circular_variants__isnull', True)), fields=['id'], name='core_event_variants_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 table behind core.search_utils, filled with the existing rows"""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS core_search USING fts5("
+        "tenant, title, body, people, "
+        "tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    # Rank by bm25 with titles weighted over descriptions and names; tenant tokens don't count
+    schema_editor.execute("INSERT INTO core_search (core_search, rank) VALUES ('rank', 'bm25(0.0, 10.0, 1.0, 2.0)')")
+
+    # One INSERT ... SELECT per kind, building the same documents as core.search_utils:
+    # rowid = pk * 4 + kind code, tenant tokens k<code>, k<code>c<college>, k<code>d<department>, k<code>u<owner>
+    students = apps.get_model("core", "StudentProfile")._meta.db_table
+    users = apps.get_model("core", "User")._meta.db_table
+    for model_name, code in (("Achievement", 1), ("PermissionRequest", 2)):
+        table = apps.get_model("core", model_name)._meta.db_table
+        schema_editor.execute(
+            f"INSERT INTO core_search (rowid, tenant, title, body, people) "
+            f"SELECT r.id * 4 + {code}, "
+            f"'k{code}' || COALESCE(' k{code}c' || r.college_id, '') || COALESCE(' k{code}d' || r.department_id, '') "
+            f"|| ' k{code}u' || u.id, "
+            f"r.title, r.description, u.first_name || ' ' || u.last_name || ' ' || u.email "
+            f"FROM {table} r JOIN {students} s ON s.id = r.student_id JOIN {users} u ON u.id = s.user_id"
+        )
+    events = apps.get_model("core", "Event")._meta.db_table
+    schema_editor.execute(
+        f"INSERT INTO core_search (rowid, tenant, title, body, people) "
+        f"SELECT id * 4 + 3, 'k3 k3c' || college_id, name, description, '' FROM {events}"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS core_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
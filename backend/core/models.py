@@ -1,11 +1,21 @@
 # vidyasetu\backend\core\models.py
 
+import os
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .managers import TenantManager, AchievementManager
+from .cache_utils import invalidate_principal_summary
+from .search_utils import index_student_records
+from .storage import evidence_storage
+from .managers import (
+    TenantManager, AchievementManager, CollegeQuerySet, DepartmentQuerySet,
+    StudentProfileQuerySet, PermissionRequestQuerySet, EventQuerySet, ImportJobQuerySet,
+)
 
 
 class College(models.Model):
@@ -26,6 +36,8 @@ class College(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CollegeQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
 
@@ -49,6 +61,8 @@ class Department(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DepartmentQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
         unique_together = ["code", "college"]
@@ -191,13 +205,53 @@ class StudentProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudentProfileQuerySet.as_manager()
+
     class Meta:
         ordering = ["student_id"]
         unique_together = ["student_id", "department"]
+        indexes = [
+            models.Index(fields=["department", "year_of_admission"], name="core_student_dept_year_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.student_id})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored department so save() can tell when it changes
+        instance._loaded_department_id = instance.__dict__.get("department_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        department_changed = (
+            self.pk is not None
+            and self.department_id != getattr(self, "_loaded_department_id", self.department_id)
+        )
+        super().save(*args, **kwargs)
+        self._loaded_department_id = self.department_id
+
+        # Keep the tenant columns denormalized onto achievements and
+        # permission requests in sync with the student's department
+        if department_changed:
+            college_id, department_id = self.tenant_ids
+            previous_college_ids = set(
+                self.achievements.values_list("college_id", flat=True).distinct()
+            ) | set(self.permission_requests.values_list("college_id", flat=True).distinct())
+            for related in (self.achievements, self.permission_requests):
+                related.update(college_id=college_id, department_id=department_id)
+            # Queryset updates skip post_save, so drop the cached summaries and re-index here
+            invalidate_principal_summary(college_id, *previous_college_ids)
+            index_student_records([self.user_id])
+
+    @property
+    def tenant_ids(self):
+        """(college_id, department_id) for the student's records"""
+        if self.department_id:
+            return self.department.college_id, self.department_id
+        return self.user.college_id, None
+
     @property
     def profile_pdf_filename(self):
         return f"{self.user.username}_profile.pdf"
@@ -246,15 +300,25 @@ class Achievement(models.Model):
     ]
 
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="achievements")
+    # Denormalized from the student so tenant filters don't need to join
+    college = models.ForeignKey(
+        College, on_delete=models.CASCADE, related_name="achievements", null=True, blank=True, editable=False
+    )
+    department = models.ForeignKey(
+        Department, on_delete=models.SET_NULL, related_name="achievements", null=True, blank=True, editable=False
+    )
     title = models.CharField(max_length=200)
     description = models.TextField()
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default="other")
     date_achieved = models.DateField()
     evidence_file = models.FileField(
         upload_to="achievements/",
+        storage=evidence_storage,
         validators=[FileExtensionValidator(allowed_extensions=["pdf", "jpg", "jpeg", "png", "doc", "docx"])],
         help_text="Upload supporting documents (PDF, images, or documents)"
     )
+    # Sized copies of image evidence (core.thumbnail_utils); null until build_image_variants has run
+    evidence_variants = models.JSONField(null=True, blank=True, editable=False)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     approved_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True, related_name="approved_achievements"
@@ -268,13 +332,26 @@ class Achievement(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["college", "status", "created_at"], name="core_ach_college_status_idx"),
+            models.Index(fields=["department", "status", "created_at"], name="core_ach_dept_status_idx"),
+            models.Index(fields=["status", "created_at"], name="core_ach_status_created_idx"),
+            # Cursor-paginated listings ordered by (created_at, id)
+            models.Index(fields=["college", "created_at"], name="core_ach_college_created_idx"),
+            models.Index(fields=["department", "created_at"], name="core_ach_dept_created_idx"),
+            # Rows still waiting for build_image_variants
+            models.Index(
+                fields=["id"], condition=models.Q(evidence_variants__isnull=True), name="core_ach_variants_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.student.user.get_full_name()}"
 
-    @property
-    def college(self):
-        return self.student.user.college
+    def save(self, *args, **kwargs):
+        if self.student_id and self.college_id is None:
+            self.college_id, self.department_id = self.student.tenant_ids
+        super().save(*args, **kwargs)
 
 
 class PermissionRequest(models.Model):
@@ -294,6 +371,13 @@ class PermissionRequest(models.Model):
     student = models.ForeignKey(
         StudentProfile, on_delete=models.CASCADE, related_name="permission_requests"
     )
+    # Denormalized from the student so tenant filters don't need to join
+    college = models.ForeignKey(
+        College, on_delete=models.CASCADE, related_name="permission_requests", null=True, blank=True, editable=False
+    )
+    department = models.ForeignKey(
+        Department, on_delete=models.SET_NULL, related_name="permission_requests", null=True, blank=True, editable=False
+    )
     request_type = models.CharField(max_length=20, choices=REQUEST_TYPE_CHOICES, default="other")
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -301,6 +385,7 @@ class PermissionRequest(models.Model):
     end_date = models.DateField(blank=True, null=True)
     supporting_documents = models.FileField(
         upload_to="permissions/",
+        storage=evidence_storage,
         validators=[FileExtensionValidator(allowed_extensions=["pdf", "jpg", "jpeg", "png", "doc", "docx"])],
         blank=True,
         null=True
@@ -315,12 +400,27 @@ class PermissionRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PermissionRequestQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["college", "status", "created_at"], name="core_perm_college_status_idx"),
+            models.Index(fields=["department", "status", "created_at"], name="core_perm_dept_status_idx"),
+            models.Index(fields=["status", "created_at"], name="core_perm_status_created_idx"),
+            # Cursor-paginated listings ordered by (created_at, id)
+            models.Index(fields=["college", "created_at"], name="core_perm_college_created_idx"),
+            models.Index(fields=["department", "created_at"], name="core_perm_dept_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.student.user.get_full_name()} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        if self.student_id and self.college_id is None:
+            self.college_id, self.department_id = self.student.tenant_ids
+        super().save(*args, **kwargs)
+
 
 class Event(models.Model):
     """Model for college events created by HOD or Principal"""
@@ -337,6 +437,8 @@ class Event(models.Model):
     target_years = models.JSONField(default=list, help_text="List of student years, e.g., [1, 2, 3]")
     target_departments = models.ManyToManyField(Department, related_name="events", blank=True)
     circular_photo = models.ImageField(upload_to="events/", blank=True, null=True, help_text="Upload hard copy circular photo (optional)")
+    # Sized copies of the circular photo (core.thumbnail_utils); null until build_image_variants has run
+    circular_variants = models.JSONField(null=True, blank=True, editable=False)
     created_by = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="created_events",
         limit_choices_to={'role__in': ['hod', 'principal']}
@@ -353,8 +455,16 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["college", "status", "start_date"], name="core_event_college_status_idx"),
+            models.Index(
+                fields=["id"], condition=models.Q(circular_variants__isnull=True), name="core_event_variants_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.college.name} ({self.status})"
@@ -404,6 +514,91 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "is_read", "created_at"], name="core_notif_user_read_idx"),
+            # Unread badge/list: only the unread rows are indexed
+            models.Index(
+                fields=["user", "created_at"], condition=models.Q(is_read=False), name="core_notif_unread_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user.get_full_name()}"
+
+
+class ImportJob(models.Model):
+    """Bulk student import, processed in the background by the run_import_jobs command"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="import_jobs")
+    college = models.ForeignKey(College, on_delete=models.CASCADE, related_name="import_jobs")
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="import_jobs")
+    file = models.FileField(
+        upload_to="imports/",
+        validators=[FileExtensionValidator(allowed_extensions=["xlsx", "csv"])],
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    error_file = models.FileField(upload_to="imports/errors/", blank=True)
+    error = models.TextField(blank=True)  # Why the whole job failed, if it did
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ImportJobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Workers claim the oldest pending job
+            models.Index(fields=["status", "created_at"], name="core_import_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.department.name}) - {self.get_status_display()}"
+
+
+class StoredBlob(models.Model):
+    """Reference count of a file kept by core.storage.ContentAddressedStorage"""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class UploadSession(models.Model):
+    """Resumable chunked upload (core.upload_utils); once complete it can be attached by its id"""
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()  # Declared by the client when the session is created
+    sha256 = models.CharField(max_length=64)  # Declared digest of the whole file, checked on completion
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="uploading")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size}) - {self.get_status_display()}"
+
+    @property
+    def path(self):
+        """Partial file the chunks are appended to"""
+        return os.path.join(settings.UPLOAD_SESSION_DIR, f"{self.pk}.part")
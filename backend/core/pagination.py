@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Cursor pagination over (created_at, id), newest first.
+
+    Cursors encode a position rather than an offset, so pages stay stable
+    while rows are being inserted, and no COUNT(*) query is ever issued.
+    Views can lower the page size cap by setting `max_page_size`.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        view_max_page_size = getattr(view, 'max_page_size', None)
+        if view_max_page_size is not None:
+            self.max_page_size = view_max_page_size
+            self.page_size = min(self.page_size, view_max_page_size)
+        return super().paginate_queryset(queryset, request, view)
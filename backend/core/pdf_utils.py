@@ -1,79 +1,120 @@
-from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.enums import TA_CENTER
 from django.conf import settings
-from django.http import HttpResponse
-from io import BytesIO
+from django.db.models import Count, Max
+from .thumbnail_utils import get_evidence_thumbnail
+import hashlib
 import os
+import shutil
+import tempfile
 
 
-def generate_student_portfolio(student_profile):
+# Styles are built once per process and shared by every render
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_SAMPLE_STYLES['Heading1'],
+    fontSize=24,
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    textColor=colors.darkblue
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_SAMPLE_STYLES['Heading2'],
+    fontSize=16,
+    spaceAfter=12,
+    textColor=colors.darkblue
+)
+
+SUBHEADING_STYLE = ParagraphStyle(
+    'CustomSubHeading',
+    parent=_SAMPLE_STYLES['Heading3'],
+    fontSize=14,
+    spaceAfter=8,
+    textColor=colors.darkgreen
+)
+
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=11,
+    spaceAfter=6
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_SAMPLE_STYLES['Normal'],
+    fontSize=8,
+    alignment=TA_CENTER,
+    textColor=colors.grey
+)
+
+STUDENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+ACHIEVEMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+STUDENT_TABLE_WIDTHS = [2*inch, 4*inch]
+ACHIEVEMENT_TABLE_WIDTHS = [1.5*inch, 4.5*inch]
+
+# Box an evidence thumbnail is scaled into, keeping its aspect ratio
+EVIDENCE_MAX_WIDTH = 3*inch
+EVIDENCE_MAX_HEIGHT = 2.5*inch
+
+
+def write_student_portfolio(student_profile, output):
     """
-    Generate a PDF portfolio for a student containing all their approved achievements
+    Render a student's portfolio of approved achievements straight into `output`
+    (any writable binary file-like object: a file, an HttpResponse, ...).
+
+    Returns the number of pages written.
     """
-    buffer = BytesIO()
-    
     # Create the PDF document
     doc = SimpleDocTemplate(
-        buffer,
+        output,
         pagesize=A4,
         rightMargin=72,
         leftMargin=72,
         topMargin=72,
         bottomMargin=18
     )
-    
-    # Get styles
-    styles = getSampleStyleSheet()
-    
-    # Create custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.darkblue
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        spaceAfter=12,
-        textColor=colors.darkblue
-    )
-    
-    subheading_style = ParagraphStyle(
-        'CustomSubHeading',
-        parent=styles['Heading3'],
-        fontSize=14,
-        spaceAfter=8,
-        textColor=colors.darkgreen
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=6
-    )
-    
+
     # Build the content
     story = []
-    
+
     # Title
-    title = Paragraph("Student Achievement Portfolio", title_style)
-    story.append(title)
+    story.append(Paragraph("Student Achievement Portfolio", TITLE_STYLE))
     story.append(Spacer(1, 20))
-    
+
     # Student Information
-    student_info = Paragraph("Student Information", heading_style)
-    story.append(student_info)
-    
+    story.append(Paragraph("Student Information", HEADING_STYLE))
+
     student_data = [
         ['Name:', f"{student_profile.user.get_full_name()}"],
         ['Student ID:', student_profile.student_id],
@@ -83,39 +124,28 @@ def generate_student_portfolio(student_profile):
         ['Branch:', student_profile.branch or 'N/A'],
         ['Year of Admission:', str(student_profile.year_of_admission)],
     ]
-    
+
     if student_profile.phone_number:
         student_data.append(['Phone:', student_profile.phone_number])
-    
-    student_table = Table(student_data, colWidths=[2*inch, 4*inch])
-    student_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    story.append(student_table)
+
+    story.append(Table(student_data, colWidths=STUDENT_TABLE_WIDTHS, style=STUDENT_TABLE_STYLE))
     story.append(Spacer(1, 20))
-    
-    # Achievements Section
-    achievements = student_profile.achievements.filter(status='approved').order_by('-date_achieved')
-    
-    if achievements.exists():
-        achievements_title = Paragraph("Approved Achievements", heading_style)
-        story.append(achievements_title)
+
+    # Achievements Section: one query, approvers joined in
+    achievements = list(
+        student_profile.achievements.filter(status='approved')
+        .select_related('approved_by')
+        .order_by('-date_achieved')
+    )
+
+    if achievements:
+        story.append(Paragraph("Approved Achievements", HEADING_STYLE))
         story.append(Spacer(1, 12))
-        
+
         for i, achievement in enumerate(achievements, 1):
             # Achievement title
-            achievement_title = Paragraph(f"{i}. {achievement.title}", subheading_style)
-            story.append(achievement_title)
-            
+            story.append(Paragraph(f"{i}. {achievement.title}", SUBHEADING_STYLE))
+
             # Achievement details
             achievement_data = [
                 ['Category:', achievement.get_category_display()],
@@ -123,65 +153,104 @@ def generate_student_portfolio(student_profile):
                 ['Approved By:', achievement.approved_by.get_full_name() if achievement.approved_by else 'N/A'],
                 ['Approved On:', achievement.approved_at.strftime('%B %d, %Y at %I:%M %p') if achievement.approved_at else 'N/A'],
             ]
-            
-            achievement_table = Table(achievement_data, colWidths=[1.5*inch, 4.5*inch])
-            achievement_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightblue),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(achievement_table)
-            
+            story.append(Table(achievement_data, colWidths=ACHIEVEMENT_TABLE_WIDTHS, style=ACHIEVEMENT_TABLE_STYLE))
+
             # Description
-            description = Paragraph(f"<b>Description:</b><br/>{achievement.description}", normal_style)
-            story.append(description)
-            
+            story.append(Paragraph(f"<b>Description:</b><br/>{achievement.description}", NORMAL_STYLE))
+
             # Evidence file info
             if achievement.evidence_file:
-                evidence_info = Paragraph(f"<b>Evidence:</b> {achievement.evidence_file.name}", normal_style)
-                story.append(evidence_info)
-            
+                extension = os.path.splitext(achievement.evidence_file.name)[1].lstrip('.').upper()
+                story.append(Paragraph(f"<b>Evidence:</b> {extension or 'File'} attached", NORMAL_STYLE))
+                thumbnail = get_evidence_thumbnail(achievement)
+                if thumbnail:
+                    story.append(Image(
+                        thumbnail, width=EVIDENCE_MAX_WIDTH, height=EVIDENCE_MAX_HEIGHT,
+                        kind='proportional', hAlign='LEFT'
+                    ))
+
             story.append(Spacer(1, 15))
     else:
-        no_achievements = Paragraph("No approved achievements found.", normal_style)
-        story.append(no_achievements)
-    
+        story.append(Paragraph("No approved achievements found.", NORMAL_STYLE))
+
     # Footer
     story.append(Spacer(1, 30))
-    footer = Paragraph(
-        f"Generated on {student_profile.user.college.name} Student Hub System",
-        ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            alignment=TA_CENTER,
-            textColor=colors.grey
-        )
-    )
-    story.append(footer)
-    
+    story.append(Paragraph(f"Generated on {student_profile.user.college.name} Student Hub System", FOOTER_STYLE))
+
     # Build PDF
     doc.build(story)
-    
-    # Get the value of the BytesIO buffer and write it to the response
-    pdf = buffer.getvalue()
-    buffer.close()
-    
-    return pdf
+    return doc.page
 
 
-def create_pdf_response(pdf_content, filename):
+def portfolio_version(student_profile):
     """
-    Create an HTTP response with PDF content
+    Version of a student's portfolio content.
+
+    Derived from the updated_at of everything the PDF shows (profile, user,
+    college) plus the count and latest updated_at of approved achievements,
+    so any edit, approval, rejection or deletion yields a new version.
+    Profiles loaded with StudentProfile.objects.with_portfolio_stats() carry
+    those figures already; otherwise one aggregate query fetches them.
     """
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    response.write(pdf_content)
-    return response
+    if hasattr(student_profile, 'approved_count'):
+        approved = {'count': student_profile.approved_count, 'latest': student_profile.approved_latest}
+    else:
+        approved = student_profile.achievements.filter(status='approved').aggregate(
+            count=Count('id'), latest=Max('updated_at')
+        )
+    user = student_profile.user
+    parts = [
+        student_profile.pk,
+        student_profile.updated_at.isoformat(),
+        user.updated_at.isoformat(),
+        user.college.updated_at.isoformat() if user.college else '',
+        approved['count'],
+        approved['latest'].isoformat() if approved['latest'] else '',
+    ]
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()[:20]
+
+
+def _portfolio_cache_dir(student_id):
+    return os.path.join(settings.PORTFOLIO_CACHE_DIR, str(student_id))
+
+
+def cached_portfolio_path(student_id, version):
+    """Where the portfolio rendered at `version` lives (the file may not exist yet)"""
+    return os.path.join(_portfolio_cache_dir(student_id), f"{version}.pdf")
+
+
+def get_cached_portfolio(student_profile, version):
+    """
+    Path of the student's portfolio rendered at `version` (see portfolio_version),
+    rendering it only when no file exists for that version yet.
+
+    Files are written atomically and older versions of the same student are
+    removed when a new one is rendered.
+    """
+    directory = _portfolio_cache_dir(student_profile.pk)
+    path = cached_portfolio_path(student_profile.pk, version)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as output:
+        try:
+            write_student_portfolio(student_profile, output)
+        except BaseException:
+            output.close()
+            os.remove(output.name)
+            raise
+    os.replace(output.name, path)
+
+    for name in os.listdir(directory):
+        if name != f"{version}.pdf" and name.endswith('.pdf'):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def invalidate_portfolio_cache(student_id):
+    """Drop every cached portfolio of a student"""
+    shutil.rmtree(_portfolio_cache_dir(student_id), ignore_errors=True)
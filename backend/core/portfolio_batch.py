@@ -0,0 +1,138 @@
+import logging
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import StudentProfile
+from .pdf_utils import cached_portfolio_path, get_cached_portfolio, portfolio_version
+
+logger = logging.getLogger(__name__)
+
+# Students per batch download
+PORTFOLIO_BATCH_MAX = 2000
+
+# Fewer uncached portfolios than this are rendered in-process; starting workers costs more
+POOL_MIN_RENDERS = 8
+
+# Bytes per read when copying a PDF into the archive
+ZIP_COPY_BLOCK = 64 * 1024
+
+
+class ZipStream:
+    """Write-only sink for zipfile; drain() hands back what was written since the last call"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def render_portfolio(student_id):
+    """Process-pool task: render (or reuse) one student's cached portfolio and return its path"""
+    close_old_connections()
+    student_profile = StudentProfile.objects.with_portfolio_stats().get(pk=student_id)
+    return get_cached_portfolio(student_profile, portfolio_version(student_profile))
+
+
+def _render_all(student_ids, workers):
+    """Yield (student_id, path or exception) as each portfolio becomes available"""
+    if workers <= 1 or len(student_ids) < POOL_MIN_RENDERS:
+        for student_id in student_ids:
+            try:
+                yield student_id, render_portfolio(student_id)
+            except Exception as e:
+                yield student_id, e
+        return
+
+    # Spawned children start clean and open their own database connections
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(student_ids)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+    )
+    try:
+        futures = {pool.submit(render_portfolio, student_id): student_id for student_id in student_ids}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+    finally:
+        # An aborted download must not wait for the remaining renders
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def stream_portfolio_zip(student_profiles, workers=None):
+    """
+    Yield a ZIP archive of the given students' portfolios.
+
+    `student_profiles` should come from StudentProfile.objects.with_portfolio_stats().
+    Portfolios already cached for their current version go into the archive
+    first; the rest are rendered in a process pool and written as each one
+    finishes, so the download starts at once and only one block of one PDF is
+    held in memory. Students whose portfolio fails to render are listed in
+    errors.txt at the end of the archive.
+    """
+    workers = settings.PORTFOLIO_BATCH_WORKERS if workers is None else workers
+    sink = ZipStream()
+    names = {}
+    used_names = set()
+    ready = []
+    pending = []
+    for student_profile in student_profiles:
+        name = f"{student_profile.student_id}_portfolio.pdf"
+        if name in used_names:
+            # Student IDs are only unique within a department
+            name = f"{student_profile.student_id}_{student_profile.pk}_portfolio.pdf"
+        names[student_profile.pk] = name
+        used_names.add(name)
+        path = cached_portfolio_path(student_profile.pk, portfolio_version(student_profile))
+        if os.path.exists(path):
+            ready.append((student_profile.pk, path))
+        else:
+            pending.append(student_profile.pk)
+
+    errors = []
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        def add(student_id, path):
+            try:
+                source = open(path, 'rb')
+            except FileNotFoundError:
+                # Superseded by a newer render since it was found; render again
+                source = open(render_portfolio(student_id), 'rb')
+            with source, archive.open(names[student_id], 'w') as entry:
+                while True:
+                    block = source.read(ZIP_COPY_BLOCK)
+                    if not block:
+                        break
+                    entry.write(block)
+                    yield sink.drain()
+
+        for student_id, path in ready:
+            yield from add(student_id, path)
+
+        for student_id, result in _render_all(pending, workers):
+            if isinstance(result, Exception):
+                logger.error("Portfolio for student %s failed: %s", student_id, result)
+                errors.append(f"{names[student_id]}: {result}")
+                continue
+            yield from add(student_id, result)
+
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+    yield sink.drain()
@@ -0,0 +1,257 @@
+import html
+import re
+
+from django.apps import apps
+from django.db import connection, transaction
+
+# SQLite FTS5 table created by migration 0019; other databases have no index
+SEARCH_TABLE = 'core_search'
+
+# Searchable kinds: kind -> (model name, rowid code). Index rows use rowid = pk * 4 + code
+SEARCH_KINDS = {
+    'achievement': ('Achievement', 1),
+    'permission_request': ('PermissionRequest', 2),
+    'event': ('Event', 3),
+}
+ROWID_STRIDE = 4
+
+# Index tokens naming a row's tenants, matched against TenantScopedQuerySet.tenant_scope(). Each token
+# also names the kind (k1c7: achievements of college 7), so a tenant filter only reads its own rows
+TENANT_TOKEN_PREFIXES = {'college': 'c', 'department': 'd', 'owner': 'u'}
+
+STUDENT_RECORD_FIELDS = [
+    'pk', 'title', 'description', 'student__user__first_name', 'student__user__last_name', 'student__user__email',
+    'college_id', 'department_id', 'student__user_id',
+]
+EVENT_FIELDS = ['pk', 'name', 'description', 'college_id']
+
+# Fields whose change needs the row re-indexed (checked against save(update_fields=...))
+INDEXED_FIELDS = {
+    'achievement': {'title', 'description', 'student', 'college', 'department'},
+    'permission_request': {'title', 'description', 'student', 'college', 'department'},
+    'event': {'name', 'description', 'college'},
+}
+
+# Rows re-indexed per transaction by rebuild_index
+REBUILD_BATCH_SIZE = 1000
+# Objects looked up per IN (...) by index_objects, kept under SQLite's bound-parameter limit
+INDEX_CHUNK_SIZE = 900
+
+SEARCH_MAX_TERMS = 10
+SNIPPET_TOKENS = 16
+# Control characters mark matches until the text is escaped, then become <mark> tags
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+
+def search_index_available():
+    return connection.vendor == 'sqlite'
+
+
+def _model(kind):
+    return apps.get_model('core', SEARCH_KINDS[kind][0])
+
+
+def _rowid(kind, pk):
+    return pk * ROWID_STRIDE + SEARCH_KINDS[kind][1]
+
+
+def _tenant_token(kind, relation=None, value=None):
+    token = f"k{SEARCH_KINDS[kind][1]}"
+    return token if relation is None else f"{token}{TENANT_TOKEN_PREFIXES[relation]}{value}"
+
+
+def _tenant_tokens(kind, college_id, department_id=None, owner_id=None):
+    tokens = [_tenant_token(kind)]
+    for relation, value in (('college', college_id), ('department', department_id), ('owner', owner_id)):
+        if value is not None:
+            tokens.append(_tenant_token(kind, relation, value))
+    return ' '.join(tokens)
+
+
+def _documents(kind, queryset):
+    """Index rows (rowid, tenant, title, body, people) for the objects in `queryset`"""
+    if kind == 'event':
+        for pk, name, description, college_id in queryset.values_list(*EVENT_FIELDS):
+            yield _rowid(kind, pk), _tenant_tokens(kind, college_id), name, description, ''
+        return
+    for pk, title, description, first_name, last_name, email, college_id, department_id, owner_id in (
+        queryset.values_list(*STUDENT_RECORD_FIELDS)
+    ):
+        people = f"{first_name} {last_name} {email}"
+        yield _rowid(kind, pk), _tenant_tokens(kind, college_id, department_id, owner_id), title, description, people
+
+
+def _insert(cursor, documents):
+    # FTS5 resolves a rowid conflict by replacing the old row, so this is an upsert
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, tenant, title, body, people) VALUES (%s, %s, %s, %s, %s)",
+        documents,
+    )
+
+
+def index_objects(kind, pks):
+    """(Re-)index the given objects of `kind`; pks that no longer exist are dropped from the index"""
+    pks = list(pks)
+    if not search_index_available():
+        return
+    for start in range(0, len(pks), INDEX_CHUNK_SIZE):
+        chunk = pks[start:start + INDEX_CHUNK_SIZE]
+        documents = list(_documents(kind, _model(kind).objects.filter(pk__in=chunk)))
+        gone = {_rowid(kind, pk) for pk in chunk} - {document[0] for document in documents}
+        with connection.cursor() as cursor:
+            if documents:
+                _insert(cursor, documents)
+            if gone:
+                placeholders = ', '.join(['%s'] * len(gone))
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", list(gone))
+
+
+def index_student_records(user_ids):
+    """Re-index the achievements and permission requests of these students (names or department changed)"""
+    for kind in ('achievement', 'permission_request'):
+        index_objects(kind, _model(kind).objects.filter(student__user_id__in=user_ids).values_list('pk', flat=True))
+
+
+def rebuild_index(kind, batch_size=REBUILD_BATCH_SIZE, since=None):
+    """
+    Re-index every object of `kind` in pk order, one transaction per batch.
+
+    Each batch replaces the index rows of its pk range, which also drops rows
+    of deleted objects, so the index stays searchable throughout. With `since`,
+    only objects updated after it are re-indexed. Yields the running count.
+    """
+    queryset = _model(kind).objects.order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    code = SEARCH_KINDS[kind][1]
+    last_pk = 0
+    done = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            break
+        if since is not None:
+            index_objects(kind, batch)
+        else:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {SEARCH_TABLE} WHERE rowid > %s AND rowid <= %s AND rowid %% {ROWID_STRIDE} = %s",
+                    [_rowid(kind, last_pk), _rowid(kind, batch[-1]), code],
+                )
+                _insert(cursor, _documents(kind, _model(kind).objects.filter(pk__in=batch)))
+        last_pk = batch[-1]
+        done += len(batch)
+        yield done
+
+    if since is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid > %s AND rowid %% {ROWID_STRIDE} = %s",
+                [_rowid(kind, last_pk), code],
+            )
+
+
+def optimize_index():
+    """Merge the index b-trees into one, which keeps queries fast after large rebuilds"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def match_expression(query):
+    """
+    FTS5 query for free text: each word must match (as a phrase of its tokens),
+    the last one as a prefix so results follow the user's typing. None if the
+    text has no searchable words.
+    """
+    phrases = []
+    for word in query.split():
+        tokens = re.findall(r'\w+', word)
+        if tokens:
+            phrases.append('"' + ' '.join(tokens) + '"')
+    if not phrases:
+        return None
+    phrases = phrases[:SEARCH_MAX_TERMS]
+    phrases[-1] += '*'
+    return '{title body people} : (' + ' AND '.join(phrases) + ')'
+
+
+def tenant_expression(user, kinds):
+    """
+    FTS5 filter on the tenant column for the rows of `kinds` the user may see:
+    '' when none is needed (superusers), None when there are no such rows.
+    """
+    clauses = []
+    unrestricted = True
+    for kind in kinds:
+        scope = _model(kind).objects.all().tenant_scope(user)
+        if scope is None:
+            clauses.append(f'"{_tenant_token(kind)}"')
+            continue
+        unrestricted = False
+        relation, value = scope
+        if value is not None:
+            clauses.append(f'"{_tenant_token(kind, relation, value)}"')
+    if unrestricted:
+        # Kinds are filtered by rowid instead, which avoids reading the kind-wide token
+        return ''
+    if not clauses:
+        return None
+    return 'tenant : (' + ' OR '.join(clauses) + ') AND '
+
+
+def _kinds_condition(kinds):
+    codes = ', '.join(str(SEARCH_KINDS[kind][1]) for kind in kinds)
+    return f"rowid %% {ROWID_STRIDE} IN ({codes})"
+
+
+def _marked(text):
+    return html.escape(text).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search(user, query, kinds=None, limit=20):
+    """
+    Best matches for `query` among the records `user` may see, ranked by bm25.
+
+    Returns [{'kind', 'id', 'title', 'snippet', 'score'}]; title and snippet are
+    HTML-escaped with matches wrapped in <mark>. Scoping happens inside the
+    full-text query, mirroring TenantScopedQuerySet.scoped_to.
+    """
+    kinds = kinds or list(SEARCH_KINDS)
+    text = match_expression(query)
+    tenant = tenant_expression(user, kinds)
+    if text is None or tenant is None:
+        return []
+    codes = {code: kind for kind, (_, code) in SEARCH_KINDS.items()}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, highlight({SEARCH_TABLE}, 1, %s, %s), "
+            f"snippet({SEARCH_TABLE}, 2, %s, %s, '…', {SNIPPET_TOKENS}), rank "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND {_kinds_condition(kinds)} "
+            f"ORDER BY rank LIMIT %s",
+            [_MARK_START, _MARK_END, _MARK_START, _MARK_END, tenant + text, limit],
+        )
+        rows = cursor.fetchall()
+    return [
+        {
+            'kind': codes[rowid % ROWID_STRIDE],
+            'id': rowid // ROWID_STRIDE,
+            'title': _marked(title),
+            'snippet': _marked(snippet),
+            'score': round(-rank, 4),
+        }
+        for rowid, title, snippet, rank in rows
+    ]
+
+
+def matching_pks_sql(kind, query):
+    """
+    (sql, params) selecting the pks of `kind` whose text matches `query`, for
+    use in pk__in filters (admin search); None without an index or searchable words.
+    """
+    text = match_expression(query)
+    if text is None or not search_index_available():
+        return None
+    return (
+        f"SELECT rowid / {ROWID_STRIDE} FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND {_kinds_condition([kind])}",
+        [text],
+    )
@@ -1,7 +1,43 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from .models import College, Department, User, StudentProfile, FacultyProfile, Achievement, PermissionRequest, Event, EventPermissionRequest, Subject
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.core.validators import FileExtensionValidator
+from django.db import models, transaction
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .authentication import TenantRefreshToken
+from .models import College, Department, User, StudentProfile, FacultyProfile, Achievement, PermissionRequest, Event, EventPermissionRequest, Subject, ImportJob, UploadSession
+from .media_utils import signed_media_url
+from .upload_utils import UploadedSessionFile, UPLOAD_ALLOWED_EXTENSIONS, remove_session_file
+
+
+class SignedMediaURLMixin:
+    """Represents a stored file by a short-lived signed URL"""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return signed_media_url(value.name, self.context.get('request'))
+
+
+class SignedFileField(SignedMediaURLMixin, serializers.FileField):
+    pass
+
+
+class SignedImageField(SignedMediaURLMixin, serializers.ImageField):
+    pass
+
+
+class TenantMediaSerializer(serializers.ModelSerializer):
+    """ModelSerializer whose file fields are returned as signed media URLs"""
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: SignedFileField,
+        models.ImageField: SignedImageField,
+    }
 
 
 class CollegeSerializer(serializers.ModelSerializer):
@@ -16,6 +52,9 @@ class CollegeSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
     
     def get_departments_count(self, obj):
+        # Use the count annotated by College.objects.with_counts() when available
+        if hasattr(obj, 'departments_count'):
+            return obj.departments_count
         return obj.departments.count()
 
 
@@ -33,9 +72,14 @@ class DepartmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
     
     def get_students_count(self, obj):
+        # Use the count annotated by Department.objects.with_counts() when available
+        if hasattr(obj, 'students_count'):
+            return obj.students_count
         return obj.students.count()
     
     def get_faculty_count(self, obj):
+        if hasattr(obj, 'faculty_count'):
+            return obj.faculty_count
         return obj.faculty.count()
 
 
@@ -51,6 +95,11 @@ class SubjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 
+class TenantTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair serializer issuing tokens with role/college/department claims"""
+    token_class = TenantRefreshToken
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for user registration"""
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -180,7 +229,7 @@ class FacultyProfileSerializer(serializers.ModelSerializer):
         return value
 
 
-class PermissionRequestSerializer(serializers.ModelSerializer):
+class PermissionRequestSerializer(TenantMediaSerializer):
     """Serializer for PermissionRequest model"""
     student_name = serializers.CharField(source='student.user.get_full_name', read_only=True)
     college_name = serializers.CharField(source='college.name', read_only=True)
@@ -198,12 +247,73 @@ class PermissionRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'approved_by_name', 'approved_at', 'rejection_reason', 'created_at', 'updated_at']
 
 
-class PermissionRequestCreateSerializer(serializers.ModelSerializer):
+class UploadSessionField(serializers.PrimaryKeyRelatedField):
+    """A completed upload session of the requesting user, given by its id"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('pk_field', serializers.UUIDField())
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.context['request'].user, status='complete')
+
+
+class UploadAttachMixin:
+    """
+    Lets a create serializer take a completed upload session in place of a raw file.
+
+    `upload_fields` maps each upload-id field to the file field it fills. The
+    session is claimed (deleted) in the same transaction as the create, so it
+    can be attached only once; its file is moved into storage through a hard
+    link, and the session's own copy is removed only once that transaction commits.
+    """
+    upload_fields = {}
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        for upload_field, file_field in self.upload_fields.items():
+            if upload_field not in attrs:
+                continue
+            if attrs.get(file_field):
+                raise serializers.ValidationError({upload_field: f"Send either '{upload_field}' or '{file_field}'"})
+            # The raw file field runs the model's validators; apply them to the uploaded file name too
+            try:
+                for validator in self.Meta.model._meta.get_field(file_field).validators:
+                    validator(File(None, name=attrs[upload_field].filename))
+            except DjangoValidationError as e:
+                raise serializers.ValidationError({upload_field: e.messages})
+        return attrs
+
+    def create(self, validated_data):
+        files = []
+        try:
+            with transaction.atomic():
+                for upload_field, file_field in self.upload_fields.items():
+                    session = validated_data.pop(upload_field, None)
+                    if session is None:
+                        continue
+                    if not UploadSession.objects.filter(pk=session.pk, status='complete').delete()[0]:
+                        raise serializers.ValidationError({upload_field: ['Upload was already attached']})
+                    files.append(UploadedSessionFile(session))
+                    validated_data[file_field] = files[-1]
+                    transaction.on_commit(lambda path=session.path: remove_session_file(path))
+                return super().create(validated_data)
+        finally:
+            for file in files:
+                file.close()
+
+
+class PermissionRequestCreateSerializer(UploadAttachMixin, TenantMediaSerializer):
     """Serializer for creating permission requests"""
-    
+    supporting_documents_upload = UploadSessionField(required=False, write_only=True)
+    upload_fields = {'supporting_documents_upload': 'supporting_documents'}
+
     class Meta:
         model = PermissionRequest
-        fields = ['request_type', 'title', 'description', 'start_date', 'end_date', 'supporting_documents']
+        fields = [
+            'request_type', 'title', 'description', 'start_date', 'end_date', 'supporting_documents',
+            'supporting_documents_upload'
+        ]
     
     def create(self, validated_data):
         # Get the student profile from the authenticated user
@@ -233,45 +343,79 @@ class PermissionRequestUpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class AchievementSerializer(serializers.ModelSerializer):
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Variant URLs of an image field, keyed by size: {'thumb': {'width', 'height', 'webp', 'jpeg'}, ...}.
+
+    null while the variants are still being rendered, {} when there are none.
+    The URLs are signed like SignedFileField's.
+    """
+
+    def to_representation(self, variants):
+        if not variants:
+            return variants
+        request = self.context.get('request')
+        return {
+            label: {
+                **variant,
+                'webp': signed_media_url(variant['webp'], request),
+                'jpeg': signed_media_url(variant['jpeg'], request),
+            }
+            for label, variant in variants.items()
+        }
+
+
+class AchievementSerializer(TenantMediaSerializer):
     """Serializer for Achievement model"""
     student_name = serializers.CharField(source='student.user.get_full_name', read_only=True)
     college_name = serializers.CharField(source='college.name', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
     category_display = serializers.CharField(source='get_category_display', read_only=True)
+    evidence_variants = ImageVariantsField()
     
     class Meta:
         model = Achievement
         fields = [
             'id', 'title', 'description', 'category', 'category_display', 'date_achieved', 
-            'evidence_file', 'status', 'student_name', 'college_name',
+            'evidence_file', 'evidence_variants', 'status', 'student_name', 'college_name',
             'approved_by_name', 'approved_at', 'rejection_reason', 
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'status', 'approved_by_name', 'approved_at', 'rejection_reason', 'created_at', 'updated_at']
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(TenantMediaSerializer):
     """Serializer for Event model"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     college_name = serializers.CharField(source='college.name', read_only=True)
+    circular_variants = ImageVariantsField()
     
     class Meta:
         model = Event
         fields = [
             'id', 'name', 'description', 'start_date', 'end_date', 'target_years', 'target_departments',
-            'circular_photo', 'created_by', 'created_by_name', 'college', 'college_name', 'status',
+            'circular_photo', 'circular_variants', 'created_by', 'created_by_name', 'college', 'college_name', 'status',
             'approved_by', 'approved_at', 'rejection_reason', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_by_name', 'college_name', 'status', 'approved_by', 'approved_at', 'rejection_reason', 'created_at', 'updated_at']
 
 
-class AchievementCreateSerializer(serializers.ModelSerializer):
+class AchievementCreateSerializer(UploadAttachMixin, TenantMediaSerializer):
     """Serializer for creating achievements"""
-    
+    evidence_upload = UploadSessionField(required=False, write_only=True)
+    upload_fields = {'evidence_upload': 'evidence_file'}
+
     class Meta:
         model = Achievement
-        fields = ['title', 'description', 'category', 'date_achieved', 'evidence_file']
+        fields = ['title', 'description', 'category', 'date_achieved', 'evidence_file', 'evidence_upload']
+        # Either the file itself or a completed upload session is required (checked in validate)
+        extra_kwargs = {'evidence_file': {'required': False}}
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if not attrs.get('evidence_file') and 'evidence_upload' not in attrs:
+            raise serializers.ValidationError({'evidence_file': ['This field is required.']})
+        return attrs
     
     def create(self, validated_data):
         # Get the student profile from the authenticated user
@@ -301,6 +445,158 @@ class AchievementUpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class StudentSyncRecordSerializer(serializers.Serializer):
+    """One roster record pushed by the student information system, keyed by (student_id, department)"""
+    student_id = serializers.CharField(max_length=50)
+    department = serializers.IntegerField()
+    email = serializers.EmailField()
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    year_of_admission = serializers.IntegerField()
+    course = serializers.CharField(max_length=100)
+    # Optional fields are only compared and written when the record includes them
+    branch = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    phone_number = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    date_of_birth = serializers.DateField(required=False, allow_null=True)
+    address = serializers.CharField(required=False, allow_blank=True)
+
+
+class InvitationRedeemSerializer(serializers.Serializer):
+    """Serializer for a student setting their first password from an invitation"""
+    token = serializers.CharField()
+    password = serializers.CharField(write_only=True, validators=[validate_password])
+    password_confirm = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        if attrs['password'] != attrs['password_confirm']:
+            raise serializers.ValidationError("Passwords don't match")
+        return attrs
+
+
+class ImportJobSerializer(TenantMediaSerializer):
+    """Progress of a background student import"""
+    department_name = serializers.CharField(source='department.name', read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'status', 'college', 'department', 'department_name', 'total_rows', 'processed_rows',
+                  'created_count', 'failed_count', 'error_file', 'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Resumable upload session: declared on creation, then filled chunk by chunk"""
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'sha256', 'received', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'received', 'status', 'created_at', 'updated_at']
+
+    def validate_filename(self, value):
+        try:
+            FileExtensionValidator(allowed_extensions=UPLOAD_ALLOWED_EXTENSIONS)(File(None, name=value))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return value
+
+    def validate_size(self, value):
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Uploads are limited to {settings.UPLOAD_MAX_SIZE} bytes")
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if len(value) != 64 or any(char not in '0123456789abcdef' for char in value):
+            raise serializers.ValidationError("Must be the hex sha256 digest of the whole file")
+        return value
+
+
+class BulkReviewFilterSerializer(serializers.Serializer):
+    """Criteria selecting the pending items of a bulk review; at least one, and no unknown keys"""
+    student = serializers.IntegerField(required=False)
+    department = serializers.IntegerField(required=False)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = sorted(set(data) - set(self.fields))
+            if unknown:
+                raise serializers.ValidationError({field: ['Unsupported filter field'] for field in unknown})
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError(f"Provide at least one of: {', '.join(self.fields)}")
+        return attrs
+
+
+class AchievementReviewFilterSerializer(BulkReviewFilterSerializer):
+    category = serializers.ChoiceField(choices=Achievement.CATEGORY_CHOICES, required=False)
+
+
+class PermissionRequestReviewFilterSerializer(BulkReviewFilterSerializer):
+    request_type = serializers.ChoiceField(choices=PermissionRequest.REQUEST_TYPE_CHOICES, required=False)
+
+
+class BulkReviewSerializer(serializers.Serializer):
+    """Input for bulk approve/reject: either a list of IDs or a filter over pending items"""
+    MAX_ITEMS = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_ITEMS
+    )
+    filter = BulkReviewFilterSerializer(required=False)
+    status = serializers.ChoiceField(choices=['approved', 'rejected'])
+    rejection_reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'")
+        return attrs
+
+
+class AchievementBulkReviewSerializer(BulkReviewSerializer):
+    filter = AchievementReviewFilterSerializer(required=False)
+
+
+class PermissionRequestBulkReviewSerializer(BulkReviewSerializer):
+    filter = PermissionRequestReviewFilterSerializer(required=False)
+
+
+class PortfolioBatchSerializer(serializers.Serializer):
+    """Selection for a batch portfolio download: student IDs, or a department and/or admission year"""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    department = serializers.IntegerField(required=False)
+    year_of_admission = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Provide 'ids', 'department' or 'year_of_admission'")
+        return attrs
+
+
+class ScopedDepartmentField(serializers.PrimaryKeyRelatedField):
+    """A department the requesting user can see, given by its id"""
+
+    def get_queryset(self):
+        return Department.objects.scoped_to(self.context['request'].user)
+
+
+class StudentInvitationSerializer(serializers.Serializer):
+    """Selection of students to invite: a list of student profile IDs or a department"""
+    MAX_ITEMS = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=MAX_ITEMS
+    )
+    department = ScopedDepartmentField(required=False)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('department' in attrs):
+            raise serializers.ValidationError("Provide either 'ids' or 'department'")
+        return attrs
+
+
 class EventPermissionRequestSerializer(serializers.ModelSerializer):
     """Serializer for EventPermissionRequest model"""
     event_name = serializers.CharField(source='event.name', read_only=True)
@@ -0,0 +1,157 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+
+from .cache_utils import invalidate_principal_summary, invalidate_cached_user, invalidate_college
+from .models import College, Department, User, StudentProfile, Achievement, PermissionRequest, Event
+from .pdf_utils import invalidate_portfolio_cache
+from .search_utils import INDEXED_FIELDS, index_objects, index_student_records
+from .thumbnail_utils import delete_image_variants
+from .variant_jobs import IMAGE_VARIANT_FIELDS
+
+
+def _college_id(instance):
+    if isinstance(instance, College):
+        return instance.pk
+    return instance.college_id
+
+
+def invalidate_college_summary(sender, instance, **kwargs):
+    """Any write to a model shown on the principal dashboard drops its cached summary"""
+    invalidate_principal_summary(_college_id(instance))
+
+
+for model in (College, Department, User, Achievement, PermissionRequest, Event):
+    post_save.connect(invalidate_college_summary, sender=model, dispatch_uid=f"summary-save-{model.__name__}")
+    post_delete.connect(invalidate_college_summary, sender=model, dispatch_uid=f"summary-delete-{model.__name__}")
+
+
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Authenticated users are cached by core.authentication; drop stale copies on write"""
+    invalidate_cached_user(instance.pk)
+
+
+post_save.connect(invalidate_user_cache, sender=User, dispatch_uid="user-cache-save")
+post_delete.connect(invalidate_user_cache, sender=User, dispatch_uid="user-cache-delete")
+
+
+def invalidate_college_cache(sender, instance, **kwargs):
+    invalidate_college(instance.pk)
+
+
+post_save.connect(invalidate_college_cache, sender=College, dispatch_uid="college-cache-save")
+post_delete.connect(invalidate_college_cache, sender=College, dispatch_uid="college-cache-delete")
+
+
+def invalidate_student_portfolio(sender, instance, **kwargs):
+    """Cached portfolio PDFs are keyed by content version; drop the superseded files eagerly"""
+    invalidate_portfolio_cache(instance.pk if isinstance(instance, StudentProfile) else instance.student_id)
+
+
+for model in (StudentProfile, Achievement):
+    post_save.connect(invalidate_student_portfolio, sender=model, dispatch_uid=f"portfolio-save-{model.__name__}")
+    post_delete.connect(invalidate_student_portfolio, sender=model, dispatch_uid=f"portfolio-delete-{model.__name__}")
+
+# File fields kept in core.storage.ContentAddressedStorage, whose blobs are reference counted
+STORED_FILE_FIELDS = {Achievement: 'evidence_file', PermissionRequest: 'supporting_documents'}
+
+
+def _release_blob(storage, name):
+    storage.delete(name)
+    # Variants are shared by every row holding the blob, so they go with its last reference
+    if not storage.exists(name):
+        delete_image_variants(name)
+
+
+def _release_stored_file(storage, name):
+    """Drop a reference to a stored blob once the surrounding transaction commits"""
+    if name:
+        transaction.on_commit(lambda: _release_blob(storage, name))
+
+
+def release_replaced_file(sender, instance, **kwargs):
+    """A newly assigned file takes its own reference; release the one held by the replaced file"""
+    field_file = getattr(instance, STORED_FILE_FIELDS[sender])
+    if instance.pk is None or not field_file or field_file._committed:
+        return
+    old_name = sender.objects.filter(pk=instance.pk).values_list(STORED_FILE_FIELDS[sender], flat=True).first()
+    _release_stored_file(field_file.storage, old_name)
+
+
+def release_deleted_file(sender, instance, **kwargs):
+    field_file = getattr(instance, STORED_FILE_FIELDS[sender])
+    _release_stored_file(field_file.storage, field_file.name)
+
+
+for model in STORED_FILE_FIELDS:
+    pre_save.connect(release_replaced_file, sender=model, dispatch_uid=f"stored-file-replace-{model.__name__}")
+    post_delete.connect(release_deleted_file, sender=model, dispatch_uid=f"stored-file-delete-{model.__name__}")
+
+
+def _release_image_variants(sender, instance):
+    """Drop the variants of the file a saved row held, once the surrounding transaction commits"""
+    file_field, variants_field = IMAGE_VARIANT_FIELDS[sender]
+    # Stored blobs are shared, so their variants go with the last reference (_release_blob);
+    # a row whose variants are {} held no image
+    if sender in STORED_FILE_FIELDS or instance.pk is None or getattr(instance, variants_field) == {}:
+        return
+    old_name = sender.objects.filter(pk=instance.pk).values_list(file_field, flat=True).first()
+    if old_name:
+        transaction.on_commit(lambda: delete_image_variants(old_name))
+
+
+def reset_image_variants(sender, instance, **kwargs):
+    """A newly assigned image needs new variants; build_image_variants picks up rows left null"""
+    file_field, variants_field = IMAGE_VARIANT_FIELDS[sender]
+    field_file = getattr(instance, file_field)
+    if field_file and field_file._committed:
+        return
+    _release_image_variants(sender, instance)
+    setattr(instance, variants_field, None if field_file else {})
+
+
+def release_deleted_image_variants(sender, instance, **kwargs):
+    file_field, _ = IMAGE_VARIANT_FIELDS[sender]
+    name = getattr(instance, file_field).name
+    if sender not in STORED_FILE_FIELDS and name:
+        transaction.on_commit(lambda: delete_image_variants(name))
+
+
+for model in IMAGE_VARIANT_FIELDS:
+    pre_save.connect(reset_image_variants, sender=model, dispatch_uid=f"image-variants-reset-{model.__name__}")
+    post_delete.connect(
+        release_deleted_image_variants, sender=model, dispatch_uid=f"image-variants-delete-{model.__name__}"
+    )
+
+# Models kept in the full-text index (core.search_utils), by index kind
+SEARCH_INDEXED_MODELS = {Achievement: 'achievement', PermissionRequest: 'permission_request', Event: 'event'}
+
+
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    kind = SEARCH_INDEXED_MODELS[sender]
+    if update_fields is None or INDEXED_FIELDS[kind] & set(update_fields):
+        index_objects(kind, [instance.pk])
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    # The object is gone, so indexing its pk only deletes the index row
+    index_objects(SEARCH_INDEXED_MODELS[sender], [instance.pk])
+
+
+for model in SEARCH_INDEXED_MODELS:
+    post_save.connect(update_search_index, sender=model, dispatch_uid=f"search-save-{model.__name__}")
+    post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f"search-delete-{model.__name__}")
+
+
+def update_student_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """Student names and emails are indexed with their achievements and permission requests"""
+    if created or instance.role != 'student':
+        return
+    if update_fields is None or {'first_name', 'last_name', 'email'} & set(update_fields):
+        index_student_records([instance.pk])
+
+
+post_save.connect(update_student_search_index, sender=User, dispatch_uid="search-save-student")
+
+m2m_changed.connect(
+    invalidate_college_summary, sender=Event.target_departments.through, dispatch_uid="summary-event-departments"
+)
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.apps import apps
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+# Directory (under the storage root) where uploads are spooled while being hashed
+INCOMING_DIR = '.incoming'
+
+CONTENT_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(?:\.\w+)?$')
+
+
+def content_hash(name):
+    """sha256 of a content-addressed file, read from its name (None for other names)"""
+    match = CONTENT_NAME_RE.search(name or '')
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that keeps each distinct upload once.
+
+    Uploads are hashed while they are streamed to a spool file (or in place
+    when they are already on disk) and stored as <upload_to>/<aa>/<bb>/<sha256><ext>;
+    when that blob already exists the spooled copy is simply dropped. Every
+    save takes a reference on the blob (core.models.StoredBlob) and delete()
+    releases one, removing the file only with the last reference. Files saved before this storage was used
+    have no StoredBlob row and are never deleted by it.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save, and identical content may share it
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (large multipart uploads, finished upload sessions): hash in place, then move
+            for chunk in content.chunks():
+                digest.update(chunk)
+                size += len(chunk)
+            spool_path = content.temporary_file_path()
+        else:
+            incoming = self.path(INCOMING_DIR)
+            os.makedirs(incoming, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as spool:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    spool.write(chunk)
+                    size += len(chunk)
+            spool_path = spool.name
+
+        sha256 = digest.hexdigest()
+        name = posixpath.join(directory, sha256[:2], sha256[2:4], sha256 + extension)
+        path = self.path(name)
+        StoredBlob = apps.get_model('core', 'StoredBlob')
+        try:
+            with transaction.atomic():
+                # A new blob row starts with this reference; an existing one is incremented in place,
+                # which waits on (and then misses) a concurrent delete of its last reference
+                while True:
+                    blob, created = StoredBlob.objects.get_or_create(name=name, defaults={'size': size, 'ref_count': 1})
+                    if created or StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1):
+                        break
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    file_move_safe(spool_path, path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+        return name
+
+    def delete(self, name):
+        if not name:
+            raise ValueError("The name must be given to delete().")
+        StoredBlob = apps.get_model('core', 'StoredBlob')
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return
+            if blob.ref_count > 1:
+                blob.ref_count -= 1
+                blob.save(update_fields=['ref_count'])
+                return
+            blob.delete()
+            super().delete(name)
+
+
+evidence_storage = ContentAddressedStorage()
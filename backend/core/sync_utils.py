@@ -0,0 +1,222 @@
+import math
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache_utils import invalidate_cached_user, invalidate_principal_summary
+from .models import Department, StudentProfile, User
+from .search_utils import index_student_records
+from .serializers import StudentSyncRecordSerializer
+
+# Records accepted per sync request
+SYNC_MAX_RECORDS = 5000
+
+# Values per IN (...) lookup, kept under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 900
+
+# Queries a sync runs whatever its size: the department lookup and the transaction around the writes
+SYNC_FIXED_QUERIES = 4
+
+USER_FIELDS = ['email', 'username', 'first_name', 'last_name']
+PROFILE_FIELDS = ['year_of_admission', 'course', 'branch', 'phone_number', 'date_of_birth', 'address']
+
+
+def _chunks(values, size=LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def sync_query_budget(records=SYNC_MAX_RECORDS):
+    """
+    Queries a sync of `records` new students runs, the most expensive batch.
+
+    One IN lookup per LOOKUP_CHUNK_SIZE values for each of student_id, email
+    and username, one INSERT per bulk_create batch of users and of profiles
+    (the database caps the rows per INSERT by its bound-parameter limit), plus
+    SYNC_FIXED_QUERIES. Updates write one bulk_update per batch as well, but
+    over fewer columns, so they stay below this.
+    """
+    lookups = 3 * math.ceil(records / LOOKUP_CHUNK_SIZE)
+    inserts = 0
+    for model in (User, StudentProfile):
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        batch_size = max(connection.ops.bulk_batch_size(fields, [None] * records), 1)
+        inserts += math.ceil(records / batch_size)
+    return SYNC_FIXED_QUERIES + lookups + inserts
+
+
+def _changed(instance, record, fields):
+    """Fields of `fields` present in `record` whose value differs from `instance`"""
+    return tuple(field for field in fields if field in record and getattr(instance, field) != record[field])
+
+
+def sync_students(records, user):
+    """
+    Upsert a batch of roster records keyed by (student_id, department).
+
+    The batch is diffed against the stored profiles with a handful of set-based
+    reads; only new students are inserted (bulk_create) and only changed fields
+    of existing ones written (bulk_update, grouped by the set of changed fields),
+    so re-sending an unchanged roster does no writes at all.
+
+    Returns the per-outcome counts and a list of per-record errors.
+    """
+    errors = []
+    valid = []
+
+    # Validate every record with a single serializer instance
+    validator = StudentSyncRecordSerializer()
+    for index, record in enumerate(records):
+        try:
+            data = validator.run_validation(record)
+        except serializers.ValidationError as e:
+            errors.append({'index': index, 'errors': e.detail})
+            continue
+        data['email'] = User.objects.normalize_email(data['email'])
+        valid.append((index, data))
+
+    # The same key, email or username twice in one batch is ambiguous
+    seen = {'student_id': set(), 'email': set(), 'username': set()}
+    unique = []
+    for index, data in valid:
+        values = {'student_id': (data['student_id'], data['department']), 'email': data['email'], 'username': data['username']}
+        duplicate = next((name for name, value in values.items() if value in seen[name]), None)
+        if duplicate:
+            errors.append({'index': index, 'errors': {duplicate: ['Duplicated in the batch']}})
+            continue
+        for name, value in values.items():
+            seen[name].add(value)
+        unique.append((index, data))
+
+    # Departments the caller may manage
+    department_ids = {data['department'] for _, data in unique}
+    colleges = dict(
+        Department.objects.scoped_to(user).filter(pk__in=department_ids).values_list('pk', 'college_id')
+    )
+
+    # Stored profiles for the batch keys, one IN query per chunk of student IDs
+    existing = {}
+    student_ids = {data['student_id'] for _, data in unique if data['department'] in colleges}
+    for chunk in _chunks(student_ids):
+        for profile in StudentProfile.objects.filter(
+            department_id__in=colleges, student_id__in=chunk
+        ).select_related('user'):
+            existing[(profile.student_id, profile.department_id)] = profile
+
+    to_create = []
+    to_update = []
+    unchanged = 0
+    for index, data in unique:
+        if data['department'] not in colleges:
+            errors.append({'index': index, 'errors': {'department': ['Department not found']}})
+            continue
+        profile = existing.get((data['student_id'], data['department']))
+        if profile is None:
+            to_create.append((index, data))
+            continue
+        user_changes = _changed(profile.user, data, USER_FIELDS)
+        profile_changes = _changed(profile, data, PROFILE_FIELDS)
+        if user_changes or profile_changes:
+            to_update.append((index, data, profile, user_changes, profile_changes))
+        else:
+            unchanged += 1
+
+    # Emails/usernames taken by other accounts, checked only for new or changed values
+    claims = {'email': {}, 'username': {}}
+    for index, data in to_create:
+        for field in claims:
+            claims[field][data[field]] = None
+    for index, data, profile, user_changes, _ in to_update:
+        for field in claims:
+            if field in user_changes:
+                claims[field][data[field]] = profile.user_id
+    taken = set()
+    for field, values in claims.items():
+        for chunk in _chunks(values):
+            for value, owner_id in User.objects.filter(**{f'{field}__in': chunk}).values_list(field, 'pk'):
+                if owner_id != values[value]:
+                    taken.add((field, value))
+
+    def conflicts(data, fields):
+        return {field: ['Already used by another account'] for field in fields if (field, data[field]) in taken}
+
+    creates = []
+    for index, data in to_create:
+        conflict = conflicts(data, claims)
+        if conflict:
+            errors.append({'index': index, 'errors': conflict})
+        else:
+            creates.append(data)
+    updates = []
+    for index, data, profile, user_changes, profile_changes in to_update:
+        conflict = conflicts(data, [field for field in user_changes if field in claims])
+        if conflict:
+            errors.append({'index': index, 'errors': conflict})
+        else:
+            updates.append((data, profile, user_changes, profile_changes))
+
+    now = timezone.now()
+    with transaction.atomic():
+        if creates:
+            # Imported accounts get no password until the student sets one
+            unusable_password = make_password(None)
+            users = User.objects.bulk_create([
+                User(
+                    email=data['email'], username=data['username'],
+                    first_name=data['first_name'], last_name=data['last_name'],
+                    college_id=colleges[data['department']], role='student', is_student=True,
+                    password=unusable_password,
+                )
+                for data in creates
+            ])
+            StudentProfile.objects.bulk_create([
+                StudentProfile(
+                    user=new_user, department_id=data['department'],
+                    **{field: data[field] for field in ['student_id'] + PROFILE_FIELDS if field in data},
+                )
+                for new_user, data in zip(users, creates)
+            ])
+
+        # One bulk_update per distinct set of changed fields, so untouched columns aren't rewritten
+        user_groups = {}
+        profile_groups = {}
+        for data, profile, user_changes, profile_changes in updates:
+            if user_changes:
+                for field in user_changes:
+                    setattr(profile.user, field, data[field])
+                profile.user.updated_at = now
+                user_groups.setdefault(user_changes, []).append(profile.user)
+            if profile_changes:
+                for field in profile_changes:
+                    setattr(profile, field, data[field])
+                profile.updated_at = now
+                profile_groups.setdefault(profile_changes, []).append(profile)
+        for fields, objects in user_groups.items():
+            User.objects.bulk_update(objects, list(fields) + ['updated_at'])
+        for fields, objects in profile_groups.items():
+            StudentProfile.objects.bulk_update(objects, list(fields) + ['updated_at'])
+
+    # Bulk writes skip post_save, so drop the caches they would have invalidated
+    renamed = []
+    for _, profile, user_changes, _ in updates:
+        if user_changes:
+            invalidate_cached_user(profile.user_id)
+            if {'first_name', 'last_name', 'email'} & set(user_changes):
+                renamed.append(profile.user_id)
+    # ...and re-index the records that carry the changed names
+    if renamed:
+        index_student_records(renamed)
+    if creates:
+        invalidate_principal_summary(*{colleges[data['department']] for data in creates})
+
+    return {
+        'received': len(records),
+        'created': len(creates),
+        'updated': len(updates),
+        'unchanged': unchanged,
+        'failed': len(errors),
+        'errors': sorted(errors, key=lambda error: error['index']),
+    }
@@ -1,3 +1,901 @@
-from django.test import TestCase
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from openpyxl import load_workbook
+from PIL import Image
+from rest_framework.test import APIClient, APITestCase
+
+from . import excel_utils, import_jobs, variant_jobs
+from .authentication import TenantRefreshToken
+from .cache_utils import cache_user
+from .middleware import QueryBudgetExceeded, TenantMiddleware
+from .models import (
+    Achievement, College, Department, Event, ImportJob, PermissionRequest, StoredBlob, StudentProfile,
+    UploadSession, User,
+)
+from .storage import evidence_storage
+from .sync_utils import sync_query_budget
+from .views import AchievementListCreateView
+
+IMPORT_COLUMNS = ['student_id', 'email', 'username', 'first_name', 'last_name', 'year_of_admission', 'course']
+
+
+class TenantAPITestCase(APITestCase):
+    """
+    Two colleges; college 1 has departments CS and EE, each with a HOD, a
+    faculty member and two students holding one achievement and one
+    permission request each. Requests run with QUERY_BUDGET_STRICT, so any
+    view going over its declared query budget fails the test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Enabled before super() so the files created by setUpTestData land in the temporary directory
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        overridden = override_settings(
+            QUERY_BUDGET_STRICT=True,
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+            MEDIA_ROOT=f"{directory}/media",
+            UPLOAD_SESSION_DIR=f"{directory}/upload_sessions",
+            PORTFOLIO_CACHE_DIR=f"{directory}/portfolio_cache",
+        )
+        overridden.enable()
+        cls.addClassCleanup(overridden.disable)
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.college = College.objects.create(name='College One', code='C1')
+        cls.other_college = College.objects.create(name='College Two', code='C2')
+        cls.principal = User.objects.create_principal('principal@c1.edu', 'principal', cls.college, 'pw')
+        cls.other_principal = User.objects.create_principal('principal@c2.edu', 'principal2', cls.other_college, 'pw')
+
+        cls.departments = {}
+        cls.hods = {}
+        cls.faculty = {}
+        cls.students = {}
+        for code in ('CS', 'EE'):
+            department = Department.objects.create(name=code, code=code, college=cls.college)
+            cls.departments[code] = department
+            cls.hods[code] = User.objects.create_hod(f'hod@{code}.edu', f'hod_{code}', cls.college, department, 'pw')
+            cls.faculty[code] = User.objects.create_faculty(
+                f'faculty@{code}.edu', f'faculty_{code}', cls.college, department, 'pw'
+            )
+            cls.students[code] = []
+            for i in range(2):
+                # No password: imported students wait for an invitation
+                user = User.objects.create_student(
+                    f'student{i}@{code}.edu', f'student{i}_{code}', cls.college,
+                    first_name='Student', last_name=f'{code}{i}',
+                )
+                profile = StudentProfile.objects.create(
+                    user=user, student_id=f'{code}{i}', year_of_admission=2024, course='BTech', department=department
+                )
+                cls.students[code].append(profile)
+                Achievement.objects.create(
+                    student=profile, title=f'Robotics {code}{i}', description='Regional contest',
+                    category='technical', date_achieved=datetime.date(2024, 1, 1),
+                    evidence_file=SimpleUploadedFile('certificate.pdf', b'%PDF-1.4 certificate'),
+                )
+                PermissionRequest.objects.create(
+                    student=profile, title=f'Leave {code}{i}', description='Family event', request_type='leave'
+                )
+
+    def setUp(self):
+        # Cached users and summaries live in the process-wide cache; don't let them leak between tests
+        cache.clear()
+
+    def client_for(self, user):
+        # Budgets describe the steady state, where CachedJWTAuthentication finds the user in its cache
+        cache_user(User.objects.select_related('college', 'department').get(pk=user.pk))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {TenantRefreshToken.for_user(user).access_token}')
+        return client
+
+    def listed_ids(self, user, url):
+        response = self.client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+
+class VisibilityTests(TenantAPITestCase):
+    def achievement_ids(self, *profiles):
+        return set(Achievement.objects.filter(student__in=profiles).values_list('pk', flat=True))
+
+    def test_principal_sees_their_college(self):
+        cs, ee = self.students['CS'], self.students['EE']
+        self.assertEqual(self.listed_ids(self.principal, '/api/achievements/'), self.achievement_ids(*cs, *ee))
+        self.assertEqual(self.listed_ids(self.other_principal, '/api/achievements/'), set())
+
+    def test_staff_see_their_department(self):
+        expected = self.achievement_ids(*self.students['CS'])
+        self.assertEqual(self.listed_ids(self.hods['CS'], '/api/achievements/'), expected)
+        self.assertEqual(self.listed_ids(self.faculty['CS'], '/api/achievements/'), expected)
+        expected = set(
+            PermissionRequest.objects.filter(student__in=self.students['EE']).values_list('pk', flat=True)
+        )
+        self.assertEqual(self.listed_ids(self.faculty['EE'], '/api/permission-requests/'), expected)
+
+    def test_student_sees_their_own(self):
+        profile = self.students['EE'][1]
+        self.assertEqual(self.listed_ids(profile.user, '/api/achievements/'), self.achievement_ids(profile))
+        requests = self.listed_ids(profile.user, '/api/permission-requests/')
+        self.assertEqual(requests, set(profile.permission_requests.values_list('pk', flat=True)))
+
+    def test_other_college_cannot_open_a_record(self):
+        achievement = Achievement.objects.filter(student__in=self.students['CS']).first()
+        response = self.client_for(self.other_principal).get(f'/api/achievements/{achievement.pk}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        client = self.client_for(self.principal)
+        before = client.get('/api/achievements/')
+        for profile in self.students['CS']:
+            for i in range(5):
+                Achievement.objects.create(
+                    student=profile, title=f'Extra {i}', description='d',
+                    category='academic', date_achieved=datetime.date(2024, 2, 1),
+                )
+        after = client.get('/api/achievements/')
+        self.assertEqual(len(after.data['results']), len(before.data['results']) + 10)
+        self.assertEqual(after['X-DB-Queries'], before['X-DB-Queries'])
+
+
+class AuthenticationTests(TenantAPITestCase):
+    def test_tokens_carry_tenant_claims(self):
+        token = TenantRefreshToken.for_user(self.hods['EE']).access_token
+        self.assertEqual(token['role'], 'hod')
+        self.assertEqual(token['college_id'], self.college.pk)
+        self.assertEqual(token['department_id'], self.departments['EE'].pk)
+
+    def test_saving_a_user_drops_the_cached_copy(self):
+        client = self.client_for(self.faculty['CS'])
+        self.assertEqual(client.get('/api/achievements/').status_code, 200)
+        self.faculty['CS'].is_active = False
+        self.faculty['CS'].save()
+        self.assertEqual(client.get('/api/achievements/').status_code, 401)
+
+    def test_tokens_from_before_a_college_change_are_rejected(self):
+        client = self.client_for(self.faculty['CS'])
+        self.assertEqual(client.get('/api/achievements/').status_code, 200)
+        self.faculty['CS'].college = self.other_college
+        self.faculty['CS'].save()
+        response = client.get('/api/achievements/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'college_changed')
+        self.assertEqual(self.client_for(self.faculty['CS']).get('/api/achievements/').status_code, 200)
+
+
+class TenantMiddlewareTests(TenantAPITestCase):
+    def tenant_request(self, user=None, auth=None, **headers):
+        request = RequestFactory().get('/api/achievements/', **headers)
+        request.user = user or AnonymousUser()
+        TenantMiddleware(lambda request: None).process_request(request)
+        # DRF sets this on the underlying request once a token has authenticated it
+        request.auth = auth
+        return request
+
+    def test_college_comes_from_the_authenticating_token(self):
+        token = TenantRefreshToken.for_user(self.hods['CS']).access_token
+        self.assertEqual(self.tenant_request(auth=token).current_college.pk, self.college.pk)
+
+    def test_bearer_header_on_a_session_request_is_ignored(self):
+        token = TenantRefreshToken.for_user(self.hods['CS']).access_token
+        request = self.tenant_request(user=self.other_principal, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(request.current_college.pk, self.other_college.pk)
+
+    def test_college_is_resolved_only_when_read(self):
+        with self.assertNumQueries(0):
+            request = self.tenant_request()
+        self.assertFalse(request.current_college)
+
+    def test_renaming_a_college_refreshes_the_cached_row(self):
+        token = TenantRefreshToken.for_user(self.principal).access_token
+        self.assertEqual(self.tenant_request(auth=token).current_college.name, 'College One')
+        self.college.name = 'College Renamed'
+        self.college.save()
+        self.assertEqual(self.tenant_request(auth=token).current_college.name, 'College Renamed')
+
+
+class PrincipalSummaryTests(TenantAPITestCase):
+    def test_summary_counts_the_college(self):
+        response = self.client_for(self.principal).get('/api/principal/summary/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['college']['code'], 'C1')
+        self.assertEqual(
+            {key: response.data['counts'][key] for key in ('departments', 'hods', 'faculty', 'students')},
+            {'departments': 2, 'hods': 2, 'faculty': 2, 'students': 4},
+        )
+        self.assertEqual(response.data['counts']['achievements'], {'total': 4, 'pending': 4})
+
+    def test_principal_without_a_college(self):
+        # The college column is nullable, e.g. for accounts detached by hand in the admin
+        User.objects.filter(pk=self.other_principal.pk).update(college=None)
+        principal = User.objects.get(pk=self.other_principal.pk)
+        response = self.client_for(principal).get('/api/principal/summary/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TenantColumnTests(TenantAPITestCase):
+    def test_records_follow_a_department_move(self):
+        profile = StudentProfile.objects.get(pk=self.students['CS'][0].pk)
+        profile.department = self.departments['EE']
+        profile.save()
+
+        for related in (profile.achievements, profile.permission_requests):
+            self.assertEqual(
+                set(related.values_list('college_id', 'department_id')),
+                {(self.college.pk, self.departments['EE'].pk)},
+            )
+        self.assertIn(
+            profile.achievements.get().pk, self.listed_ids(self.faculty['EE'], '/api/achievements/')
+        )
+        self.assertNotIn(
+            profile.achievements.get().pk, self.listed_ids(self.faculty['CS'], '/api/achievements/')
+        )
+
+    def test_unrelated_save_leaves_records_alone(self):
+        profile = StudentProfile.objects.get(pk=self.students['CS'][0].pk)
+        with self.assertNumQueries(1):
+            profile.save()
+
+
+class PaginationTests(TenantAPITestCase):
+    def test_cursor_pages_walk_newest_first(self):
+        client = self.client_for(self.principal)
+        response = client.get('/api/achievements/', {'page_size': 3})
+        self.assertNotIn('count', response.data)
+        first_page = response.data['results']
+
+        # Rows created mid-walk land before the cursor and don't shift later pages
+        Achievement.objects.create(
+            student=self.students['CS'][0], title='Late entry', description='d',
+            category='academic', date_achieved=datetime.date(2024, 3, 1),
+        )
+        rows = list(first_page)
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            rows.extend(response.data['results'])
+
+        expected = list(
+            Achievement.objects.filter(college=self.college)
+            .exclude(title='Late entry')
+            .order_by('-created_at', '-id')
+            .values_list('pk', flat=True)
+        )
+        self.assertEqual([row['id'] for row in rows], expected)
+
+
+
+class BulkReviewTests(TenantAPITestCase):
+    def test_outcomes(self):
+        pending, approved = (a.pk for a in Achievement.objects.filter(student__in=self.students['CS']))
+        Achievement.objects.filter(pk=approved).update(status='approved')
+        other_department = Achievement.objects.filter(student__in=self.students['EE']).first().pk
+        missing = Achievement.objects.order_by('-pk').first().pk + 1
+
+        response = self.client_for(self.hods['CS']).post(
+            '/api/achievements/bulk-review/',
+            {'ids': [pending, approved, other_department, missing], 'status': 'approved'}, format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(response.data['results'], [
+            {'id': pending, 'outcome': 'updated'},
+            {'id': approved, 'outcome': 'not_pending', 'status': 'approved'},
+            {'id': other_department, 'outcome': 'not_found'},
+            {'id': missing, 'outcome': 'not_found'},
+        ])
+        self.assertEqual(Achievement.objects.get(pk=pending).approved_by, self.hods['CS'])
+        self.assertEqual(Achievement.objects.get(pk=other_department).status, 'pending')
+
+    def test_filter_rejects_permission_requests(self):
+        response = self.client_for(self.principal).post(
+            '/api/permission-requests/bulk-review/',
+            {'filter': {'request_type': 'leave'}, 'status': 'rejected', 'rejection_reason': 'Exams'}, format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 4)
+        self.assertEqual(
+            set(PermissionRequest.objects.values_list('status', 'rejection_reason')), {('rejected', 'Exams')}
+        )
+
+    def test_invalid_input(self):
+        client = self.client_for(self.principal)
+        response = client.post('/api/achievements/bulk-review/', {'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        for review_filter in ({}, {'title': 'x'}, {'student': 'abc'}, {'department': {'x': 1}},
+                              {'category': 'leave'}, ['student']):
+            response = client.post(
+                '/api/achievements/bulk-review/', {'filter': review_filter, 'status': 'approved'}, format='json'
+            )
+            self.assertEqual(response.status_code, 400, review_filter)
+        self.assertFalse(Achievement.objects.exclude(status='pending').exists())
+
+    def test_filter_by_student(self):
+        profile = self.students['EE'][0]
+        response = self.client_for(self.principal).post(
+            '/api/achievements/bulk-review/', {'filter': {'student': profile.pk}, 'status': 'approved'}, format='json'
+        )
+
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(set(Achievement.objects.filter(status='approved')), set(profile.achievements.all()))
+
+class StudentImportTests(TenantAPITestCase):
+    def sheet(self, rows, columns=IMPORT_COLUMNS):
+        buffer = io.BytesIO()
+        pd.DataFrame(rows, columns=columns).to_excel(buffer, index=False)
+        return SimpleUploadedFile(
+            'students.xlsx', buffer.getvalue(),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    def upload(self, rows, columns=IMPORT_COLUMNS):
+        return self.client_for(self.hods['CS']).post('/api/students/excel-upload/', {
+            'file': self.sheet(rows, columns),
+            'college_id': self.college.pk,
+            'department_id': self.departments['CS'].pk,
+        })
+
+    def test_upload_is_queued(self):
+        response = self.upload([['CS10', 'new@cs.edu', 'new_cs', 'New', 'Student', '2024', 'BTech']])
+
+        self.assertEqual(response.status_code, 202)
+        job = self.client_for(self.hods['CS']).get(response.data['status_url'])
+        self.assertEqual(job.status_code, 200)
+        self.assertEqual((job.data['status'], job.data['processed_rows']), ('pending', 0))
+        self.assertFalse(StudentProfile.objects.filter(student_id='CS10').exists())
+        # Jobs are scoped like the students they import
+        self.assertEqual(self.client_for(self.hods['EE']).get(response.data['status_url']).status_code, 404)
+
+    def test_worker_imports_valid_rows_and_reports_bad_ones(self):
+        response = self.upload([
+            ['CS10', 'new@cs.edu', 'new_cs', 'New', 'Student', '2024', 'BTech'],
+            ['CS11', 'student0@CS.edu', 'taken_email', 'Dup', 'Email', '2024', 'BTech'],
+            ['CS12', 'blank@cs.edu', '', 'No', 'Username', '2024', 'BTech'],
+            ['CS13', 'year@cs.edu', 'bad_year', 'Bad', 'Year', 'soon', 'BTech'],
+            ['CS10', 'again@cs.edu', 'again_cs', 'Same', 'Id', '2024', 'BTech'],
+        ])
+        import_jobs.work(once=True)
+
+        job = self.client_for(self.hods['CS']).get(response.data['status_url']).data
+        self.assertEqual(
+            [job[key] for key in ('status', 'total_rows', 'processed_rows', 'created_count', 'failed_count')],
+            ['completed', 5, 5, 1, 4],
+        )
+        with ImportJob.objects.get(pk=job['id']).error_file.open('r') as error_file:
+            self.assertEqual(list(csv.reader(error_file)), [
+                ['row', 'error'],
+                ['3', 'Email student0@cs.edu already exists'],
+                ['4', 'username is required'],
+                ['5', 'year_of_admission must be a number'],
+                ['6', 'Student ID CS10 is duplicated in the file'],
+            ])
+        profile = StudentProfile.objects.get(student_id='CS10')
+        self.assertEqual(profile.department, self.departments['CS'])
+        self.assertFalse(profile.user.has_usable_password())
+
+    def test_csv_is_imported_in_chunks(self):
+        lines = [
+            ','.join(IMPORT_COLUMNS),
+            'CS10,a@cs.edu,a_cs,A,One,2024,BTech',
+            'CS11,b@cs.edu,b_cs,B,Two,2024,BTech',
+            ',,,,,,',
+            'CS12,c@cs.edu,c_cs,C,Three,2024,BTech',
+            # Same ID as a row committed with the first chunk
+            'CS10,d@cs.edu,d_cs,D,Four,2024,BTech',
+        ]
+        upload = SimpleUploadedFile('students.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+        with mock.patch.object(excel_utils, 'IMPORT_BATCH_SIZE', 2):
+            response = self.client_for(self.hods['CS']).post('/api/students/excel-upload/', {
+                'file': upload,
+                'college_id': self.college.pk,
+                'department_id': self.departments['CS'].pk,
+            })
+            import_jobs.work(once=True)
+
+        job = ImportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(
+            (job.status, job.total_rows, job.created_count, job.failed_count), ('completed', 4, 3, 1)
+        )
+        with job.error_file.open('r') as error_file:
+            self.assertEqual(list(csv.reader(error_file))[1:], [['6', 'Student ID CS10 already exists']])
+        emails = StudentProfile.objects.filter(department=self.departments['CS']).values_list('user__email', flat=True)
+        self.assertTrue({'a@cs.edu', 'b@cs.edu', 'c@cs.edu'} <= set(emails))
+        self.assertFalse(User.objects.filter(email='d@cs.edu').exists())
+
+    def test_failed_job_keeps_its_committed_chunks(self):
+        create_chunk = excel_utils._create_chunk
+        calls = []
+
+        def fail_second_chunk(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('disk full')
+            return create_chunk(*args)
+
+        with (
+            mock.patch.object(excel_utils, 'IMPORT_BATCH_SIZE', 2),
+            mock.patch.object(excel_utils, '_create_chunk', side_effect=fail_second_chunk),
+        ):
+            response = self.upload([
+                ['CS10', 'a@cs.edu', 'a_cs', 'A', 'One', '2024', 'BTech'],
+                ['CS11', 'b@cs.edu', '', 'B', 'Two', '2024', 'BTech'],
+                ['CS12', 'c@cs.edu', 'c_cs', 'C', 'Three', '2024', 'BTech'],
+            ])
+            import_jobs.work(once=True)
+
+        job = ImportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual((job.status, job.error), ('failed', 'disk full'))
+        self.assertEqual((job.processed_rows, job.created_count, job.failed_count), (2, 1, 1))
+        with job.error_file.open('r') as error_file:
+            self.assertEqual(list(csv.reader(error_file))[1:], [['3', 'username is required']])
+        self.assertTrue(StudentProfile.objects.filter(student_id='CS10').exists())
+
+    def test_missing_columns_fail_the_job(self):
+        response = self.upload([['CS10', 'new@cs.edu']], columns=['student_id', 'email'])
+        import_jobs.work(once=True)
+
+        job = ImportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Missing required columns', job.error)
+        self.assertFalse(StudentProfile.objects.filter(student_id='CS10').exists())
+
+
+class StudentSyncTests(TenantAPITestCase):
+    def roster(self):
+        cs = self.departments['CS'].pk
+        return [
+            {
+                'student_id': 'CS0', 'department': cs, 'email': 'student0@cs.edu', 'username': 'student0_CS',
+                'first_name': 'Student', 'last_name': 'Renamed', 'year_of_admission': 2024, 'course': 'BTech',
+            },
+            {
+                'student_id': 'CS1', 'department': cs, 'email': 'student1@cs.edu', 'username': 'student1_CS',
+                'first_name': 'Student', 'last_name': 'CS1', 'year_of_admission': 2024, 'course': 'BTech',
+            },
+            {
+                'student_id': 'CS20', 'department': cs, 'email': 'new@cs.edu', 'username': 'new_cs',
+                'first_name': 'New', 'last_name': 'Student', 'year_of_admission': 2025, 'course': 'BTech',
+            },
+            {
+                'student_id': 'EE20', 'department': self.departments['EE'].pk, 'email': 'ee@ee.edu',
+                'username': 'new_ee', 'first_name': 'Other', 'last_name': 'Department',
+                'year_of_admission': 2025, 'course': 'BTech',
+            },
+            {'student_id': 'CS21', 'department': cs, 'email': 'not-an-email'},
+        ]
+
+    def test_resending_a_roster_is_a_no_op(self):
+        client = self.client_for(self.hods['CS'])
+        first = client.post('/api/students/sync/', self.roster(), format='json')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(
+            {key: first.data[key] for key in ('received', 'created', 'updated', 'unchanged', 'failed')},
+            {'received': 5, 'created': 1, 'updated': 1, 'unchanged': 1, 'failed': 2},
+        )
+        self.assertEqual([error['index'] for error in first.data['errors']], [3, 4])
+        self.assertEqual(first.data['errors'][0]['errors'], {'department': ['Department not found']})
+        self.assertEqual(User.objects.get(username='student0_CS').last_name, 'Renamed')
+        self.assertFalse(User.objects.get(username='new_cs').has_usable_password())
+
+        users, profiles = User.objects.count(), StudentProfile.objects.count()
+        second = client.post('/api/students/sync/', self.roster(), format='json')
+
+        self.assertEqual((second.data['created'], second.data['updated'], second.data['unchanged']), (0, 0, 3))
+        self.assertEqual((User.objects.count(), StudentProfile.objects.count()), (users, profiles))
+
+    def test_new_students_stay_within_the_computed_budget(self):
+        records = [
+            {
+                'student_id': f'CS{i}', 'department': self.departments['CS'].pk, 'email': f'new{i}@cs.edu',
+                'username': f'new{i}', 'first_name': 'New', 'last_name': 'Student', 'year_of_admission': 2025,
+                'course': 'BTech',
+            }
+            for i in range(100, 400)
+        ]
+        response = self.client_for(self.hods['CS']).post('/api/students/sync/', records, format='json')
+
+        self.assertEqual(response.data['created'], 300)
+        self.assertLessEqual(int(response['X-DB-Queries']), sync_query_budget(len(records)))
+
+    def test_ndjson_batches(self):
+        body = '\n'.join(json.dumps(record) for record in self.roster()[1:3])
+        response = self.client_for(self.principal).post(
+            '/api/students/sync/', body, content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['unchanged']), (1, 1))
+
+
+
+class InvitationTests(TenantAPITestCase):
+    def invite(self, user, data):
+        return self.client_for(user).post('/api/students/invitations/', data, format='json')
+
+    def test_invitation_works_once(self):
+        response = self.invite(self.hods['CS'], {'department': self.departments['CS'].pk})
+        self.assertEqual(response.status_code, 200)
+        invitations = response.data['invitations']
+        self.assertEqual({i['student_id'] for i in invitations}, {'CS0', 'CS1'})
+
+        detail = self.client.get(f"/api/invitations/{invitations[0]['token']}/")
+        self.assertEqual(detail.status_code, 200)
+        redeem = {'token': invitations[0]['token'], 'password': 'Str0ng-pass!', 'password_confirm': 'Str0ng-pass!'}
+        first = self.client.post('/api/invitations/redeem/', redeem, format='json')
+        self.assertEqual(first.status_code, 200)
+        again = self.client.post('/api/invitations/redeem/', redeem, format='json')
+        self.assertEqual(again.status_code, 410)
+        self.assertTrue(User.objects.get(email=invitations[0]['email']).check_password('Str0ng-pass!'))
+
+    def test_selection_is_validated(self):
+        hod = self.hods['CS']
+        self.assertEqual(self.invite(hod, {}).status_code, 400)
+        self.assertEqual(self.invite(hod, {'ids': ['one']}).status_code, 400)
+        self.assertEqual(self.invite(hod, {'ids': list(range(501))}).status_code, 400)
+        # Another department is not selectable, and another department's students are not returned
+        self.assertEqual(self.invite(hod, {'department': self.departments['EE'].pk}).status_code, 400)
+        response = self.invite(hod, {'ids': [profile.pk for profile in self.students['EE']]})
+        self.assertEqual(response.data['invitations'], [])
+
+
+class PortfolioCacheTests(TenantAPITestCase):
+    def download(self, client, **headers):
+        response = client.get('/api/portfolio/download/', **headers)
+        if response.status_code == 200:
+            self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        return response
+
+    def test_version_changes_with_the_content(self):
+        profile = self.students['CS'][0]
+        client = self.client_for(profile.user)
+        first = self.download(client)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.download(client, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        achievement = profile.achievements.get()
+        achievement.status = 'approved'
+        achievement.save()
+        self.assertFalse(os.path.exists(os.path.join(settings.PORTFOLIO_CACHE_DIR, str(profile.pk))))
+
+        second = self.download(client, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        version = second['ETag'].strip('"')
+        self.assertEqual(os.listdir(os.path.join(settings.PORTFOLIO_CACHE_DIR, str(profile.pk))), [f'{version}.pdf'])
+
+
+class StoredFileTests(TenantAPITestCase):
+    def test_identical_uploads_share_one_blob(self):
+        achievements = list(Achievement.objects.all())
+        names = {achievement.evidence_file.name for achievement in achievements}
+        self.assertEqual(len(names), 1)
+        blob = StoredBlob.objects.get(name=names.pop())
+        self.assertEqual(blob.ref_count, len(achievements))
+
+        for achievement in achievements[1:]:
+            with self.captureOnCommitCallbacks(execute=True):
+                achievement.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(evidence_storage.exists(blob.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            achievements[0].delete()
+        self.assertFalse(StoredBlob.objects.filter(pk=blob.pk).exists())
+        self.assertFalse(evidence_storage.exists(blob.name))
+
+    def test_replacing_a_file_releases_the_old_blob(self):
+        achievement = Achievement.objects.first()
+        old_name = achievement.evidence_file.name
+        achievement.evidence_file = SimpleUploadedFile('updated.pdf', b'%PDF-1.4 updated certificate')
+        with self.captureOnCommitCallbacks(execute=True):
+            achievement.save()
+
+        self.assertEqual(StoredBlob.objects.get(name=old_name).ref_count, Achievement.objects.count() - 1)
+        self.assertEqual(StoredBlob.objects.get(name=achievement.evidence_file.name).ref_count, 1)
+        self.assertEqual(
+            os.path.basename(achievement.evidence_file.name),
+            hashlib.sha256(b'%PDF-1.4 updated certificate').hexdigest() + '.pdf',
+        )
+
+    def test_blobs_are_read_only_in_the_admin(self):
+        superuser = User.objects.create_superuser(username='root', email='root@example.com', password='pw')
+        self.client.force_login(superuser)
+        blob = StoredBlob.objects.get(name=Achievement.objects.first().evidence_file.name)
+        url = reverse('admin:core_storedblob_change', args=[blob.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.post(url, {'name': 'other.pdf'}).status_code, 403)
+        delete_url = reverse('admin:core_storedblob_delete', args=[blob.pk])
+        self.assertEqual(self.client.post(delete_url, {'post': 'yes'}).status_code, 403)
+        self.assertEqual(self.client.get(reverse('admin:core_storedblob_add')).status_code, 403)
+        self.assertTrue(StoredBlob.objects.filter(pk=blob.pk, name=blob.name).exists())
+
+
+class UploadSessionTests(TenantAPITestCase):
+    def upload(self, client, data, filename='certificate.png'):
+        response = client.post(
+            '/api/uploads/',
+            {'filename': filename, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        session_id = response.data['id']
+        response = client.generic(
+            'PUT', f'/api/uploads/{session_id}/', data, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes 0-{len(data) - 1}/{len(data)}',
+        )
+        self.assertEqual(response.status_code, 200)
+        response = client.post(f'/api/uploads/{session_id}/complete/')
+        self.assertEqual(response.data['status'], 'complete')
+        return session_id
+
+    def test_session_attaches_once(self):
+        profile = self.students['CS'][0]
+        client = self.client_for(profile.user)
+        session_id = self.upload(client, b'certificate bytes')
+        achievement = {
+            'title': 'Hackathon', 'description': 'First place', 'category': 'technical',
+            'date_achieved': '2024-03-01', 'evidence_upload': session_id,
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first = client.post('/api/achievements/', achievement, format='json')
+        self.assertEqual(first.status_code, 201)
+        self.assertFalse(UploadSession.objects.filter(pk=session_id).exists())
+        self.assertEqual(Achievement.objects.get(title='Hackathon').evidence_file.read(), b'certificate bytes')
+
+        second = client.post('/api/achievements/', achievement, format='json')
+        self.assertEqual(second.status_code, 400)
+
+    def test_failed_create_leaves_the_session_attachable(self):
+        profile = self.students['CS'][0]
+        client = self.client_for(profile.user)
+        session_id = self.upload(client, b'certificate bytes')
+        achievement = {
+            'title': 'Hackathon', 'description': 'First place', 'category': 'technical',
+            'date_achieved': '2024-03-01', 'evidence_upload': session_id,
+        }
+
+        with mock.patch.object(Achievement, 'save', side_effect=DatabaseError('disk I/O error')):
+            with self.captureOnCommitCallbacks(execute=True), self.assertRaises(DatabaseError):
+                client.post('/api/achievements/', achievement, format='json')
+        session = UploadSession.objects.get(pk=session_id)
+        self.assertTrue(os.path.exists(session.path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/achievements/', achievement, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(os.path.exists(session.path))
+
+    def test_chunks_resume_from_the_received_offset(self):
+        client = self.client_for(self.students['CS'][0].user)
+        data = b'0123456789'
+        session_id = client.post(
+            '/api/uploads/',
+            {'filename': 'notes.pdf', 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}, format='json',
+        ).data['id']
+
+        def put(start, end):
+            return client.generic(
+                'PUT', f'/api/uploads/{session_id}/', data[start:end + 1], content_type='application/octet-stream',
+                HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(data)}',
+            )
+
+        self.assertEqual(put(0, 3).data['received'], 4)
+        # A chunk that skips ahead is refused with the offset to resume from
+        skipped = put(6, 9)
+        self.assertEqual((skipped.status_code, skipped.data['received']), (409, 4))
+        self.assertEqual(client.post(f'/api/uploads/{session_id}/complete/').status_code, 409)
+        self.assertEqual(put(4, 9).data['received'], 10)
+        self.assertEqual(client.post(f'/api/uploads/{session_id}/complete/').data['status'], 'complete')
+
+    def test_sessions_are_private(self):
+        session_id = self.upload(self.client_for(self.students['CS'][0].user), b'certificate bytes')
+        response = self.client_for(self.students['CS'][1].user).get(f'/api/uploads/{session_id}/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ImageVariantTests(TenantAPITestCase):
+    def png(self, name, size, color):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_variants_are_rebuilt_when_the_image_is_replaced(self):
+        achievement = Achievement.objects.create(
+            student=self.students['CS'][0], title='Poster', description='d', category='cultural',
+            date_achieved=datetime.date(2024, 4, 1), evidence_file=self.png('poster.png', (800, 600), 'red'),
+        )
+        self.assertIsNone(achievement.evidence_variants)
+        variant_jobs.work(once=True)
+        achievement.refresh_from_db()
+        self.assertEqual(
+            {label: (variant['width'], variant['height']) for label, variant in achievement.evidence_variants.items()},
+            {'thumb': (160, 120), 'preview': (480, 360), 'large': (800, 600)},
+        )
+        self.assertEqual(
+            Achievement.objects.exclude(pk=achievement.pk).values_list('evidence_variants', flat=True).distinct().get(),
+            {},
+        )
+
+        old_variants = achievement.evidence_variants
+        achievement.evidence_file = self.png('poster.png', (300, 300), 'blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            achievement.save()
+        self.assertIsNone(Achievement.objects.get(pk=achievement.pk).evidence_variants)
+        # The replaced image held the only reference to its blob, so its variants go with it
+        self.assertFalse(default_storage.exists(old_variants['thumb']['webp']))
+
+        variant_jobs.work(once=True)
+        achievement.refresh_from_db()
+        self.assertEqual(achievement.evidence_variants['large']['width'], 300)
+
+        achievement.evidence_file = None
+        achievement.save()
+        self.assertEqual(Achievement.objects.get(pk=achievement.pk).evidence_variants, {})
+
+
+    def test_event_circular_variants_go_with_the_circular(self):
+        event = Event.objects.create(
+            name='Tech fest', start_date=datetime.date(2024, 5, 1), end_date=datetime.date(2024, 5, 2),
+            created_by=self.principal, college=self.college, circular_photo=self.png('circular.png', (400, 400), 'red'),
+        )
+        variant_jobs.work(once=True)
+        event.refresh_from_db()
+        first_variants = event.circular_variants
+
+        event.circular_photo = self.png('circular.png', (200, 200), 'blue')
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        self.assertFalse(default_storage.exists(first_variants['thumb']['webp']))
+        variant_jobs.work(once=True)
+        event.refresh_from_db()
+        second_variants = event.circular_variants
+        self.assertTrue(default_storage.exists(second_variants['thumb']['webp']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertFalse(default_storage.exists(second_variants['thumb']['webp']))
+
+
+class SignedMediaTests(TenantAPITestCase):
+    def evidence_url(self):
+        profile = self.students['CS'][0]
+        response = self.client_for(profile.user).get('/api/achievements/')
+        url = urlsplit(response.data['results'][0]['evidence_file'])
+        return f'{url.path}?{url.query}'
+
+    def test_signed_url_serves_the_file(self):
+        response = APIClient().get(self.evidence_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 certificate')
+
+    def test_byte_ranges(self):
+        url = self.evidence_url()
+        partial = APIClient().get(url, HTTP_RANGE='bytes=5-7')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), b'1.4')
+        # An inverted range is ignored and the whole file served
+        inverted = APIClient().get(url, HTTP_RANGE='bytes=5-3')
+        self.assertEqual(inverted.status_code, 200)
+        self.assertEqual(b''.join(inverted.streaming_content), b'%PDF-1.4 certificate')
+
+    def test_altered_urls_are_rejected(self):
+        url = urlsplit(self.evidence_url())
+        params = parse_qs(url.query)
+        expires, signature = params['e'][0], params['s'][0]
+        later = f'{url.path}?e={int(expires) + 3600}&s={signature}'
+        self.assertEqual(APIClient().get(later).status_code, 403)
+        other_path = url.path.replace('.pdf', '-other.pdf')
+        self.assertEqual(APIClient().get(f'{other_path}?{url.query}').status_code, 403)
+
+    def test_unsigned_and_expired_urls_are_rejected(self):
+        url = self.evidence_url()
+        self.assertEqual(APIClient().get(url.split('?')[0]).status_code, 403)
+        with override_settings(MEDIA_URL_MAX_AGE=-2 * 3600):
+            expired = self.evidence_url()
+        self.assertEqual(APIClient().get(expired).status_code, 403)
+
+
+class SearchTests(TenantAPITestCase):
+    def search(self, user, q, **params):
+        response = self.client_for(user).get('/api/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return {(row['kind'], row['id']) for row in response.data['results']}
+
+    def achievements(self, *profiles):
+        pks = Achievement.objects.filter(student__in=profiles).values_list('pk', flat=True)
+        return {('achievement', pk) for pk in pks}
+
+    def test_results_stay_inside_the_tenant(self):
+        cs, ee = self.students['CS'], self.students['EE']
+        self.assertEqual(self.search(self.principal, 'robotics'), self.achievements(*cs, *ee))
+        self.assertEqual(self.search(self.faculty['CS'], 'robotics'), self.achievements(*cs))
+        self.assertEqual(self.search(ee[0].user, 'robot'), self.achievements(ee[0]))
+        self.assertEqual(self.search(self.other_principal, 'robotics'), set())
+
+    def test_index_follows_edits(self):
+        achievement = Achievement.objects.filter(student=self.students['CS'][0]).get()
+        achievement.title = 'Chess championship'
+        achievement.save()
+
+        self.assertEqual(self.search(self.principal, 'chess'), {('achievement', achievement.pk)})
+        self.assertNotIn(('achievement', achievement.pk), self.search(self.principal, 'robotics'))
+        self.assertEqual(
+            self.search(self.principal, 'leave', kind='permission_request'),
+            {('permission_request', pk) for pk in PermissionRequest.objects.values_list('pk', flat=True)},
+        )
+
+
+class ExportTests(TenantAPITestCase):
+    def export(self, user, url, **params):
+        response = self.client_for(user).get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_is_scoped_and_formula_safe(self):
+        achievement = Achievement.objects.filter(student=self.students['CS'][0]).get()
+        Achievement.objects.filter(pk=achievement.pk).update(title='=HYPERLINK("http://x","y")')
+        Achievement.objects.filter(student=self.students['CS'][1]).update(title='-5 points')
+
+        rows = list(csv.DictReader(io.StringIO(self.export(self.faculty['CS'], '/api/achievements/export/').decode())))
+
+        self.assertEqual({row['Student ID'] for row in rows}, {'CS0', 'CS1'})
+        self.assertEqual(
+            {row['Title'] for row in rows}, {'\'=HYPERLINK("http://x","y")', "'-5 points"}
+        )
+
+    def test_xlsx_keeps_formulas_as_text(self):
+        Achievement.objects.filter(student=self.students['CS'][0]).update(title='=1+1')
+        Achievement.objects.filter(student=self.students['CS'][1]).update(title='Robotics\x0b CS1\x00')
+
+        content = self.export(self.faculty['CS'], '/api/achievements/export/', format='xlsx')
+
+        sheet = load_workbook(io.BytesIO(content)).active
+        titles = {row[5].value: row[5].data_type for row in sheet.iter_rows(min_row=2)}
+        self.assertEqual(titles, {'=1+1': 's', 'Robotics CS1': 's'})
+
+
+class QueryBudgetTests(TenantAPITestCase):
+    def test_headers_report_the_query_count(self):
+        response = self.client_for(self.principal).get('/api/achievements/')
+        self.assertGreater(int(response['X-DB-Queries']), 0)
+        self.assertIn('X-DB-Time', response)
+
+    def test_budgets_can_differ_per_method(self):
+        client = self.client_for(self.principal)
+        with mock.patch.object(AchievementListCreateView, 'query_budget', {'GET': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                client.get('/api/achievements/')
+        with mock.patch.object(AchievementListCreateView, 'query_budget', {'POST': 0}):
+            self.assertEqual(client.get('/api/achievements/').status_code, 200)
+
+    def test_strict_mode_fails_a_view_over_budget(self):
+        client = self.client_for(self.principal)
+        with mock.patch.object(AchievementListCreateView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                client.get('/api/achievements/')
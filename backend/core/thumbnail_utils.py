@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Evidence types that can be thumbnailed; PDFs and documents are only listed by name
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+
+def _flatten(image):
+    """RGB copy of `image`, with any transparency composited onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+# Sized copies of uploaded images for list pages and portfolios, longest side in pixels, smallest first
+IMAGE_VARIANT_SIZES = {'thumb': 160, 'preview': 480, 'large': 1280}
+IMAGE_VARIANT_QUALITY = 75
+# Variants live under MEDIA_ROOT so they are served like any other upload
+IMAGE_VARIANT_DIR = 'variants'
+
+
+def _variant_dir(name):
+    digest = hashlib.sha256(name.encode()).hexdigest()
+    return os.path.join(IMAGE_VARIANT_DIR, digest[:2], digest)
+
+
+def _save_variant(image, name, format, **options):
+    path = default_storage.path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as output:
+        image.save(output, format, quality=IMAGE_VARIANT_QUALITY, **options)
+    os.replace(output.name, path)
+
+
+def build_image_variants(field_file):
+    """
+    Render the IMAGE_VARIANT_SIZES copies of an uploaded image as WebP and JPEG.
+
+    Returns {variant: {'width', 'height', 'webp', 'jpeg'}} with storage names
+    relative to MEDIA_ROOT; an empty dict when the file is missing, is not an
+    image or cannot be decoded. Images are never upscaled: sizes larger than
+    the source share the copy of the next size down.
+    """
+    if not field_file or os.path.splitext(field_file.name)[1].lower() not in IMAGE_EXTENSIONS:
+        return {}
+
+    largest = max(IMAGE_VARIANT_SIZES.values())
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as source:
+            image = Image.open(source)
+            image.draft('RGB', (largest, largest))
+            image = _flatten(ImageOps.exif_transpose(image))
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.warning("Cannot build image variants of %s: %s", field_file.name, e)
+        return {}
+
+    directory = _variant_dir(field_file.name)
+    variants = {}
+    previous = None
+    for label, size in IMAGE_VARIANT_SIZES.items():
+        variant = image.copy()
+        variant.thumbnail((size, size))
+        if previous and variant.size == (previous['width'], previous['height']):
+            # The source is no larger than this size; reuse the smaller copy instead of a duplicate
+            variants[label] = previous
+            continue
+        webp_name = os.path.join(directory, f"{label}.webp")
+        jpeg_name = os.path.join(directory, f"{label}.jpg")
+        _save_variant(variant, webp_name, 'WEBP', method=4)
+        _save_variant(variant, jpeg_name, 'JPEG', optimize=True, progressive=True)
+        previous = variants[label] = {
+            'width': variant.width, 'height': variant.height, 'webp': webp_name, 'jpeg': jpeg_name,
+        }
+    return variants
+
+
+def delete_image_variants(name):
+    """Remove every variant rendered from the stored file `name`"""
+    shutil.rmtree(default_storage.path(_variant_dir(name)), ignore_errors=True)
+
+
+def get_evidence_thumbnail(achievement):
+    """
+    Path of the 'preview' JPEG of an achievement's image evidence, for portfolios.
+
+    Evidence the variant worker has not reached yet is rendered here and the
+    result stored the same way the worker would, so it is done only once.
+    Returns None for evidence that is not an image or cannot be decoded.
+    """
+    variants = achievement.evidence_variants
+    if variants is None:
+        variants = build_image_variants(achievement.evidence_file)
+        # Keyed on the file name, like build_pending_variants: a replaced file stays pending
+        type(achievement).objects.filter(
+            pk=achievement.pk, evidence_file=achievement.evidence_file.name, evidence_variants__isnull=True
+        ).update(evidence_variants=variants)
+    preview = variants.get('preview')
+    return default_storage.path(preview['jpeg']) if preview else None
@@ -0,0 +1,183 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+from django.core.files import File
+from django.db import transaction
+
+from .models import UploadSession
+
+# File types an upload session may carry (the evidence and supporting document fields allow the same)
+UPLOAD_ALLOWED_EXTENSIONS = ["pdf", "jpg", "jpeg", "png", "doc", "docx"]
+
+# Largest chunk one PUT may carry, so every request is short and its disk/memory use bounded
+UPLOAD_CHUNK_MAX_SIZE = 5 * 1024 * 1024
+
+# Bytes read from the request body or a file at a time
+READ_BLOCK = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+CONTENT_DIGEST_RE = re.compile(r'(?:^|,)\s*sha-256=:([A-Za-z0-9+/]+=*):')
+
+
+class UploadError(Exception):
+    """A chunk or completion request that cannot be applied; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class UploadedSessionFile(File):
+    """
+    The file of a completed upload session, ready to be assigned to a FileField.
+
+    It exposes temporary_file_path() like Django's TemporaryUploadedFile, so
+    the storage can move it into place instead of copying it. What it exposes
+    is a hard link to the session's bytes: the session keeps its own file until
+    the attaching transaction commits, so a rollback leaves it attachable.
+    Closing it removes the link if the storage did not consume it.
+    """
+
+    def __init__(self, session):
+        self._path = f"{session.path}.attach"
+        remove_session_file(self._path)
+        try:
+            os.link(session.path, self._path)
+        except OSError:
+            # Filesystems without hard links
+            shutil.copyfile(session.path, self._path)
+        super().__init__(open(self._path, 'rb'), name=session.filename)
+
+    def temporary_file_path(self):
+        return self._path
+
+    def close(self):
+        super().close()
+        remove_session_file(self._path)
+
+
+def remove_session_file(path):
+    """Delete received upload bytes at `path`, if there are any"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def discard_session(session):
+    """Delete an upload session and whatever it has received"""
+    path = session.path
+    session.delete()
+    remove_session_file(path)
+
+
+def parse_content_range(header):
+    """(start, end, total) from a `bytes start-end/total` header, or None"""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        return None
+    start, end, total = (int(value) for value in match.groups())
+    if end < start:
+        return None
+    return start, end, total
+
+
+def parse_content_digest(header):
+    """Raw sha-256 digest from an RFC 9530 Content-Digest header, or None when absent or malformed"""
+    match = CONTENT_DIGEST_RE.search(header or '')
+    if not match:
+        return None
+    try:
+        return base64.b64decode(match.group(1), validate=True)
+    except binascii.Error:
+        return None
+
+
+def append_chunk(session, start, end, stream, digest=None):
+    """
+    Write bytes start..end (inclusive) read from `stream` at that offset of the partial file.
+
+    The chunk is spooled and checked (length, optional sha-256 digest) before
+    the session row is locked, so the lock only covers a local write. Chunks
+    must arrive in order; a chunk already received (a retry after a lost
+    response) is accepted without being written again.
+    """
+    length = end - start + 1
+    if length > UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadError(f'Chunks are limited to {UPLOAD_CHUNK_MAX_SIZE} bytes', 413)
+    if end >= session.size:
+        raise UploadError('Range goes past the declared size', 416)
+
+    hasher = hashlib.sha256()
+    with tempfile.TemporaryFile() as spool:
+        remaining = length
+        while remaining:
+            block = stream.read(min(READ_BLOCK, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            spool.write(block)
+            remaining -= len(block)
+        if remaining:
+            raise UploadError('Chunk is shorter than its Content-Range', 400)
+        if digest is not None and hasher.digest() != digest:
+            raise UploadError('Chunk does not match its Content-Digest', 400)
+
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            if session.status != 'uploading':
+                raise UploadError('Upload is already complete', 409)
+            if end < session.received:
+                return session
+            if start != session.received:
+                raise UploadError(f'Expected the chunk starting at byte {session.received}', 409)
+
+            spool.seek(0)
+            os.makedirs(os.path.dirname(session.path), exist_ok=True)
+            # Write at the recorded offset, dropping anything a crashed earlier write left behind
+            with os.fdopen(os.open(session.path, os.O_WRONLY | os.O_CREAT, 0o600), 'wb') as part:
+                part.seek(session.received)
+                shutil.copyfileobj(spool, part, READ_BLOCK)
+                part.truncate()
+            session.received = end + 1
+            session.save(update_fields=['received', 'updated_at'])
+    return session
+
+
+def complete_session(session):
+    """
+    Check a fully received upload against its declared sha256 and mark it complete.
+
+    On a mismatch the received bytes are discarded so the upload can be sent again.
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status == 'complete':
+            return session
+        if session.received != session.size:
+            raise UploadError(f'Only {session.received} of {session.size} bytes received', 409)
+
+        hasher = hashlib.sha256()
+        if session.size:
+            with open(session.path, 'rb') as part:
+                for block in iter(lambda: part.read(READ_BLOCK), b''):
+                    hasher.update(block)
+        else:
+            open(session.path, 'wb').close()
+        matches = hasher.hexdigest() == session.sha256
+        if matches:
+            session.status = 'complete'
+            session.save(update_fields=['status', 'updated_at'])
+        else:
+            session.received = 0
+            session.save(update_fields=['received', 'updated_at'])
+            os.remove(session.path)
+
+    if not matches:
+        raise UploadError('File does not match the declared sha256; upload it again', 422)
+    return session
@@ -5,7 +5,7 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from . import views
-from .views_principal import EventListCreateView, EventDetailView, PrincipalDashboardView, PrincipalDashboardTemplateView, approve_event_permission_request
+from .views_principal import EventListCreateView, EventDetailView, PrincipalDashboardView, PrincipalSummaryView, PrincipalDashboardTemplateView, approve_event_permission_request
 from .views import HODListView, HODCreateView, HODDetailView, FacultyListView, FacultyCreateView, FacultyDetailView
 
 # Create a router for API endpoints
@@ -33,6 +33,8 @@ urlpatterns = [
     
     # User endpoints
     path('register/', views.UserRegistrationView.as_view(), name='user-register'),
+    path('invitations/redeem/', views.InvitationRedeemView.as_view(), name='invitation-redeem'),
+    path('invitations/<str:token>/', views.InvitationDetailView.as_view(), name='invitation-detail'),
     path('me/', views.UserDetailView.as_view(), name='user-detail'),
     
     # Student endpoints
@@ -40,6 +42,11 @@ urlpatterns = [
     path('students/create/', views.StudentCreateView.as_view(), name='student-create'),
     path('students/<int:pk>/', views.StudentDetailView.as_view(), name='student-detail'),
     path('students/excel-upload/', views.ExcelStudentUploadView.as_view(), name='excel-student-upload'),
+    path('students/export/', views.StudentExportView.as_view(), name='student-export'),
+    path('students/portfolios/', views.StudentPortfolioBatchView.as_view(), name='student-portfolios'),
+    path('students/sync/', views.StudentSyncView.as_view(), name='student-sync'),
+    path('students/invitations/', views.StudentInvitationsView.as_view(), name='student-invitations'),
+    path('students/import-jobs/<int:pk>/', views.ImportJobDetailView.as_view(), name='import-job-detail'),
     path('students/excel-template/', views.ExcelTemplateDownloadView.as_view(), name='excel-template-download'),
     
     # Student Profile endpoints
@@ -50,20 +57,32 @@ urlpatterns = [
     path('faculty-profile/', views.FacultyProfileCreateView.as_view(), name='faculty-profile-create'),
     path('faculty-profile/me/', views.FacultyProfileDetailView.as_view(), name='faculty-profile-detail'),
     
+    # Resumable upload endpoints
+    path('uploads/', views.UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('uploads/<uuid:pk>/', views.UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('uploads/<uuid:pk>/complete/', views.UploadSessionCompleteView.as_view(), name='upload-session-complete'),
+    
     # Permission Request endpoints
     path('permission-requests/', views.PermissionRequestListCreateView.as_view(), name='permission-request-list-create'),
     path('permission-requests/<int:pk>/', views.PermissionRequestDetailView.as_view(), name='permission-request-detail'),
+    path('permission-requests/export/', views.PermissionRequestExportView.as_view(), name='permission-request-export'),
     path('permission-requests/pending/', views.PendingPermissionRequestsView.as_view(), name='pending-permission-requests'),
     path('permission-requests/<int:permission_id>/approve/', views.approve_permission_request, name='approve-permission-request'),
+    path('permission-requests/bulk-review/', views.bulk_review_permission_requests, name='bulk-review-permission-requests'),
     
     # Achievement endpoints
     path('achievements/', views.AchievementListCreateView.as_view(), name='achievement-list-create'),
     path('achievements/<int:pk>/', views.AchievementDetailView.as_view(), name='achievement-detail'),
+    path('achievements/export/', views.AchievementExportView.as_view(), name='achievement-export'),
     path('achievements/pending/', views.PendingAchievementsView.as_view(), name='pending-achievements'),
     path('achievements/<int:achievement_id>/approve/', views.approve_achievement, name='approve-achievement'),
+    path('achievements/bulk-review/', views.bulk_review_achievements, name='bulk-review-achievements'),
     
     # Portfolio endpoints
     path('portfolio/download/', views.download_portfolio, name='download-portfolio'),
+
+    # Full-text search
+    path('search/', views.SearchView.as_view(), name='search'),
     
     # Include router URLs
     path('', include(router.urls)),
@@ -72,6 +91,7 @@ urlpatterns = [
     path('principal/events/', EventListCreateView.as_view(), name='principal-event-list-create'),
     path('principal/events/<int:pk>/', EventDetailView.as_view(), name='principal-event-detail'),
     path('principal/dashboard/', PrincipalDashboardView.as_view(), name='principal-dashboard'),
+    path('principal/summary/', PrincipalSummaryView.as_view(), name='principal-summary'),
     path('dashboard/', PrincipalDashboardTemplateView.as_view(), name='principal-dashboard-template'),
     path('principal/event-permission-requests/<int:request_id>/approve/', approve_event_permission_request, name='approve-event-permission-request'),
 
@@ -0,0 +1,60 @@
+import logging
+import time
+
+from django.db import close_old_connections
+
+from .cache_utils import invalidate_principal_summary
+from .models import Achievement, Event
+from .thumbnail_utils import build_image_variants
+
+logger = logging.getLogger(__name__)
+
+# Image fields with rendered variants: model -> (file field, variants field)
+IMAGE_VARIANT_FIELDS = {
+    Achievement: ('evidence_file', 'evidence_variants'),
+    Event: ('circular_photo', 'circular_variants'),
+}
+
+# Rows picked up per query while draining the backlog
+VARIANT_BATCH_SIZE = 50
+
+
+def build_pending_variants(model, batch_size=VARIANT_BATCH_SIZE):
+    """
+    Render variants for up to `batch_size` rows of `model` that have none yet.
+
+    Each result is written with a conditional UPDATE keyed on the file name, so
+    a file replaced while it was being rendered is left pending for the next
+    pass instead of being given the old file's variants. Returns the rows seen.
+    """
+    file_field, variants_field = IMAGE_VARIANT_FIELDS[model]
+    rows = list(
+        model.objects.filter(**{f'{variants_field}__isnull': True})
+        .order_by('pk').values_list('pk', 'college_id', file_field)[:batch_size]
+    )
+    field = model._meta.get_field(file_field)
+    updated_colleges = set()
+    for pk, college_id, name in rows:
+        variants = build_image_variants(field.attr_class(None, field, name or ''))
+        if model.objects.filter(
+            **{'pk': pk, file_field: name, f'{variants_field}__isnull': True}
+        ).update(**{variants_field: variants}):
+            updated_colleges.add(college_id)
+
+    # Events are embedded in the cached principal summary, and update() skips post_save
+    if model is Event and updated_colleges:
+        invalidate_principal_summary(*updated_colleges)
+    return len(rows)
+
+
+def work(once=False, poll_interval=5.0, batch_size=VARIANT_BATCH_SIZE):
+    """Worker loop: render pending variants until stopped (or, with `once`, until none are left)"""
+    while True:
+        close_old_connections()
+        built = sum(build_pending_variants(model, batch_size) for model in IMAGE_VARIANT_FIELDS)
+        if built:
+            logger.info("Built image variants for %s rows", built)
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
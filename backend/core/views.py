@@ -1,33 +1,62 @@
+import time
+
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.urls import reverse
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.db.models import Q
-from rest_framework_simplejwt.tokens import RefreshToken
-from .models import College, Department, User, StudentProfile, FacultyProfile, Achievement, PermissionRequest
+from django.http import FileResponse, HttpResponseForbidden, HttpResponseNotModified, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from .authentication import TenantRefreshToken
+from .models import (
+    College, Department, User, StudentProfile, FacultyProfile, Achievement, PermissionRequest, ImportJob, UploadSession
+)
 from .serializers import (
     CollegeSerializer, DepartmentSerializer, UserRegistrationSerializer, UserSerializer,
     StudentProfileSerializer, FacultyProfileSerializer, 
     AchievementSerializer, AchievementCreateSerializer, AchievementUpdateSerializer,
-    PermissionRequestSerializer, PermissionRequestCreateSerializer, PermissionRequestUpdateSerializer
+    PermissionRequestSerializer, PermissionRequestCreateSerializer, PermissionRequestUpdateSerializer,
+    BulkReviewSerializer, AchievementBulkReviewSerializer, PermissionRequestBulkReviewSerializer,
+    ImportJobSerializer, InvitationRedeemSerializer, PortfolioBatchSerializer,
+    StudentInvitationSerializer, UploadSessionSerializer
 )
-from .pdf_utils import generate_student_portfolio, create_pdf_response
+from .pdf_utils import get_cached_portfolio, portfolio_version
 from .permissions import (
     IsSuperUser, IsPrincipal, IsHOD, IsFaculty, IsStudent, IsStaffOrStudent,
     CanManageCollege, CanManageDepartment, CanManageStudents, CanApproveAchievements,
     CanApprovePermissions, IsOwnerOrStaff
 )
-from .excel_utils import process_student_excel, generate_student_excel_template
+from .excel_utils import generate_student_excel_template
+from .export_utils import export_rows, stream_csv, stream_xlsx, CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE
+from .parsers import NDJSONParser
+from .invitations import make_invitation_token, read_invitation_token, invitation_matches
+from .sync_utils import sync_students, sync_query_budget, SYNC_MAX_RECORDS
+from .portfolio_batch import stream_portfolio_zip, PORTFOLIO_BATCH_MAX
+from .upload_utils import (
+    UploadError, append_chunk, complete_session, discard_session, parse_content_digest, parse_content_range
+)
+from .media_utils import media_response, verify_media_signature
+from .search_utils import SEARCH_KINDS, search, search_index_available
+from .middleware import query_budget
+from .cache_utils import invalidate_principal_summary, invalidate_cached_user
 
 
 class CollegeListView(generics.ListAPIView):
     """API view to list all colleges"""
-    queryset = College.objects.all()
+    queryset = College.objects.with_counts()
     serializer_class = CollegeSerializer
     permission_classes = [permissions.AllowAny]
+    # Small reference list rendered as a dropdown; not paginated
+    pagination_class = None
 
 
 class CollegeCreateView(generics.CreateAPIView):
@@ -39,7 +68,7 @@ class CollegeCreateView(generics.CreateAPIView):
 
 class CollegeDetailView(generics.RetrieveUpdateDestroyAPIView):
     """API view for college details"""
-    queryset = College.objects.all()
+    queryset = College.objects.with_counts()
     serializer_class = CollegeSerializer
     permission_classes = [CanManageCollege]
 
@@ -48,17 +77,20 @@ class DepartmentListView(generics.ListAPIView):
     """API view to list departments"""
     serializer_class = DepartmentSerializer
     permission_classes = [IsStaffOrStudent]
+    # Small reference list rendered as a dropdown; not paginated
+    pagination_class = None
     
     def get_queryset(self):
         user = self.request.user
+        departments = Department.objects.with_counts()
         if user.is_superuser:
-            return Department.objects.all()
+            return departments
         elif user.role == 'principal':
-            return Department.objects.filter(college=user.college)
+            return departments.filter(college=user.college)
         elif user.role == 'hod':
-            return Department.objects.filter(id=user.department.id)
+            return departments.filter(id=user.department.id)
         else:
-            return Department.objects.filter(college=user.college)
+            return departments.filter(college=user.college)
 
 
 class DepartmentCreateView(generics.CreateAPIView):
@@ -70,7 +102,7 @@ class DepartmentCreateView(generics.CreateAPIView):
 
 class DepartmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     """API view for department details"""
-    queryset = Department.objects.all()
+    queryset = Department.objects.with_counts()
     serializer_class = DepartmentSerializer
     permission_classes = [CanManageDepartment]
 
@@ -106,18 +138,101 @@ class StudentListView(generics.ListAPIView):
     """API view to list students"""
     serializer_class = StudentProfileSerializer
     permission_classes = [CanManageStudents]
+    max_page_size = 100
+    query_budget = 5
     
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return StudentProfile.objects.all()
-        elif user.role == 'principal':
-            return StudentProfile.objects.filter(department__college=user.college)
-        elif user.role == 'hod':
-            return StudentProfile.objects.filter(department=user.department)
-        elif user.role == 'faculty':
-            return StudentProfile.objects.filter(department=user.department)
-        return StudentProfile.objects.none()
+        return StudentProfile.objects.visible_to(self.request.user)
+
+
+class ExportView(APIView):
+    """
+    Base view streaming a tenant-scoped export as CSV (default) or XLSX (?format=xlsx).
+
+    Subclasses set `model`, `columns` ([(header, lookup), ...]) and `filename`;
+    rows are scoped exactly like the matching list view and read with
+    values_list().iterator(), so no model instances are built.
+    """
+    model = None
+    columns = []
+    filename = 'export'
+
+    def perform_content_negotiation(self, request, force=False):
+        # `format` selects the file type here, not a DRF renderer
+        return (self.get_renderers()[0], self.get_renderers()[0].media_type)
+
+    def get_queryset(self):
+        return self.model.objects.scoped_to(self.request.user)
+
+    def get(self, request):
+        file_format = request.query_params.get('format', 'csv')
+        if file_format not in ('csv', 'xlsx'):
+            return Response({'error': 'format must be csv or xlsx'}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = export_rows(self.get_queryset(), self.columns)
+        if file_format == 'xlsx':
+            response = StreamingHttpResponse(
+                stream_xlsx(self.columns, rows, self.filename.title()), content_type=XLSX_CONTENT_TYPE
+            )
+        else:
+            response = StreamingHttpResponse(stream_csv(self.columns, rows), content_type=CSV_CONTENT_TYPE)
+        stamp = timezone.localdate().isoformat()
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}_{stamp}.{file_format}"'
+        return response
+
+
+class StudentExportView(ExportView):
+    """API view to export students (same scoping as StudentListView)"""
+    permission_classes = [CanManageStudents]
+    model = StudentProfile
+    filename = 'students'
+    columns = [
+        ('Student ID', 'student_id'),
+        ('First Name', 'user__first_name'),
+        ('Last Name', 'user__last_name'),
+        ('Email', 'user__email'),
+        ('Username', 'user__username'),
+        ('Department', 'department__name'),
+        ('Course', 'course'),
+        ('Branch', 'branch'),
+        ('Year of Admission', 'year_of_admission'),
+        ('Phone Number', 'phone_number'),
+        ('Date of Birth', 'date_of_birth'),
+        ('Created At', 'created_at'),
+    ]
+
+
+class StudentPortfolioBatchView(APIView):
+    """API view for staff to download the portfolios of many students as one streamed ZIP"""
+    permission_classes = [CanManageStudents]
+    query_budget = 1
+
+    def get(self, request):
+        serializer = PortfolioBatchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        students = StudentProfile.objects.scoped_to(request.user).with_portfolio_stats()
+        if 'ids' in data:
+            students = students.filter(pk__in=data['ids'])
+        if 'department' in data:
+            students = students.filter(department_id=data['department'])
+        if 'year_of_admission' in data:
+            students = students.filter(year_of_admission=data['year_of_admission'])
+        students = list(students.order_by('student_id', 'pk')[:PORTFOLIO_BATCH_MAX + 1])
+
+        if not students:
+            return Response({'error': 'No students match the selection'}, status=status.HTTP_404_NOT_FOUND)
+        if len(students) > PORTFOLIO_BATCH_MAX:
+            return Response(
+                {'error': f'At most {PORTFOLIO_BATCH_MAX} portfolios per download'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(stream_portfolio_zip(students), content_type='application/zip')
+        stamp = timezone.localdate().isoformat()
+        response['Content-Disposition'] = f'attachment; filename="portfolios_{stamp}.zip"'
+        return response
 
 
 class StudentCreateView(generics.CreateAPIView):
@@ -144,16 +259,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [CanManageStudents, IsOwnerOrStaff]
     
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return StudentProfile.objects.all()
-        elif user.role == 'principal':
-            return StudentProfile.objects.filter(department__college=user.college)
-        elif user.role == 'hod':
-            return StudentProfile.objects.filter(department=user.department)
-        elif user.role == 'faculty':
-            return StudentProfile.objects.filter(department=user.department)
-        return StudentProfile.objects.none()
+        return StudentProfile.objects.visible_to(self.request.user)
 
 
 class ExcelStudentUploadView(APIView):
@@ -182,16 +288,147 @@ class ExcelStudentUploadView(APIView):
             return Response({'error': 'You can only upload students to your department'}, 
                           status=status.HTTP_403_FORBIDDEN)
         
-        result = process_student_excel(file, college_id, department_id)
-        
-        if result['success']:
-            return Response({
-                'message': f"Successfully created {result['created_count']} students",
-                'created_students': result['created_students'],
-                'errors': result['errors']
-            }, status=status.HTTP_201_CREATED)
+        if not Department.objects.filter(id=department_id, college_id=college_id).exists():
+            return Response({'error': 'Invalid college or department'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The sheet is processed by the run_import_jobs workers; poll the job for progress
+        job = ImportJob(created_by=user, college_id=college_id, department_id=department_id, file=file)
+        try:
+            job.full_clean(exclude=['created_by', 'college', 'department'])
+        except ValidationError as e:
+            return Response({'error': e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
+        job.save()
+
+        return Response({
+            'message': 'Import queued',
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': request.build_absolute_uri(reverse('import-job-detail', args=[job.id])),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class StudentSyncView(APIView):
+    """API view for the student information system to upsert roster batches (JSON or NDJSON)"""
+    parser_classes = [JSONParser, NDJSONParser]
+    permission_classes = [CanManageStudents]
+    # A full batch of new students: chunked lookups plus one INSERT per bulk_create batch
+    # (175 on SQLite, whose bound-parameter limit keeps the batches small)
+    query_budget = sync_query_budget()
+
+    def post(self, request):
+        records = request.data
+        if isinstance(records, dict):
+            records = records.get('students')
+        if not isinstance(records, list):
+            return Response({'error': 'Expected a list of students'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > SYNC_MAX_RECORDS:
+            return Response({'error': f'At most {SYNC_MAX_RECORDS} students per request'},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            result = sync_students(records, request.user)
+        except IntegrityError as e:
+            # Another writer (or a swap of emails/usernames within the batch) raced the diff
+            return Response({'error': f'Sync conflict, nothing was written: {str(e)}'},
+                          status=status.HTTP_409_CONFLICT)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class StudentInvitationsView(APIView):
+    """API view to issue onboarding invitations for students who have not set a password yet"""
+    permission_classes = [CanManageStudents]
+    # Department lookup (when selecting by department) + the student query
+    query_budget = 3
+
+    def post(self, request):
+        serializer = StudentInvitationSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # Imported accounts carry an unusable password ("!" prefix) until redeemed
+        students = StudentProfile.objects.scoped_to(request.user).filter(user__password__startswith='!')
+        if 'ids' in data:
+            students = students.filter(pk__in=data['ids'])
         else:
-            return Response({'error': result['error']}, status=status.HTTP_400_BAD_REQUEST)
+            students = students.filter(department=data['department'])
+
+        invitations = [
+            {
+                'student_id': student_id,
+                'email': email,
+                'token': make_invitation_token(user_id, email, password),
+            }
+            for student_id, user_id, email, password in students.values_list(
+                'student_id', 'user_id', 'user__email', 'user__password'
+            )
+        ]
+        return Response({
+            'expires_in': settings.STUDENT_INVITATION_MAX_AGE,
+            'invitations': invitations,
+        }, status=status.HTTP_200_OK)
+
+
+class InvitationDetailView(APIView):
+    """API view to check an invitation link before showing the set-password form (no DB access)"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    query_budget = 0
+
+    def get(self, request, token):
+        try:
+            payload = read_invitation_token(token)
+        except signing.SignatureExpired:
+            return Response({'error': 'Invitation has expired'}, status=status.HTTP_410_GONE)
+        except signing.BadSignature:
+            return Response({'error': 'Invalid invitation'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'email': payload['e']})
+
+
+class InvitationRedeemView(APIView):
+    """API view for a student to set their password from an invitation and log in"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    query_budget = 4
+
+    def post(self, request):
+        serializer = InvitationRedeemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            payload = read_invitation_token(serializer.validated_data['token'])
+        except signing.SignatureExpired:
+            return Response({'error': 'Invitation has expired'}, status=status.HTTP_410_GONE)
+        except signing.BadSignature:
+            return Response({'error': 'Invalid invitation'}, status=status.HTTP_404_NOT_FOUND)
+
+        user = User.objects.with_tenant_details().filter(pk=payload['u']).first()
+        if user is None or not invitation_matches(payload, user):
+            return Response({'error': 'Invitation has already been used'}, status=status.HTTP_410_GONE)
+
+        # Conditional on the old hash, so a token can only ever be redeemed once
+        password = make_password(serializer.validated_data['password'])
+        if not User.objects.filter(pk=user.pk, password=user.password).update(
+            password=password, updated_at=timezone.now()
+        ):
+            return Response({'error': 'Invitation has already been used'}, status=status.HTTP_410_GONE)
+        user.password = password
+        invalidate_cached_user(user.pk)
+
+        refresh = TenantRefreshToken.for_user(user)
+        return Response({
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+            'user': UserSerializer(user).data
+        })
+
+
+class ImportJobDetailView(generics.RetrieveAPIView):
+    """API view to poll the progress of a student import job"""
+    serializer_class = ImportJobSerializer
+    permission_classes = [CanManageStudents]
+    query_budget = 2
+
+    def get_queryset(self):
+        return ImportJob.objects.visible_to(self.request.user).select_related('department')
 
 
 class ExcelTemplateDownloadView(APIView):
@@ -240,9 +477,96 @@ class StudentProfileDetailView(generics.RetrieveUpdateAPIView):
         return self.request.user.student_profile
 
 
+class UploadSessionCreateView(generics.CreateAPIView):
+    """API view to start a resumable upload of an evidence file or supporting document"""
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 1
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+
+class UploadSessionDetailView(generics.GenericAPIView):
+    """
+    API view for one upload session: GET its progress, PUT the next chunk
+    (Content-Range: bytes <start>-<end>/<size>, optionally Content-Digest:
+    sha-256=:<base64>:) or DELETE it.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # Lock, read and update the session; a rejected request also re-reads its progress
+    query_budget = 6
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+
+    def get(self, request, pk):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def put(self, request, pk):
+        session = self.get_object()
+        content_range = parse_content_range(request.headers.get('Content-Range'))
+        if content_range is None:
+            return Response(
+                {'error': 'Content-Range: bytes <start>-<end>/<size> is required'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end, total = content_range
+        if total != session.size:
+            return Response(
+                {'error': 'Content-Range size does not match the declared size'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if int(request.META.get('CONTENT_LENGTH') or 0) != end - start + 1:
+            return Response(
+                {'error': 'Content-Length does not match the Content-Range'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        digest = None
+        if 'Content-Digest' in request.headers:
+            digest = parse_content_digest(request.headers['Content-Digest'])
+            if digest is None:
+                return Response(
+                    {'error': 'Content-Digest must carry a sha-256 digest'}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # The body is read straight from the request stream, never parsed or buffered whole
+        try:
+            session = append_chunk(session, start, end, request.stream, digest)
+        except UploadError as e:
+            session.refresh_from_db()
+            return Response({'error': str(e), 'received': session.received}, status=e.status)
+        return Response(self.get_serializer(session).data)
+
+    def delete(self, request, pk):
+        discard_session(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionCompleteView(generics.GenericAPIView):
+    """API view to finish an upload session once all its bytes were sent; its id can then be attached"""
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # Lock, read and update the session; a rejected request also re-reads its progress
+    query_budget = 6
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+
+    def post(self, request, pk):
+        session = self.get_object()
+        try:
+            session = complete_session(session)
+        except UploadError as e:
+            session.refresh_from_db()
+            return Response({'error': str(e), 'received': session.received}, status=e.status)
+        return Response(self.get_serializer(session).data)
+
+
 class PermissionRequestListCreateView(generics.ListCreateAPIView):
     """API view for listing and creating permission requests"""
     permission_classes = [IsStaffOrStudent]
+    # Creating one from an upload session claims the session, stores its file (content-addressed
+    # blob refcount), the row and its search entry; listing stays a fixed handful
+    query_budget = {'GET': 6, 'POST': 15}
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -250,20 +574,31 @@ class PermissionRequestListCreateView(generics.ListCreateAPIView):
         return PermissionRequestSerializer
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'student':
-            return PermissionRequest.objects.filter(student=user.student_profile)
-        elif user.role in ['faculty', 'hod', 'principal']:
-            # Staff can see all permission requests in their college/department
-            if user.role == 'principal':
-                return PermissionRequest.objects.filter(student__department__college=user.college)
-            else:
-                return PermissionRequest.objects.filter(student__department=user.department)
-        return PermissionRequest.objects.none()
-    
-    def perform_create(self, serializer):
-        # This is handled in the serializer
-        pass
+        # Students see their own requests, staff their college/department
+        return PermissionRequest.objects.visible_to(self.request.user)
+
+
+class PermissionRequestExportView(ExportView):
+    """API view to export permission requests (same scoping as PermissionRequestListCreateView)"""
+    permission_classes = [IsStaffOrStudent]
+    model = PermissionRequest
+    filename = 'permission_requests'
+    columns = [
+        ('ID', 'id'),
+        ('Student ID', 'student__student_id'),
+        ('First Name', 'student__user__first_name'),
+        ('Last Name', 'student__user__last_name'),
+        ('Department', 'department__name'),
+        ('Type', 'request_type'),
+        ('Title', 'title'),
+        ('Start Date', 'start_date'),
+        ('End Date', 'end_date'),
+        ('Status', 'status'),
+        ('Reviewed By', 'approved_by__email'),
+        ('Reviewed At', 'approved_at'),
+        ('Rejection Reason', 'rejection_reason'),
+        ('Created At', 'created_at'),
+    ]
 
 
 class PermissionRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -276,34 +611,18 @@ class PermissionRequestDetailView(generics.RetrieveUpdateDestroyAPIView):
         return PermissionRequestSerializer
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'student':
-            return PermissionRequest.objects.filter(student=user.student_profile)
-        elif user.role in ['faculty', 'hod', 'principal']:
-            if user.role == 'principal':
-                return PermissionRequest.objects.filter(student__department__college=user.college)
-            else:
-                return PermissionRequest.objects.filter(student__department=user.department)
-        return PermissionRequest.objects.none()
+        return PermissionRequest.objects.visible_to(self.request.user)
 
 
 class PendingPermissionRequestsView(generics.ListAPIView):
     """API view for staff to see pending permission requests"""
     serializer_class = PermissionRequestSerializer
     permission_classes = [CanApprovePermissions]
+    max_page_size = 100
+    query_budget = 2
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'principal':
-            return PermissionRequest.objects.filter(
-                student__department__college=user.college,
-                status='pending'
-            )
-        else:
-            return PermissionRequest.objects.filter(
-                student__department=user.department,
-                status='pending'
-            )
+        return PermissionRequest.objects.visible_to(self.request.user).filter(status='pending')
 
 
 class FacultyProfileCreateView(generics.CreateAPIView):
@@ -329,6 +648,9 @@ class FacultyProfileDetailView(generics.RetrieveUpdateAPIView):
 class AchievementListCreateView(generics.ListCreateAPIView):
     """API view for listing and creating achievements"""
     permission_classes = [IsStaffOrStudent]
+    # Creating one from an upload session claims the session, stores its file (content-addressed
+    # blob refcount), the row and its search entry; listing stays a fixed handful
+    query_budget = {'GET': 6, 'POST': 15}
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -336,20 +658,30 @@ class AchievementListCreateView(generics.ListCreateAPIView):
         return AchievementSerializer
     
     def get_queryset(self):
-        user = self.request.user
-        # Students can only see their own achievements
-        if user.role == 'student':
-            return Achievement.objects.filter(student=user.student_profile)
-        # Staff can see all achievements in their college/department
-        elif user.role == 'principal':
-            return Achievement.objects.filter(student__department__college=user.college)
-        elif user.role in ['hod', 'faculty']:
-            return Achievement.objects.filter(student__department=user.department)
-        return Achievement.objects.none()
-    
-    def perform_create(self, serializer):
-        # This is handled in the serializer
-        pass
+        # Students see their own achievements, staff their college/department
+        return Achievement.objects.visible_to(self.request.user)
+
+
+class AchievementExportView(ExportView):
+    """API view to export achievements (same scoping as AchievementListCreateView)"""
+    permission_classes = [IsStaffOrStudent]
+    model = Achievement
+    filename = 'achievements'
+    columns = [
+        ('ID', 'id'),
+        ('Student ID', 'student__student_id'),
+        ('First Name', 'student__user__first_name'),
+        ('Last Name', 'student__user__last_name'),
+        ('Department', 'department__name'),
+        ('Title', 'title'),
+        ('Category', 'category'),
+        ('Date Achieved', 'date_achieved'),
+        ('Status', 'status'),
+        ('Reviewed By', 'approved_by__email'),
+        ('Reviewed At', 'approved_at'),
+        ('Rejection Reason', 'rejection_reason'),
+        ('Created At', 'created_at'),
+    ]
 
 
 class AchievementDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -362,52 +694,26 @@ class AchievementDetailView(generics.RetrieveUpdateDestroyAPIView):
         return AchievementSerializer
     
     def get_queryset(self):
-        user = self.request.user
-        # Students can only access their own achievements
-        if user.role == 'student':
-            return Achievement.objects.filter(student=user.student_profile)
-        # Staff can access all achievements in their college/department
-        elif user.role == 'principal':
-            return Achievement.objects.filter(student__department__college=user.college)
-        elif user.role in ['hod', 'faculty']:
-            return Achievement.objects.filter(student__department=user.department)
-        return Achievement.objects.none()
+        return Achievement.objects.visible_to(self.request.user)
 
 
 class PendingAchievementsView(generics.ListAPIView):
     """API view for staff to see pending achievements"""
     serializer_class = AchievementSerializer
     permission_classes = [CanApproveAchievements]
+    max_page_size = 100
+    query_budget = 2
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'principal':
-            return Achievement.objects.filter(
-                student__department__college=user.college,
-                status='pending'
-            )
-        else:
-            return Achievement.objects.filter(
-                student__department=user.department,
-                status='pending'
-            )
+        return Achievement.objects.visible_to(self.request.user).filter(status='pending')
 
 
 @api_view(['POST'])
 @permission_classes([CanApproveAchievements])
 def approve_achievement(request, achievement_id):
     """API view for staff to approve/reject achievements"""
-    user = request.user
-    
     try:
-        if user.role == 'principal':
-            achievement = Achievement.objects.filter(
-                student__department__college=user.college
-            ).get(id=achievement_id)
-        else:
-            achievement = Achievement.objects.filter(
-                student__department=user.department
-            ).get(id=achievement_id)
+        achievement = Achievement.objects.visible_to(request.user).get(id=achievement_id)
     except Achievement.DoesNotExist:
         return Response({'error': 'Achievement not found'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -434,17 +740,8 @@ def approve_achievement(request, achievement_id):
 @permission_classes([CanApprovePermissions])
 def approve_permission_request(request, permission_id):
     """API view for staff to approve/reject permission requests"""
-    user = request.user
-    
     try:
-        if user.role == 'principal':
-            permission_request = PermissionRequest.objects.filter(
-                student__department__college=user.college
-            ).get(id=permission_id)
-        else:
-            permission_request = PermissionRequest.objects.filter(
-                student__department=user.department
-            ).get(id=permission_id)
+        permission_request = PermissionRequest.objects.visible_to(request.user).get(id=permission_id)
     except PermissionRequest.DoesNotExist:
         return Response({'error': 'Permission request not found'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -467,14 +764,94 @@ def approve_permission_request(request, permission_id):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+def bulk_review(request, model, serializer_class):
+    """
+    Approve or reject many pending items of `model` in one transaction.
+
+    Targets are the given IDs, or the pending items matching `filter` (exact
+    matches on the fields of the serializer's filter), capped at
+    BulkReviewSerializer.MAX_ITEMS.
+    The review itself is a single tenant-scoped UPDATE ... WHERE status='pending';
+    every requested ID gets an outcome: updated, not_pending or not_found.
+    """
+    serializer = serializer_class(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    visible = model.objects.scoped_to(request.user)
+    now = timezone.now()
+    changes = {
+        'status': data['status'],
+        'approved_by': request.user,
+        'approved_at': now,
+        'updated_at': now,
+    }
+    if data['status'] == 'rejected':
+        changes['rejection_reason'] = data['rejection_reason']
+
+    with transaction.atomic():
+        if 'ids' in data:
+            ids = list(dict.fromkeys(data['ids']))
+        else:
+            ids = list(
+                visible.filter(status='pending', **data['filter'])
+                .order_by('created_at')
+                .values_list('pk', flat=True)[:BulkReviewSerializer.MAX_ITEMS]
+            )
+
+        updated = visible.filter(pk__in=ids, status='pending').update(**changes)
+        rows = {
+            pk: (row_status, approved_at, approved_by_id, college_id)
+            for pk, row_status, approved_at, approved_by_id, college_id in visible.filter(pk__in=ids).values_list(
+                'pk', 'status', 'approved_at', 'approved_by_id', 'college_id'
+            )
+        }
+
+    results = []
+    for pk in ids:
+        if pk not in rows:
+            results.append({'id': pk, 'outcome': 'not_found'})
+        elif rows[pk][1:3] == (now, request.user.pk):
+            results.append({'id': pk, 'outcome': 'updated'})
+        else:
+            results.append({'id': pk, 'outcome': 'not_pending', 'status': rows[pk][0]})
+
+    # Queryset updates skip post_save, so drop the cached summaries here
+    if updated:
+        invalidate_principal_summary(*{row[3] for row in rows.values()})
+
+    return Response({
+        'status': data['status'],
+        'updated_count': updated,
+        'results': results,
+    }, status=status.HTTP_200_OK)
+
+
+@query_budget(6)
+@api_view(['POST'])
+@permission_classes([CanApproveAchievements])
+def bulk_review_achievements(request):
+    """API view for staff to approve/reject many pending achievements at once"""
+    return bulk_review(request, Achievement, AchievementBulkReviewSerializer)
+
+
+@query_budget(6)
+@api_view(['POST'])
+@permission_classes([CanApprovePermissions])
+def bulk_review_permission_requests(request):
+    """API view for staff to approve/reject many pending permission requests at once"""
+    return bulk_review(request, PermissionRequest, PermissionRequestBulkReviewSerializer)
+
+
 class HODListView(generics.ListAPIView):
     """API view to list HODs in the college"""
     serializer_class = UserSerializer
     permission_classes = [IsPrincipal]
+    max_page_size = 100
+    query_budget = 4
 
     def get_queryset(self):
-        user = self.request.user
-        return User.objects.filter(role='hod', college=user.college)
+        return User.objects.visible_to(self.request.user).filter(role='hod')
 
 
 class HODCreateView(generics.CreateAPIView):
@@ -492,22 +869,18 @@ class HODDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsPrincipal]
 
     def get_queryset(self):
-        user = self.request.user
-        return User.objects.filter(role='hod', college=user.college)
+        return User.objects.visible_to(self.request.user).filter(role='hod')
 
 
 class FacultyListView(generics.ListAPIView):
     """API view to list faculty in college/department"""
     serializer_class = UserSerializer
     permission_classes = [IsPrincipal, IsHOD]
+    max_page_size = 100
+    query_budget = 4
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'principal':
-            return User.objects.filter(role='faculty', college=user.college)
-        elif user.role == 'hod':
-            return User.objects.filter(role='faculty', department=user.department)
-        return User.objects.none()
+        return User.objects.visible_to(self.request.user).filter(role='faculty')
 
 
 class FacultyCreateView(generics.CreateAPIView):
@@ -529,12 +902,7 @@ class FacultyDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsPrincipal, IsHOD]
 
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'principal':
-            return User.objects.filter(role='faculty', college=user.college)
-        elif user.role == 'hod':
-            return User.objects.filter(role='faculty', department=user.department)
-        return User.objects.none()
+        return User.objects.visible_to(self.request.user).filter(role='faculty')
 
 
 class UserLoginAPIView(APIView):
@@ -555,7 +923,7 @@ class UserLoginAPIView(APIView):
         if user.is_superuser:
             return Response({'error': 'Superusers should use admin login'}, status=status.HTTP_400_BAD_REQUEST)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = TenantRefreshToken.for_user(user)
         return Response({
             'access': str(refresh.access_token),
             'refresh': str(refresh),
@@ -581,7 +949,7 @@ class AdminLoginAPIView(APIView):
         if not user.is_superuser:
             return Response({'error': 'Only superusers can access admin login'}, status=status.HTTP_403_FORBIDDEN)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = TenantRefreshToken.for_user(user)
         return Response({
             'access': str(refresh.access_token),
             'refresh': str(refresh),
@@ -593,20 +961,75 @@ class AdminLoginAPIView(APIView):
 @permission_classes([IsStudent])
 def download_portfolio(request):
     """API view for students to download their portfolio PDF"""
-    student_profile = request.user.student_profile
+    student_profile = StudentProfile.objects.select_related('user__college').get(user=request.user)
 
-    # Generate PDF
+    # Rendered PDFs are cached on disk per content version, which doubles as the ETag
     try:
-        pdf_content = generate_student_portfolio(student_profile)
-
-        # Create filename
-        filename = f"{student_profile.student_id}_portfolio.pdf"
-
-        # Return PDF response
-        return create_pdf_response(pdf_content, filename)
+        version = portfolio_version(student_profile)
+        etag = f'"{version}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            path = get_cached_portfolio(student_profile, version)
+            filename = f"{student_profile.student_id}_portfolio.pdf"
+            response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename,
+                                    content_type='application/pdf')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
     except Exception as e:
         return Response(
             {'error': f'Failed to generate portfolio: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+class SearchView(APIView):
+    """
+    Full-text search over achievements, permission requests and events (core.search_utils).
+
+    ?q= is required; ?kind= narrows it to a comma-separated list of kinds and
+    ?limit= caps the results. Results are ranked by bm25 and scoped to the
+    records the user may see, without touching the tables themselves.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    query_budget = 1
+    max_limit = 50
+
+    def get(self, request):
+        if not search_index_available():
+            return Response({'error': 'Full-text search is not available'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        kinds = [kind for kind in request.query_params.get('kind', '').split(',') if kind]
+        unknown = [kind for kind in kinds if kind not in SEARCH_KINDS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown kind: {', '.join(unknown)}. Use {', '.join(SEARCH_KINDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'results': search(request.user, query, kinds, max(limit, 1))})
+
+
+@query_budget(2)
+@require_safe
+def serve_media(request, name):
+    """
+    Serve an uploaded file from a signed media URL (core.media_utils).
+
+    The signature is checked without touching the database; superusers may
+    also follow the unsigned links shown in the admin (a session lookup).
+    """
+    expires = request.GET.get('e', '')
+    if verify_media_signature(name, expires, request.GET.get('s', '')):
+        return media_response(request, name, max_age=max(int(expires) - int(time.time()), 0))
+    if request.user.is_superuser:
+        return media_response(request, name)
+    return HttpResponseForbidden('Invalid or expired media link')
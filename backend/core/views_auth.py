@@ -5,11 +5,11 @@ from django.http import HttpResponse, JsonResponse
 from django.urls import reverse
 from django.contrib.auth.forms import AuthenticationForm
 from django.shortcuts import render
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import TenantRefreshToken
 
 
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = TenantRefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
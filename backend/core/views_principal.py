@@ -6,12 +6,14 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.utils import timezone
-from .models import Department, User, Event, PermissionRequest, Notification, EventPermissionRequest
+from django.db.models import Count, Q
+from .models import College, Department, User, Event, PermissionRequest, Notification, EventPermissionRequest, Achievement
 from .serializers import (
-    DepartmentSerializer, UserSerializer,
+    CollegeSerializer, DepartmentSerializer, UserSerializer,
     EventSerializer, PermissionRequestSerializer, EventPermissionRequestSerializer
 )
 from .permissions import IsPrincipal, IsHOD
+from .cache_utils import get_principal_summary, set_principal_summary
 
 
 class EventListCreateView(generics.ListCreateAPIView):
@@ -19,8 +21,7 @@ class EventListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsPrincipal | IsHOD]
 
     def get_queryset(self):
-        user = self.request.user
-        return Event.objects.filter(college=user.college)
+        return Event.objects.visible_to(self.request.user)
 
     def perform_create(self, serializer):
         event = serializer.save(created_by=self.request.user, college=self.request.user.college)
@@ -34,21 +35,20 @@ class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsPrincipal]
 
     def get_queryset(self):
-        user = self.request.user
-        return Event.objects.filter(college=user.college)
+        return Event.objects.visible_to(self.request.user)
 
 
 class PrincipalDashboardView(APIView):
     permission_classes = [IsPrincipal]
+    query_budget = 9
 
     def get(self, request):
         user = request.user
-        college = user.college
 
-        hods = User.objects.filter(role='hod', college=college)
-        faculty = User.objects.filter(role='faculty', college=college)
-        events = Event.objects.filter(college=college)
-        permissions = PermissionRequest.objects.filter(student__department__college=college)
+        hods = User.objects.visible_to(user).filter(role='hod')
+        faculty = User.objects.visible_to(user).filter(role='faculty')
+        events = Event.objects.visible_to(user)
+        permissions = PermissionRequest.objects.visible_to(user)
 
         hods_data = UserSerializer(hods, many=True).data
         faculty_data = UserSerializer(faculty, many=True).data
@@ -63,6 +63,74 @@ class PrincipalDashboardView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class PrincipalSummaryView(APIView):
+    """
+    Counts plus the most recent few items of each kind for the principal
+    landing page, built from aggregate queries and cached per college.
+    """
+    permission_classes = [IsPrincipal]
+    query_budget = 16
+    recent_items = 5
+
+    def get(self, request):
+        user = request.user
+        if user.college_id is None:
+            return Response({'error': 'No college is assigned to this account'}, status=status.HTTP_404_NOT_FOUND)
+        summary = get_principal_summary(user.college_id)
+        if summary is None:
+            summary = self.build_summary(user)
+            set_principal_summary(user.college_id, summary)
+        return Response(summary, status=status.HTTP_200_OK)
+
+    def build_summary(self, user):
+        college_id = user.college_id
+        n = self.recent_items
+
+        user_counts = User.objects.filter(college_id=college_id).aggregate(
+            hods=Count('pk', filter=Q(role='hod')),
+            faculty=Count('pk', filter=Q(role='faculty')),
+            students=Count('pk', filter=Q(role='student')),
+        )
+        event_counts = Event.objects.filter(college_id=college_id).aggregate(
+            total=Count('pk'),
+            pending=Count('pk', filter=Q(status='pending')),
+            approved=Count('pk', filter=Q(status='approved')),
+        )
+        permission_counts = PermissionRequest.objects.filter(college_id=college_id).aggregate(
+            total=Count('pk'),
+            pending=Count('pk', filter=Q(status='pending')),
+        )
+        achievement_counts = Achievement.objects.filter(college_id=college_id).aggregate(
+            total=Count('pk'),
+            pending=Count('pk', filter=Q(status='pending')),
+        )
+
+        events = Event.objects.visible_to(user)
+        return {
+            'college': CollegeSerializer(College.objects.with_counts().get(pk=college_id)).data,
+            'counts': {
+                'departments': Department.objects.filter(college_id=college_id).count(),
+                **user_counts,
+                'events': event_counts,
+                'permission_requests': permission_counts,
+                'achievements': achievement_counts,
+            },
+            'recent': {
+                'hods': UserSerializer(
+                    User.objects.visible_to(user).filter(role='hod').order_by('-created_at')[:n], many=True
+                ).data,
+                'faculty': UserSerializer(
+                    User.objects.visible_to(user).filter(role='faculty').order_by('-created_at')[:n], many=True
+                ).data,
+                'events': EventSerializer(events[:n], many=True).data,
+                'pending_events': EventSerializer(events.filter(status='pending')[:n], many=True).data,
+                'permission_requests': PermissionRequestSerializer(
+                    PermissionRequest.objects.visible_to(user).filter(status='pending')[:n], many=True
+                ).data,
+            },
+        }
+
+
 @method_decorator(login_required, name='dispatch')
 class PrincipalDashboardTemplateView(APIView):
     """Template view for principal dashboard"""
@@ -72,12 +140,10 @@ class PrincipalDashboardTemplateView(APIView):
         if user.role != 'principal':
             return Response({'error': 'Access denied'}, status=403)
 
-        college = user.college
-
-        hods = User.objects.filter(role='hod', college=college)
-        faculty = User.objects.filter(role='faculty', college=college)
-        events = Event.objects.filter(college=college)
-        permissions = PermissionRequest.objects.filter(student__department__college=college)
+        hods = User.objects.visible_to(user).filter(role='hod')
+        faculty = User.objects.visible_to(user).filter(role='faculty')
+        events = Event.objects.visible_to(user)
+        permissions = PermissionRequest.objects.visible_to(user)
 
         context = {
             'hods': hods,
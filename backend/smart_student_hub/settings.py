@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -135,11 +137,13 @@ AUTH_USER_MODEL = 'core.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 # JWT Settings
@@ -149,8 +153,13 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    # Adds role/college_id/department_id claims to issued tokens
+    'TOKEN_OBTAIN_SERIALIZER': 'core.serializers.TenantTokenObtainPairSerializer',
 }
 
+# Lifetime of the signed onboarding links issued to bulk-imported students (core.invitations)
+STUDENT_INVITATION_MAX_AGE = 60 * 60 * 24 * 14  # seconds
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React development server
@@ -164,6 +173,31 @@ CSRF_TRUSTED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_EXPOSE_HEADERS = ['X-DB-Queries', 'X-DB-Time']
+
+# Per-request SQL query budget (core.middleware.QueryBudgetMiddleware)
+# Requests over budget are logged; views can declare their own `query_budget`.
+QUERY_BUDGET_DEFAULT = 50
+# Raise instead of logging when a view exceeds its declared budget (enable in tests)
+QUERY_BUDGET_STRICT = False
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Lifetime of the signed media URLs returned by the API (core.media_utils); expiry is rounded up so URLs stay cacheable
+MEDIA_URL_MAX_AGE = 60 * 60  # seconds
+MEDIA_URL_ROUNDING = 60 * 10  # seconds
+# Let the web server send media bodies: 'X-Accel-Redirect' (nginx), 'X-Sendfile' (Apache, lighttpd) or None
+MEDIA_SENDFILE_HEADER = None
+# nginx `internal` location aliased to MEDIA_ROOT, used with X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Resumable uploads (core.upload_utils): partial files, largest accepted file, and how long unfinished sessions are kept
+UPLOAD_SESSION_DIR = BASE_DIR / 'upload_sessions'
+UPLOAD_MAX_SIZE = 50 * 1024 * 1024  # bytes
+UPLOAD_SESSION_MAX_AGE = 60 * 60 * 24  # seconds
+
+# Rendered portfolio PDFs (core.pdf_utils), one directory per student; kept out of MEDIA_ROOT
+PORTFOLIO_CACHE_DIR = BASE_DIR / 'portfolio_cache'
+# Processes rendering uncached portfolios for batch ZIP downloads (core.portfolio_batch)
+PORTFOLIO_BATCH_WORKERS = os.cpu_count() or 1
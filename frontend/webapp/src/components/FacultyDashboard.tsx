@@ -44,8 +44,8 @@ const FacultyDashboard: React.FC = () => {
         api.get('achievements/pending/'),
         api.get('permission-requests/pending/'),
       ]);
-      setAchievements(achievementsRes.data);
-      setPermissions(permissionsRes.data);
+      setAchievements(achievementsRes.data.results);
+      setPermissions(permissionsRes.data.results);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
@@ -53,39 +53,24 @@ const FacultyDashboard: React.FC = () => {
     }
   };
 
-  const approveAchievement = async (id: number) => {
+  // Reviewed items leave the pending lists, so drop them locally instead of refetching
+  const reviewAchievements = async (ids: number[], status: 'approved' | 'rejected') => {
     try {
-      await api.post(`achievements/${id}/approve/`, { status: 'approved' });
-      fetchDashboardData();
+      const res = await api.post('achievements/bulk-review/', { ids, status });
+      const reviewed = new Set<number>(res.data.results.map((r: { id: number }) => r.id));
+      setAchievements(prev => prev.filter(a => !reviewed.has(a.id)));
     } catch (error) {
-      console.error('Error approving achievement:', error);
+      console.error('Error reviewing achievements:', error);
     }
   };
 
-  const rejectAchievement = async (id: number) => {
+  const reviewPermissions = async (ids: number[], status: 'approved' | 'rejected') => {
     try {
-      await api.post(`achievements/${id}/approve/`, { status: 'rejected' });
-      fetchDashboardData();
+      const res = await api.post('permission-requests/bulk-review/', { ids, status });
+      const reviewed = new Set<number>(res.data.results.map((r: { id: number }) => r.id));
+      setPermissions(prev => prev.filter(p => !reviewed.has(p.id)));
     } catch (error) {
-      console.error('Error rejecting achievement:', error);
-    }
-  };
-
-  const approvePermission = async (id: number) => {
-    try {
-      await api.post(`permission-requests/${id}/approve/`, { status: 'approved' });
-      fetchDashboardData();
-    } catch (error) {
-      console.error('Error approving permission:', error);
-    }
-  };
-
-  const rejectPermission = async (id: number) => {
-    try {
-      await api.post(`permission-requests/${id}/approve/`, { status: 'rejected' });
-      fetchDashboardData();
-    } catch (error) {
-      console.error('Error rejecting permission:', error);
+      console.error('Error reviewing permissions:', error);
     }
   };
 
@@ -100,6 +85,11 @@ const FacultyDashboard: React.FC = () => {
 
       <section className="dashboard-section">
         <h3>Pending Achievements</h3>
+        {achievements.length > 1 && (
+          <button className="btn-success" onClick={() => reviewAchievements(achievements.map(a => a.id), 'approved')}>
+            Approve all
+          </button>
+        )}
         {achievements.length > 0 ? (
           <ul className="item-list">
             {achievements.map(achievement => (
@@ -112,8 +102,8 @@ const FacultyDashboard: React.FC = () => {
                     </span>
                   </div>
                   <div className="action-buttons">
-                    <button className="btn-success" onClick={() => approveAchievement(achievement.id)}>Approve</button>
-                    <button className="btn-secondary" onClick={() => rejectAchievement(achievement.id)}>Reject</button>
+                    <button className="btn-success" onClick={() => reviewAchievements([achievement.id], 'approved')}>Approve</button>
+                    <button className="btn-secondary" onClick={() => reviewAchievements([achievement.id], 'rejected')}>Reject</button>
                   </div>
                 </div>
               </li>
@@ -126,6 +116,11 @@ const FacultyDashboard: React.FC = () => {
 
       <section className="dashboard-section">
         <h3>Pending Permission Requests</h3>
+        {permissions.length > 1 && (
+          <button className="btn-success" onClick={() => reviewPermissions(permissions.map(p => p.id), 'approved')}>
+            Approve all
+          </button>
+        )}
         {permissions.length > 0 ? (
           <ul className="item-list">
             {permissions.map(permission => (
@@ -138,8 +133,8 @@ const FacultyDashboard: React.FC = () => {
                     </span>
                   </div>
                   <div className="action-buttons">
-                    <button className="btn-success" onClick={() => approvePermission(permission.id)}>Approve</button>
-                    <button className="btn-secondary" onClick={() => rejectPermission(permission.id)}>Reject</button>
+                    <button className="btn-success" onClick={() => reviewPermissions([permission.id], 'approved')}>Approve</button>
+                    <button className="btn-secondary" onClick={() => reviewPermissions([permission.id], 'rejected')}>Reject</button>
                   </div>
                 </div>
               </li>
@@ -72,9 +72,9 @@ const HODDashboard: React.FC = () => {
         api.get('permission-requests/pending/'),
         api.get('hod/events/'),
       ]);
-      setAchievements(achievementsRes.data);
-      setPermissions(permissionsRes.data);
-      setEvents(eventsRes.data);
+      setAchievements(achievementsRes.data.results);
+      setPermissions(permissionsRes.data.results);
+      setEvents(eventsRes.data.results);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
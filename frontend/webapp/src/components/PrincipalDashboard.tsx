@@ -54,6 +54,7 @@ interface User {
 const PrincipalDashboard: React.FC = () => {
   const [college, setCollege] = useState<College | null>(null);
   const [events, setEvents] = useState<Event[]>([]);
+  const [pendingEvents, setPendingEvents] = useState<Event[]>([]);
   const [hods, setHods] = useState<User[]>([]);
   const [faculty, setFaculty] = useState<User[]>([]);
   const [loading, setLoading] = useState(true);
@@ -79,16 +80,14 @@ const PrincipalDashboard: React.FC = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [collegeRes, eventsRes, hodsRes, facultyRes] = await Promise.all([
-        api.get('colleges/'),
-        api.get('principal/events/'),
-        api.get('hods/'),
-        api.get('faculty/'),
-      ]);
-      setCollege(collegeRes.data[0]); // Assuming one college
-      setEvents(eventsRes.data);
-      setHods(hodsRes.data);
-      setFaculty(facultyRes.data);
+      // One cached request: counts plus the most recent items of each kind
+      const summaryRes = await api.get('principal/summary/');
+      const { college, recent } = summaryRes.data;
+      setCollege(college);
+      setEvents(recent.events);
+      setPendingEvents(recent.pending_events);
+      setHods(recent.hods);
+      setFaculty(recent.faculty);
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
     } finally {
@@ -170,8 +169,6 @@ const PrincipalDashboard: React.FC = () => {
     }
   };
 
-  const pendingEvents = events.filter(event => event.status === 'pending');
-
   if (loading) return <div className="loading">Loading...</div>;
 
   return (
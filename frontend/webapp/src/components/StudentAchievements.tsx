@@ -1,6 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import api from '../services/api';
 
+interface ImageVariant {
+  width: number;
+  height: number;
+  webp: string;
+  jpeg: string;
+}
+
 interface Achievement {
   id: number;
   title: string;
@@ -9,6 +16,7 @@ interface Achievement {
   date_achieved: string;
   status: string;
   evidence_file: string;
+  evidence_variants: Record<string, ImageVariant> | null;
 }
 
 const StudentAchievements: React.FC = () => {
@@ -22,7 +30,7 @@ const StudentAchievements: React.FC = () => {
   const fetchAchievements = async () => {
     try {
       const response = await api.get('achievements/');
-      setAchievements(response.data);
+      setAchievements(response.data.results);
     } catch (error) {
       console.error('Error fetching achievements:', error);
     } finally {
@@ -39,6 +47,20 @@ const StudentAchievements: React.FC = () => {
         {achievements.map((achievement) => (
           <li key={achievement.id}>
             <h4>{achievement.title}</h4>
+            {achievement.evidence_variants?.thumb && (
+              <a href={achievement.evidence_file} target="_blank" rel="noreferrer">
+                <picture>
+                  <source srcSet={achievement.evidence_variants.thumb.webp} type="image/webp" />
+                  <img
+                    src={achievement.evidence_variants.thumb.jpeg}
+                    width={achievement.evidence_variants.thumb.width}
+                    height={achievement.evidence_variants.thumb.height}
+                    loading="lazy"
+                    alt={achievement.title}
+                  />
+                </picture>
+              </a>
+            )}
             <p>{achievement.description}</p>
             <p>Status: {achievement.status}</p>
           </li>
@@ -0,0 +1,46 @@
+import React, { useEffect, useState } from 'react';
+import { useNavigate, useParams } from 'react-router-dom';
+import api from '../services/api';
+
+const AcceptInvitation: React.FC = () => {
+  const { token } = useParams<{ token: string }>();
+  const [email, setEmail] = useState('');
+  const [password, setPassword] = useState('');
+  const [passwordConfirm, setPasswordConfirm] = useState('');
+  const [error, setError] = useState('');
+  const navigate = useNavigate();
+
+  useEffect(() => {
+    api.get(`invitations/${token}/`)
+      .then(res => setEmail(res.data.email))
+      .catch(err => setError(err.response?.data?.error || 'Invalid invitation'));
+  }, [token]);
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    try {
+      await api.post('invitations/redeem/', { token, password, password_confirm: passwordConfirm });
+      navigate('/login');
+    } catch (err: any) {
+      const data = err.response?.data;
+      setError(data?.error || data?.password?.[0] || data?.non_field_errors?.[0] || 'Could not set password');
+    }
+  };
+
+  return (
+    <div>
+      <h2>Set your password</h2>
+      {email && (
+        <form onSubmit={handleSubmit}>
+          <p>{email}</p>
+          <input type="password" placeholder="Password" value={password} onChange={e => setPassword(e.target.value)} required />
+          <input type="password" placeholder="Confirm Password" value={passwordConfirm} onChange={e => setPasswordConfirm(e.target.value)} required />
+          <button type="submit">Set password</button>
+        </form>
+      )}
+      {error && <p>{error}</p>}
+    </div>
+  );
+};
+
+export default AcceptInvitation;
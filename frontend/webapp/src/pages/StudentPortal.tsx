@@ -40,7 +40,7 @@ const StudentPortal: React.FC = () => {
   const fetchEvents = async () => {
     try {
       const response = await api.get('principal/events/');
-      setEvents(response.data);
+      setEvents(response.data.results);
     } catch (error) {
       console.error('Error fetching events:', error);
     }